@@ -0,0 +1,191 @@
+import argparse
+import json
+import time
+from pathlib import Path
+import numpy as np
+from retrieval import INDEX_DIR, VectorStore, tokenize_code
+
+# --- [설정] IVF-Flat 근사 최근접 이웃 인덱스 파일 ---
+# VectorStore 인덱스 디렉토리에 함께 저장되며 모두 메모리 매핑으로 로드
+IVF_INFO_NAME = "ivf.json"
+IVF_CENTROIDS_NAME = "ivf_centroids.f32" # (리스트 수, dim) 클러스터 중심
+IVF_VECTORS_NAME = "ivf_vectors.f32"     # 리스트 순서로 재배열된 임베딩 (리스트별 연속 구간)
+IVF_ROWS_NAME = "ivf_rows.i64"           # 재배열된 위치 -> 원본 행 번호
+IVF_BOUNDS_NAME = "ivf_bounds.i64"       # 리스트별 구간 경계 (리스트 수 + 1)
+
+ASSIGN_BLOCK = 65536 # 전체 행 할당 시 블록 단위 (메모리 사용량 제한)
+
+# --- [학습] 구면(Spherical) k-means ---
+def train_centroids(vectors, n_lists, iters=10, sample_size=100_000, seed=0):
+    """
+    L2 정규화된 벡터 샘플로 코사인 k-means를 학습합니다.
+    빈 클러스터는 샘플에서 임의 벡터로 재초기화합니다.
+    """
+    rng = np.random.default_rng(seed)
+    rows = len(vectors)
+    sample_idx = np.sort(rng.choice(rows, size=min(rows, max(sample_size, n_lists)), replace=False))
+    sample = np.asarray(vectors[sample_idx], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+    for _ in range(iters):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms > 0, norms, 1)
+    return centroids.astype(np.float32)
+
+def build_ivf(index_dir, n_lists=None, iters=10):
+    """
+    VectorStore 인덱스 위에 IVF-Flat 인덱스를 구축합니다.
+    - n_lists: 클러스터(리스트) 수 (기본값: 4 * sqrt(행 수))
+    - 벡터를 리스트 순서로 재배열하여 기록하므로 검색 시 각 리스트를 연속 구간으로 읽음
+    - 빈 벡터 인덱스는 빈 리스트 1개짜리 인덱스로 기록 (검색 결과 없음)
+    """
+    store = VectorStore(index_dir)
+    index_dir = Path(index_dir)
+    rows = store.rows
+    n_lists = max(1, min(rows, n_lists or int(4 * np.sqrt(rows))))
+    if rows:
+        centroids = train_centroids(store.vectors, n_lists, iters=iters)
+    else:
+        centroids = np.zeros((n_lists, store.dim), dtype=np.float32)
+
+    # 전체 행을 블록 단위로 가장 가까운 중심에 할당
+    assign = np.empty(rows, dtype=np.int64)
+    for start in range(0, rows, ASSIGN_BLOCK):
+        block = store.vectors[start : start + ASSIGN_BLOCK]
+        assign[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    order = np.argsort(assign, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=n_lists)))).astype(np.int64)
+    with (index_dir / IVF_VECTORS_NAME).open("wb") as f:
+        for start in range(0, rows, ASSIGN_BLOCK):
+            f.write(np.asarray(store.vectors[order[start : start + ASSIGN_BLOCK]], dtype=np.float32).tobytes())
+    order.tofile(index_dir / IVF_ROWS_NAME)
+    bounds.tofile(index_dir / IVF_BOUNDS_NAME)
+    centroids.tofile(index_dir / IVF_CENTROIDS_NAME)
+    with (index_dir / IVF_INFO_NAME).open("w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "dim": store.dim, "n_lists": n_lists, "source": store.info.get("source"),
+                   "fingerprint": store.info.get("fingerprint")}, f)
+    store.close()
+    return n_lists
+
+# --- [검색] ---
+class IVFIndex:
+    """
+    IVF-Flat 근사 검색. 질의와 가까운 n_probe개 리스트만 정확 점수를 계산합니다.
+    n_probe가 클수록 재현율(recall)이 높아지고 지연 시간이 늘어납니다. (n_probe = 리스트 수이면 정확 검색과 동일)
+    """
+    def __init__(self, store, n_probe=8):
+        self.store = store
+        index_dir = store.index_dir
+        with (index_dir / IVF_INFO_NAME).open("r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        # 행 수가 같아도 다른 데이터셋/다시 구축된 벡터 인덱스면 중심과 리스트가 맞지 않으므로 출처와 빌드 지문까지 비교
+        if (self.info["rows"] != store.rows or self.info.get("source") != store.info.get("source")
+                or self.info.get("fingerprint") != store.info.get("fingerprint")):
+            raise RuntimeError(f"IVF 인덱스가 벡터 인덱스와 일치하지 않습니다. 다시 구축하십시오: {index_dir}")
+        self.n_lists, self.n_probe = self.info["n_lists"], n_probe
+        self.centroids = np.fromfile(index_dir / IVF_CENTROIDS_NAME, dtype=np.float32).reshape(self.n_lists, store.dim)
+        if store.rows:
+            self.vectors = np.memmap(index_dir / IVF_VECTORS_NAME, dtype=np.float32, mode="r",
+                                     shape=(store.rows, store.dim))
+            self.rows = np.memmap(index_dir / IVF_ROWS_NAME, dtype=np.int64, mode="r")
+        else: # 빈 파일은 메모리 매핑 불가
+            self.vectors = np.zeros((0, store.dim), dtype=np.float32)
+            self.rows = np.zeros(0, dtype=np.int64)
+        self.bounds = np.fromfile(index_dir / IVF_BOUNDS_NAME, dtype=np.int64)
+
+    def search_vectors(self, query_vectors, k=10, n_probe=None):
+        """질의 벡터별 상위 k개 (원본 행 번호, 점수)를 반환합니다."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        centroid_scores = query_vectors @ self.centroids.T
+        probes = np.argpartition(centroid_scores, -n_probe, axis=1)[:, -n_probe:]
+        results = []
+        for query, lists in zip(query_vectors, probes):
+            positions = np.concatenate([np.arange(self.bounds[l], self.bounds[l + 1]) for l in lists])
+            if len(positions) == 0:
+                results.append([])
+                continue
+            # 리스트별 연속 구간을 읽어 점수 계산
+            scores = np.concatenate([self.vectors[self.bounds[l] : self.bounds[l + 1]] @ query for l in lists])
+            top = min(k, len(scores))
+            best = np.argpartition(scores, -top)[-top:]
+            best = best[np.argsort(-scores[best])]
+            results.append(list(zip(self.rows[positions[best]].tolist(), scores[best].tolist())))
+        return results
+
+    def search_rows(self, queries, k=10, n_probe=None):
+        return self.search_vectors(self.store.embedder.embed(queries), k, n_probe)
+
+    def search(self, queries, k=10, n_probe=None):
+        return [[(score, self.store.metadata(row)) for row, score in hits]
+                for hits in self.search_rows(queries, k, n_probe)]
+
+# --- [벤치마크] 정확 검색 대비 recall@k 및 지연 시간 ---
+def benchmark(store, ivf, probes=(1, 4, 8, 16, 32), k=10, n_queries=200, seed=0):
+    """저장된 청크에서 질의를 샘플링하여 n_probe별 recall@k(정확 검색 기준)와 p50/p99 지연 시간을 측정합니다."""
+    rng = np.random.default_rng(seed)
+    sample_rows = rng.choice(store.rows, size=min(n_queries, store.rows), replace=False)
+    queries = [" ".join(tokenize_code(str(store.metadata(r)["content"]))[:8]) for r in sample_rows]
+    query_vectors = store.embedder.embed(queries)
+
+    # 동점 점수가 많은 해싱 임베딩 특성상, 정확 검색의 k번째 점수 이상인 결과를 정답으로 간주 (tie-aware recall)
+    thresholds, exact_ms = [], []
+    for q in query_vectors:
+        start = time.perf_counter()
+        hits = store.top_k(store.score(q[None]), k)[0]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+        thresholds.append((hits[-1][1] - 1e-6, len(hits)) if hits else (np.inf, 0))
+    def percentiles(latencies):
+        return {"p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+                "p99_ms": float(np.percentile(latencies, 99)) if latencies else 0.0}
+
+    report = [{"mode": "exact", "recall": 1.0, **percentiles(exact_ms)}]
+
+    for n_probe in probes:
+        latencies, recalls = [], []
+        for q, (threshold, expected) in zip(query_vectors, thresholds):
+            start = time.perf_counter()
+            hits = ivf.search_vectors(q[None], k, n_probe)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(sum(score >= threshold for _, score in hits) / max(1, expected))
+        report.append({"mode": f"ivf(n_probe={n_probe})", "recall": float(np.mean(recalls)) if recalls else 1.0,
+                       **percentiles(latencies)})
+    return report
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="IVF-Flat 근사 최근접 이웃 인덱스")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="벡터 인덱스 위에 IVF 인덱스 구축")
+    build_cmd.add_argument("--index", choices=["baseline", "ours"], default="ours")
+    build_cmd.add_argument("--lists", type=int, default=None, help="리스트(클러스터) 수 (기본값: 4*sqrt(N))")
+    build_cmd.add_argument("--iters", type=int, default=10, help="k-means 반복 횟수")
+    bench_cmd = sub.add_parser("bench", help="정확 검색 대비 recall@k / 지연 시간 측정")
+    bench_cmd.add_argument("--index", choices=["baseline", "ours"], default="ours")
+    bench_cmd.add_argument("-k", type=int, default=10)
+    bench_cmd.add_argument("--probes", default="1,4,8,16,32", help="측정할 n_probe 목록 (쉼표 구분)")
+    args = arg_parser.parse_args()
+
+    index_dir = INDEX_DIR / args.index
+    if args.command == "build":
+        start = time.perf_counter()
+        n_lists = build_ivf(index_dir, n_lists=args.lists, iters=args.iters)
+        print(f"[Success] IVF 인덱스 구축 완료: 리스트 {n_lists}개, {time.perf_counter() - start:.2f}s -> {index_dir}")
+    else:
+        store = VectorStore(index_dir)
+        ivf = IVFIndex(store)
+        probes = [int(p) for p in args.probes.split(",")]
+        print(f"[Benchmark] 행 수: {store.rows}, 리스트 수: {ivf.n_lists}, k={args.k}")
+        for row in benchmark(store, ivf, probes=probes, k=args.k):
+            print(f"   - {row['mode']:<20} recall@{args.k}: {row['recall']:.3f}  "
+                  f"p50: {row['p50_ms']:.2f}ms  p99: {row['p99_ms']:.2f}ms")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import inspect
+import json
+import sqlite3
+import struct
+from pathlib import Path
+
+# --- [설정] 파일 단위 청킹 결과 캐시 (SQLite 단일 파일, LRU 용량 제한) ---
+# 키: (파일 내용 해시, 문법 버전, 청커 버전, 청킹 설정)
+# - 문법 버전: tree-sitter / 언어 패키지 버전 + ABI 버전 (패키지 업그레이드 시 자동 무효화)
+# - 청커 버전: 청킹 함수 소스와 규칙 상수의 해시 (chunk_ours 로직 변경 시 자동 무효화)
+# 매니페스트(증분 빌드)와 달리 경로/빌드 이력과 무관하므로 --full 재구축, 설정 전환, 브랜치 전환 후에도 재사용됩니다.
+CACHE_NAME = "chunk_cache.sqlite"
+DEFAULT_CACHE_MAX_BYTES = 256 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data BLOB, size INTEGER, last_used INTEGER);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+# --- [버전 식별자] ---
+def _stable(obj):
+    # 집합은 정렬(해시 무작위화와 무관하게 고정), 정규식은 패턴 문자열로 변환
+    if isinstance(obj, (set, frozenset)): return sorted(obj)
+    if hasattr(obj, "pattern"): return obj.pattern
+    raise TypeError(f"지문 계산 불가 객체: {type(obj).__name__}")
+
+def source_fingerprint(functions, constants):
+    """청킹 함수/클래스 소스와 규칙 상수로 청커 버전 해시(hex)를 계산합니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in functions:
+        digest.update(inspect.getsource(obj).encode("utf8"))
+    digest.update(json.dumps(constants, sort_keys=True, default=_stable).encode("utf8"))
+    return digest.hexdigest()
+
+def cache_key(sha256, grammar, chunker, config):
+    digest = hashlib.blake2b(digest_size=20)
+    for part in (sha256, grammar, chunker, json.dumps(config, sort_keys=True)):
+        digest.update(part.encode("utf8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+# --- [이진 직렬화] 문자열 테이블 + struct 레코드 ---
+# 형식: MAGIC | 문자열 수(u32) | (길이(u32) + UTF-8)* | 목록 수(u32) | 목록별 청크 수(u32) + 청크*
+# 청크: 필드 수(u8) + (키 문자열 번호(u32), 태그(u8), 값)*
+# 태그: 0=None, 1=정수(i64), 2=문자열 번호(u32), 3=문자열 목록(개수 u32 + 번호 u32*)
+# 유형/상위 컴포넌트/파일 이름처럼 반복되는 문자열과 필드 이름은 테이블에 1회만 저장됩니다.
+MAGIC = b"CKC1"
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_FIELD = struct.Struct("<IB")
+_I64 = struct.Struct("<q")
+TAG_NONE, TAG_INT, TAG_STR, TAG_STR_LIST = range(4)
+
+def encode_chunk_lists(chunk_lists):
+    """청크 목록들(예: (Baseline 청크, Proposed 청크))을 바이트로 직렬화합니다. (SourceSpan 등은 str로 변환)"""
+    strings, string_ids = [], {}
+
+    def ref(text):
+        index = string_ids.get(text)
+        if index is None:
+            index = string_ids[text] = len(strings)
+            strings.append(text)
+        return index
+
+    body = [_U32.pack(len(chunk_lists))]
+    for chunks in chunk_lists:
+        body.append(_U32.pack(len(chunks)))
+        for chunk in chunks:
+            body.append(_U8.pack(len(chunk)))
+            for key, value in chunk.items():
+                index = ref(key)
+                if value is None:
+                    body.append(_FIELD.pack(index, TAG_NONE))
+                elif isinstance(value, int):
+                    body.append(_FIELD.pack(index, TAG_INT) + _I64.pack(value))
+                elif isinstance(value, list):
+                    body.append(_FIELD.pack(index, TAG_STR_LIST) + _U32.pack(len(value)))
+                    body.extend(_U32.pack(ref(item)) for item in value)
+                else:
+                    body.append(_FIELD.pack(index, TAG_STR) + _U32.pack(ref(str(value))))
+
+    header = [MAGIC, _U32.pack(len(strings))]
+    for text in strings:
+        data = text.encode("utf8")
+        header.append(_U32.pack(len(data)))
+        header.append(data)
+    return b"".join(header + body)
+
+def decode_chunk_lists(data):
+    view = memoryview(data)
+    if view[:4] != MAGIC: raise ValueError("캐시 항목 형식이 올바르지 않습니다.")
+    position = 4
+
+    def u32():
+        nonlocal position
+        value = _U32.unpack_from(view, position)[0]
+        position += 4
+        return value
+
+    strings = []
+    for _ in range(u32()):
+        length = u32()
+        strings.append(str(view[position : position + length], "utf8"))
+        position += length
+
+    chunk_lists = []
+    for _ in range(u32()):
+        chunks = []
+        for _ in range(u32()):
+            field_count = view[position]
+            position += 1
+            chunk = {}
+            for _ in range(field_count):
+                index, tag = _FIELD.unpack_from(view, position)
+                position += _FIELD.size
+                if tag == TAG_NONE:
+                    value = None
+                elif tag == TAG_INT:
+                    value = _I64.unpack_from(view, position)[0]
+                    position += 8
+                elif tag == TAG_STR:
+                    value = strings[u32()]
+                else:
+                    value = [strings[u32()] for _ in range(u32())]
+                chunk[strings[index]] = value
+            chunks.append(chunk)
+        chunk_lists.append(chunks)
+    return chunk_lists
+
+# --- [캐시] ---
+class ChunkCache:
+    """
+    키 -> 직렬화된 청크 목록 저장소. 조회 시 사용 순번을 갱신하고, 총 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거(LRU)합니다. 메인 프로세스에서만 사용합니다.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        total, clock = self.conn.execute("SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM entries").fetchone()
+        self.total_bytes = total
+        self.clock = clock # 단조 증가 사용 순번 (시계 변경과 무관한 LRU 순서)
+        self.hits = self.misses = self.evicted = 0
+        if self.total_bytes > self.max_bytes: self.evict() # 상한을 줄여서 연 경우
+
+    def _tick(self):
+        self.clock += 1
+        return self.clock
+
+    def __contains__(self, key):
+        return self.conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key):
+        """캐시된 청크 목록을 반환합니다. (없거나 손상된 항목은 None)"""
+        row = self.conn.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            try:
+                result = decode_chunk_lists(row[0])
+            except (ValueError, struct.error, IndexError, UnicodeDecodeError):
+                self.delete(key)
+            else:
+                self.hits += 1
+                self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (self._tick(), key))
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key, chunk_lists):
+        data = encode_chunk_lists(chunk_lists)
+        if len(data) > self.max_bytes: return
+        self.delete(key)
+        self.conn.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", (key, data, len(data), self._tick()))
+        self.total_bytes += len(data)
+        if self.total_bytes > self.max_bytes: self.evict()
+
+    def delete(self, key):
+        row = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.total_bytes -= row[0]
+
+    def evict(self):
+        """총 크기가 max_bytes 이하가 될 때까지 사용 순번이 가장 오래된 항목부터 제거합니다."""
+        removed = []
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if self.total_bytes <= self.max_bytes: break
+            removed.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+        self.evicted += len(removed)
+
+    def clear(self):
+        self.conn.execute("DELETE FROM entries")
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.total_bytes = 0
+
+    def stats(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"entries": count, "bytes": self.total_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="청킹 결과 캐시 관리")
+    arg_parser.add_argument("command", choices=("stats", "clear"))
+    arg_parser.add_argument("--path", default=str(Path(__file__).resolve().parent / "dataset" / CACHE_NAME),
+                            help="캐시 파일 경로 (기본값: dataset/chunk_cache.sqlite)")
+    args = arg_parser.parse_args()
+    with ChunkCache(args.path) as cache:
+        if args.command == "clear": cache.clear()
+        stats = cache.stats()
+    print(f"[Cache] {args.path}: 항목 {stats['entries']}개, {stats['bytes'] / (1 << 20):.2f}MB "
+          f"(최대 {stats['max_bytes'] / (1 << 20):.0f}MB)")
@@ -0,0 +1,77 @@
+import hashlib
+from dataset_io import ChunkWriter, iter_chunks
+
+# --- [설정] 중복 제거 데이터셋 이름 (압축 확장자는 원본 데이터셋과 동일) ---
+UNIQUE_DATASET = "dataset_ours_unique"          # 고유 본문 테이블 (해시당 1행, 임베딩 대상)
+OCCURRENCE_DATASET = "dataset_ours_occurrences" # 출현 테이블 (해시, 청크 ID, 파일, 상위 컴포넌트, 줄)
+
+# --- [내용 주소 기반 중복 제거] ---
+# 파일 간에 복사된 동일한 Hook 호출/JSX 블록은 본문과 임베딩을 1회만 저장하고,
+# 출현 위치(파일, 상위 컴포넌트, 줄)는 별도의 출현(occurrence) 테이블로 보관합니다.
+
+def normalize_content(text):
+    """공백/줄바꿈/들여쓰기 차이를 무시하도록 연속 공백을 하나로 정규화합니다."""
+    return " ".join(str(text).split())
+
+def content_hash(chunk):
+    """청크 유형 + 정규화된 content의 BLAKE2b(128bit) 해시 (hex)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(chunk["type"].encode("utf8"))
+    digest.update(b"\0")
+    digest.update(normalize_content(chunk["content"]).encode("utf8"))
+    return digest.hexdigest()
+
+def dedup_dataset(dataset_path, unique_path, occurrence_path):
+    """
+    청크 데이터셋을 고유 본문 테이블과 출현 테이블로 분리하여 기록합니다. (2-패스 스트리밍)
+    - 1차 패스: 해시별 출현 수와 상위 컴포넌트 목록만 수집 (본문은 메모리에 보관하지 않음)
+    - 2차 패스: 해시별 첫 출현 본문을 고유 테이블에, 모든 출현 위치를 출현 테이블에 기록
+    - 고유 청크의 parents는 임베딩 입력에 사용되므로, 1회만 출현한 청크의 임베딩은 원본과 동일
+    반환: (전체 청크 수, 고유 청크 수)
+    """
+    stats = {} # hash -> [출현 수, 상위 컴포넌트 목록(출현 순, 중복 제거)]
+    for chunk in iter_chunks(dataset_path):
+        entry = stats.setdefault(content_hash(chunk), [0, []])
+        entry[0] += 1
+        parent = chunk.get("parent_component")
+        if parent and parent not in entry[1]: entry[1].append(parent)
+
+    written = set()
+    with ChunkWriter(unique_path) as unique_writer, ChunkWriter(occurrence_path) as occurrence_writer:
+        for chunk in iter_chunks(dataset_path):
+            key = content_hash(chunk)
+            if key not in written:
+                written.add(key)
+                count, parents = stats[key]
+                unique_writer.write({
+                    "hash": key,
+                    "type": chunk["type"],
+                    "parent_component": chunk.get("parent_component"),
+                    "parents": parents,
+                    "occurrences": count,
+                    "content": chunk["content"],
+                })
+            occurrence = {
+                "hash": key,
+                "id": chunk["id"],
+                "filepath": chunk.get("filepath"),
+                "parent_component": chunk.get("parent_component"),
+                "line": chunk.get("line"),
+            }
+            if "repo" in chunk: occurrence["repo"] = chunk["repo"] # 다중 저장소 샤드 빌드
+            occurrence_writer.write(occurrence)
+        total = occurrence_writer.count
+    return total, len(written)
+
+class OccurrenceTable:
+    """해시 -> 출현 위치 목록 조회 테이블. 최초 조회 시 1회 로드합니다."""
+    def __init__(self, path):
+        self.path = path
+        self._table = None
+
+    def get(self, key):
+        if self._table is None:
+            self._table = {}
+            for row in iter_chunks(self.path):
+                self._table.setdefault(row["hash"], []).append(row)
+        return self._table.get(key, [])
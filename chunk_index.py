@@ -0,0 +1,153 @@
+import sqlite3
+from pathlib import Path
+from dataset_io import ChunkSeeker
+
+# --- [설정] 청크 메타데이터 보조 인덱스 (SQLite) ---
+# - files: 상대 경로 -> 데이터셋별 청크 행 구간 [start, end) (데이터셋은 파일 순서로 기록되므로 연속 구간)
+# - chunks: Proposed 청크 행 -> (ID, 상위 컴포넌트, 유형, 줄, 바이트 오프셋), 상위 컴포넌트/유형 인덱스 포함
+# - baseline_offsets: Baseline 청크 행 -> 바이트 오프셋
+# 청크 본문은 데이터셋(JSONL)에만 저장하고, 조회 시 오프셋으로 해당 줄만 읽습니다.
+INDEX_NAME = "chunk_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE files (rel_path TEXT PRIMARY KEY, filepath TEXT,
+                    baseline_start INTEGER, baseline_end INTEGER, ours_start INTEGER, ours_end INTEGER);
+CREATE TABLE chunks (row INTEGER PRIMARY KEY, id TEXT, parent_component TEXT, type TEXT, line INTEGER, offset INTEGER);
+CREATE TABLE baseline_offsets (row INTEGER PRIMARY KEY, offset INTEGER);
+"""
+# 대량 삽입 후 생성 (삽입 중 인덱스 유지 비용 제거)
+INDEXES = """
+CREATE INDEX files_filepath ON files (filepath);
+CREATE INDEX files_ours_start ON files (ours_start);
+CREATE INDEX chunks_parent ON chunks (parent_component);
+CREATE INDEX chunks_type ON chunks (type);
+"""
+
+class ChunkIndexWriter:
+    """파이프라인이 청크를 기록하는 동안 파일 단위로 행 구간과 오프셋을 함께 기록합니다. (임시 파일 기록 후 교체)"""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".tmp-{self.path.name}")
+        if self.tmp_path.exists(): self.tmp_path.unlink()
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.executescript(SCHEMA)
+
+    def add_file(self, rel_path, baseline_rows, baseline_offsets, our_rows, our_chunks, our_offsets):
+        """
+        파일 1개의 청크 행 구간과 오프셋을 기록합니다.
+        - baseline_rows / our_rows: 데이터셋 내 (시작 행, 끝 행)
+        """
+        self.conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                          (rel_path, Path(rel_path).name, *baseline_rows, *our_rows))
+        self.conn.executemany("INSERT INTO baseline_offsets VALUES (?, ?)",
+                              zip(range(*baseline_rows), baseline_offsets))
+        self.conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)", (
+            (row, c["id"], c.get("parent_component"), c["type"], c.get("line"), offset)
+            for row, c, offset in zip(range(*our_rows), our_chunks, our_offsets)))
+
+    def close(self, datasets):
+        """datasets: {'baseline': 파일 이름, 'ours': 파일 이름}"""
+        self.conn.executemany("INSERT INTO info VALUES (?, ?)", datasets.items())
+        self.conn.executescript(INDEXES)
+        self.conn.commit()
+        self.conn.close()
+        self.tmp_path.replace(self.path)
+
+    def abort(self):
+        self.conn.close()
+        if self.tmp_path.exists(): self.tmp_path.unlink()
+
+class ChunkIndex:
+    """
+    보조 인덱스 기반 조회 API. 데이터셋을 스캔하지 않고 필요한 청크만 오프셋으로 읽습니다.
+    - 파일 -> 청크 구간, 상위 컴포넌트 -> 청크 ID, 청크 유형 -> 청크 ID
+    - 파일 인자는 상대 경로 또는 파일 이름(동명 파일이 여러 개면 모두 포함)을 허용
+    """
+    def __init__(self, data_dir):
+        data_dir = Path(data_dir)
+        path = data_dir / INDEX_NAME
+        if not path.exists():
+            raise FileNotFoundError(f"{path} 을 찾을 수 없습니다. data_pipeline.py를 먼저 실행하십시오.")
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        datasets = dict(self.conn.execute("SELECT key, value FROM info"))
+        self.seekers = {name: ChunkSeeker(data_dir / filename) for name, filename in datasets.items()}
+
+    def close(self):
+        self.conn.close()
+        for seeker in self.seekers.values():
+            seeker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 파일 ---
+    def files(self):
+        """(상대 경로, 파일 이름) 목록 (데이터셋 기록 순서)"""
+        return self.conn.execute("SELECT rel_path, filepath FROM files ORDER BY ours_start, baseline_start").fetchall()
+
+    def file_ranges(self, file, dataset="ours"):
+        """파일의 청크 행 구간 [(시작 행, 끝 행)]"""
+        if dataset not in ("baseline", "ours"): raise ValueError(f"알 수 없는 데이터셋: {dataset}")
+        return self.conn.execute(f"SELECT {dataset}_start, {dataset}_end FROM files WHERE rel_path = ? OR filepath = ?",
+                                 (file, file)).fetchall()
+
+    def file_row_range(self, rel_path, dataset="ours"):
+        """상대 경로가 정확히 일치하는 파일의 청크 행 구간 (시작 행, 끝 행), 없으면 None (파일 이름 매칭 없음)"""
+        if dataset not in ("baseline", "ours"): raise ValueError(f"알 수 없는 데이터셋: {dataset}")
+        return self.conn.execute(f"SELECT {dataset}_start, {dataset}_end FROM files WHERE rel_path = ?",
+                                 (rel_path,)).fetchone()
+
+    def file_chunks(self, file, dataset="ours"):
+        rows = [row for start, end in self.file_ranges(file, dataset) for row in range(start, end)]
+        return self.read_rows(rows, dataset)
+
+    def row_file(self, row):
+        """Proposed 청크 행이 속한 파일의 (상대 경로, 시작 행, 끝 행), 없으면 None"""
+        return self.conn.execute("SELECT rel_path, ours_start, ours_end FROM files WHERE ours_start <= ? AND ? < ours_end "
+                                 "ORDER BY ours_start DESC LIMIT 1", (row, row)).fetchone()
+
+    # --- 상위 컴포넌트 / 유형 ---
+    def component_ids(self, parent_component):
+        return [r[0] for r in self.conn.execute("SELECT id FROM chunks WHERE parent_component = ? ORDER BY row",
+                                                (parent_component,))]
+
+    def component_chunks(self, parent_component):
+        return self.read_rows(self.component_rows(parent_component))
+
+    def component_rows(self, parent_component, row_range=None):
+        """상위 컴포넌트의 청크 행 목록 (row_range: (시작 행, 끝 행)으로 제한, 예: 같은 파일의 동명 컴포넌트만)"""
+        if row_range is None:
+            query, args = "SELECT row FROM chunks WHERE parent_component = ? ORDER BY row", (parent_component,)
+        else:
+            query = "SELECT row FROM chunks WHERE parent_component = ? AND row >= ? AND row < ? ORDER BY row"
+            args = (parent_component, *row_range)
+        return [r[0] for r in self.conn.execute(query, args)]
+
+    def row_parent(self, row):
+        """청크 행의 상위 컴포넌트 (없으면 None)"""
+        result = self.conn.execute("SELECT parent_component FROM chunks WHERE row = ?", (row,)).fetchone()
+        return result[0] if result else None
+
+    def type_ids(self, chunk_type):
+        return [r[0] for r in self.conn.execute("SELECT id FROM chunks WHERE type = ? ORDER BY row", (chunk_type,))]
+
+    def type_counts(self):
+        return dict(self.conn.execute("SELECT type, COUNT(*) FROM chunks GROUP BY type"))
+
+    # --- 본문 읽기 ---
+    def read_rows(self, rows, dataset="ours"):
+        """행 번호 목록의 청크를 오프셋으로 읽어 반환합니다."""
+        if not rows: return []
+        table = "chunks" if dataset == "ours" else "baseline_offsets"
+        offsets = {}
+        for start in range(0, len(rows), 900): # SQLite 바인딩 변수 수 제한
+            batch = rows[start : start + 900]
+            offsets.update(self.conn.execute(
+                f"SELECT row, offset FROM {table} WHERE row IN ({','.join('?' * len(batch))})", batch))
+        return self.seekers[dataset].read([offsets[row] for row in rows])
@@ -1,19 +1,8 @@
 from pathlib import Path
-from tree_sitter import Language, Parser
-import tree_sitter_typescript as tst
+from parsing import parse_file
 
 # --- [설정] 기본 경로 및 파서 설정 ---
 BASE_DIR = Path(__file__).resolve().parent
-TS_LANGUAGE = Language(tst.language_typescript())
-TSX_LANGUAGE = Language(tst.language_tsx())
-
-def get_parser_for_file(filepath):
-    parser = Parser()
-    if str(filepath).endswith(".tsx"):
-        parser.language = TSX_LANGUAGE
-    else:
-        parser.language = TS_LANGUAGE
-    return parser
 
 # --- [타겟 선정] 유의미한 분석 대상 파일 탐색 ---
 # 단순 인덱스(index.tsx) 파일이 아닌, 실제 로직이 포함된 컴포넌트 파일(Button 등)을 우선 탐색
@@ -39,13 +28,9 @@ print(f"[Target] 분석 대상 파일 이름: {target_file.name}")
 print(f"         (경로: {target_file})")
 
 # --- [AST 파싱] ---
-with target_file.open("r", encoding="utf-8") as f:
-    code_text = f.read()
-
-parser = get_parser_for_file(target_file)
-tree = parser.parse(bytes(code_text, "utf8"))
+tree, code_bytes = parse_file(target_file)
 root_node = tree.root_node
-lines = code_text.split('\n')
+lines = code_bytes.decode("utf8").split('\n')
 
 # --- [분석 로직] 주요 구문 구조(Syntactic Structure) 추출 ---
 print("\n[Analysis] 코드의 주요 선언부(Declaration) 식별 시뮬레이션")
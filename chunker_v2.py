@@ -1,19 +1,8 @@
 from pathlib import Path
-from tree_sitter import Language, Parser
-import tree_sitter_typescript as tst
+from parsing import parse_file
 
 # --- [설정] ---
 BASE_DIR = Path(__file__).resolve().parent
-TS_LANGUAGE = Language(tst.language_typescript())
-TSX_LANGUAGE = Language(tst.language_tsx())
-
-def get_parser_for_file(filepath):
-    parser = Parser()
-    if str(filepath).endswith(".tsx"):
-        parser.language = TSX_LANGUAGE
-    else:
-        parser.language = TS_LANGUAGE
-    return parser
 
 # --- [타겟 선정] 복잡도가 높은 파일 탐색 ---
 # Hook 사용 빈도가 높은 파일(예: 'use' 접두사 파일)을 우선 선정하여 분할 성능 테스트
@@ -34,12 +23,8 @@ print(f"[Target] 정밀 분석 대상 경로: {target_file}")
 print(f"[Target] 정밀 분석 대상 이름: {target_file.name}")
 
 # --- [파싱] ---
-with target_file.open("r", encoding="utf-8") as f:
-    code_text = f.read()
-lines = code_text.split('\n')
-code_bytes = bytes(code_text, "utf8")
-parser = get_parser_for_file(target_file)
-tree = parser.parse(code_bytes)
+tree, code_bytes = parse_file(target_file)
+lines = code_bytes.decode("utf8").split('\n')
 
 # --- [분석 로직] 컴포넌트 내부 구조(Internal Structure) 식별 ---
 print("\n[Deep Analysis] 컴포넌트 내부의 논리(Logic) 및 뷰(View) 영역 식별")
@@ -1,20 +1,9 @@
 import json
 from pathlib import Path
-from tree_sitter import Language, Parser
-import tree_sitter_typescript as tst
+from parsing import parse_file
 
 # --- [설정] ---
 BASE_DIR = Path(__file__).resolve().parent
-TS_LANGUAGE = Language(tst.language_typescript())
-TSX_LANGUAGE = Language(tst.language_tsx())
-
-def get_parser_for_file(filepath):
-    parser = Parser()
-    if str(filepath).endswith(".tsx"):
-        parser.language = TSX_LANGUAGE
-    else:
-        parser.language = TS_LANGUAGE
-    return parser
 
 # --- [타겟 선정] ---
 # 실제 소스 코드(Source Code)만을 대상으로 함 (테스트, 인덱스, 데모 제외)
@@ -36,12 +25,8 @@ print(f"[Target] 최종 알고리즘 적용 대상 이름: {target_file.name}")
 print("-" * 70)
 
 # --- [파싱] ---
-with target_file.open("r", encoding="utf-8") as f:
-    code_text = f.read()
-lines = code_text.split('\n')
-code_bytes = bytes(code_text, "utf8")
-parser = get_parser_for_file(target_file)
-tree = parser.parse(code_bytes)
+tree, code_bytes = parse_file(target_file)
+lines = code_bytes.decode("utf8").split('\n')
 
 # --- [제안 알고리즘: AST-based Chunking with Metadata] ---
 chunks = []
@@ -1,20 +1,17 @@
-import json
 import random
 from pathlib import Path
+from chunk_index import ChunkIndex
 
 # --- [설정] 파일 경로 설정 ---
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "dataset"
 
 def load_data():
-    """구축된 데이터셋(JSON)을 메모리로 로드합니다."""
-    # 1. Baseline 데이터 로드
-    with (DATA_DIR / "dataset_baseline.json").open("r", encoding="utf-8") as f:
-        baseline = json.load(f)
-    # 2. 제안 방법(Ours) 데이터 로드
-    with (DATA_DIR / "dataset_ours.json").open("r", encoding="utf-8") as f:
-        ours = json.load(f)
-    return baseline, ours
+    """
+    구축된 데이터셋의 보조 인덱스(ChunkIndex)를 반환합니다.
+    파일 단위 청크는 인덱스의 행 구간/오프셋으로 해당 줄만 읽으므로 데이터셋 전체를 스캔하지 않습니다.
+    """
+    return ChunkIndex(DATA_DIR)
 
 def print_separator(char="=", length=80):
     """구분선을 출력하여 가독성을 높입니다."""
@@ -25,11 +22,12 @@ def compare_academic_view():
     논문 삽입용(Figure 1) 비교 결과를 출력하는 메인 함수입니다.
     무작위로 하나의 파일을 선정하여 두 가지 청킹 방식의 결과를 대조합니다.
     """
-    base_data, our_data = load_data()
+    index = load_data()
     
     # [타겟 선정] 비교 효과가 좋은 복잡한 파일(Hook이나 Provider 포함)을 우선 탐색
-    target_files = list(set(d['filepath'] for d in our_data))
-    candidates = [f for f in target_files if "use" in f or "Provider" in f]
+    target_files = [rel_path for rel_path, _ in index.files()]
+    # 상대 경로의 디렉토리 이름(예: use-button/)이 아닌 파일 이름으로 판별
+    candidates = [f for f in target_files if "use" in Path(f).name or "Provider" in Path(f).name]
     
     # 후보가 없으면 전체 파일 중 선택
     if not candidates: candidates = target_files
@@ -48,7 +46,7 @@ def compare_academic_view():
     print(f"\n (a) 기존 고정 크기 청킹 방식 (Baseline, Chunk Size=500)")
     print_separator("-")
     
-    base_chunks = [d for d in base_data if d['filepath'] == target_file]
+    base_chunks = index.file_chunks(target_file, "baseline")
     
     # 지면 관계상 상위 3개 청크만 출력
     for i, chunk in enumerate(base_chunks[:3]): 
@@ -72,12 +70,13 @@ def compare_academic_view():
     print(f" (b) 제안하는 AST 기반 의미론적 청킹 (Proposed Method)")
     print_separator("-")
     
-    our_chunks = [d for d in our_data if d['filepath'] == target_file]
+    our_chunks = index.file_chunks(target_file)
     
     for i, chunk in enumerate(our_chunks):
         # 학술적 용어로 라벨링 변경
         category = chunk['type']
-        if "Hook" in category: category_label = "로직 단위 (Hook)"
+        if "Hook Definition" in category: category_label = "로직 정의부 (Custom Hook)"
+        elif "Hook" in category: category_label = "로직 단위 (Hook)"
         elif "JSX" in category: category_label = "뷰 단위 (JSX)"
         else: category_label = "컴포넌트 선언부 (Signature)"
         
@@ -91,6 +90,7 @@ def compare_academic_view():
     print(f"  ... (총 {len(our_chunks)}개의 의미론적 청크 생성됨)")
     print_separator("=")
     print("\n")
+    index.close()
 
 if __name__ == "__main__":
     compare_academic_view()
\ No newline at end of file
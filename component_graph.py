@@ -0,0 +1,377 @@
+import argparse
+import json
+import posixpath
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import data_pipeline
+from chunk_index import ChunkIndex
+from data_pipeline import COMPONENT_DECL_TYPES, HOOK_NAME_PATTERN, classify_declaration, collect_target_files, init_worker
+from parsing import EXTENSION_LANGUAGES, parse_file
+from retrieval import open_store
+
+# --- [설정] ---
+GRAPH_INFO_NAME = "component_graph.json" # 노드 목록 (rel_path, 이름, 종류, 줄) + 통계
+GRAPH_ARRAYS_NAME = "component_graph.npz" # CSR 인접 배열 (indptr, indices, edge_types)
+
+EDGE_TYPES = ("renders", "uses_hook", "imports") # JSX 자식 렌더링 / 커스텀 Hook 호출 / import 의존
+RENDERS, USES_HOOK, IMPORTS = range(len(EDGE_TYPES))
+MODULE_SUFFIXES = [""] + list(EXTENSION_LANGUAGES) + [f"/index{ext}" for ext in EXTENSION_LANGUAGES]
+JSX_TAG_TYPES = ("jsx_opening_element", "jsx_self_closing_element")
+
+# --- [추출] 파일 단위 정의/참조/import/export 수집 (단일 순회) ---
+def _string_value(node, source):
+    text = str(source[node.start_byte : node.end_byte], "utf8")
+    return text[1:-1] if len(text) >= 2 and text[0] in "'\"`" else text
+
+def _name_path(node, source):
+    """JSX 태그/호출 대상 이름을 경로 튜플로 변환합니다. (Select.Root -> ("Select", "Root"))"""
+    if node.type in ("identifier", "jsx_identifier", "property_identifier", "type_identifier"):
+        return (str(source[node.start_byte : node.end_byte], "utf8"),)
+    if node.type in ("member_expression", "nested_identifier"):
+        obj = node.child_by_field_name("object") or node.children[0]
+        prop = node.child_by_field_name("property") or node.children[-1]
+        head = _name_path(obj, source)
+        return head + _name_path(prop, source) if head else None
+    return None
+
+def extract_file(filepath, rel_path):
+    """
+    파일 1개에서 그래프 구성 정보를 추출합니다. (워커 프로세스에서 실행, 결과는 pickle 가능한 dict)
+    - definitions: [(이름, 종류, 줄)] - chunk_ours와 같은 규칙의 컴포넌트/커스텀 Hook 선언
+    - refs: [(정의 순번, 간선 유형, 이름 경로)] - 가장 안쪽 정의 기준 JSX 자식/Hook 호출
+    - imports: {지역 이름: (모듈 지정자, 가져온 이름 | "default" | "*")}
+    - exports: {내보낸 이름: (모듈 지정자 | None, 원래 이름 | "*")}, star_exports: [모듈 지정자]
+    """
+    try:
+        tree, source = parse_file(filepath)
+    except Exception:
+        return None
+    info = {"rel_path": rel_path, "definitions": [], "refs": [], "imports": {}, "exports": {}, "star_exports": []}
+    stack = [] # (선언 깊이, 정의 순번)
+
+    def handle_import(node):
+        spec = node.child_by_field_name("source")
+        if spec is None: return
+        module = _string_value(spec, source)
+        for clause in node.children:
+            if clause.type != "import_clause": continue
+            for part in clause.children:
+                if part.type == "identifier":
+                    info["imports"][_string_value(part, source)] = (module, "default")
+                elif part.type == "namespace_import":
+                    for n in part.children:
+                        if n.type == "identifier": info["imports"][_string_value(n, source)] = (module, "*")
+                elif part.type == "named_imports":
+                    for spec_node in part.children:
+                        if spec_node.type != "import_specifier": continue
+                        name = spec_node.child_by_field_name("name")
+                        alias = spec_node.child_by_field_name("alias") or name
+                        info["imports"][_string_value(alias, source)] = (module, _string_value(name, source))
+
+    def handle_export(node):
+        spec = node.child_by_field_name("source")
+        module = _string_value(spec, source) if spec is not None else None
+        declaration = node.child_by_field_name("declaration")
+        value = node.child_by_field_name("value")
+        is_default = any(c.type == "default" for c in node.children)
+        if declaration is not None and declaration.type in COMPONENT_DECL_TYPES:
+            name, _ = classify_declaration(declaration, source)
+            info["exports"][name] = (None, name)
+            if is_default: info["exports"]["default"] = (None, name)
+        elif is_default and value is not None and value.type == "identifier":
+            info["exports"]["default"] = (None, _string_value(value, source))
+        for child in node.children:
+            if child.type == "export_clause":
+                for spec_node in child.children:
+                    if spec_node.type != "export_specifier": continue
+                    name = spec_node.child_by_field_name("name")
+                    alias = spec_node.child_by_field_name("alias") or name
+                    info["exports"][_string_value(alias, source)] = (module, _string_value(name, source))
+            elif child.type == "namespace_export" and module:
+                for n in child.children:
+                    if n.type in ("identifier", "string"): info["exports"][_string_value(n, source)] = (module, "*")
+            elif child.type == "*" and module and not any(c.type == "namespace_export" for c in node.children):
+                info["star_exports"].append(module)
+
+    def visit(node, depth):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        node_type = node.type
+        if node_type == "import_statement":
+            handle_import(node)
+        elif node_type == "export_statement":
+            handle_export(node)
+        elif node_type in COMPONENT_DECL_TYPES:
+            name, kind = classify_declaration(node, source)
+            if kind:
+                stack.append((depth, len(info["definitions"])))
+                info["definitions"].append((name, kind, node.start_point[0] + 1))
+        elif stack and node_type in JSX_TAG_TYPES:
+            path = _name_path(node.child_by_field_name("name"), source) if node.child_by_field_name("name") else None
+            # 소문자 단일 이름은 HTML 내장 요소
+            if path and not (len(path) == 1 and path[0][:1].islower()):
+                info["refs"].append((stack[-1][1], RENDERS, path))
+        elif stack and node_type == "call_expression":
+            callee = node.child_by_field_name("function")
+            path = _name_path(callee, source) if callee is not None else None
+            if path and HOOK_NAME_PATTERN.match(path[-1]):
+                info["refs"].append((stack[-1][1], USES_HOOK, path))
+
+    cursor = tree.walk()
+    depth = 0
+    finished = False
+    while not finished:
+        visit(cursor.node, depth)
+        if cursor.goto_first_child():
+            depth += 1
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                finished = True
+                break
+            depth -= 1
+    return info
+
+def _extract_args(args):
+    return extract_file(*args)
+
+# --- [이름 해석] import/export를 따라 파일 간 심볼 연결 ---
+class SymbolResolver:
+    """
+    (파일, 이름) -> 노드 번호 해석기.
+    1) 같은 파일의 정의  2) import 문을 따라 대상 모듈의 export(재내보내기/export * 포함)
+    3) 상대 경로가 아닌 패키지 import 등 해석 실패 시 코퍼스 전체에서 유일한 이름이면 해당 정의로 연결
+    """
+    def __init__(self, infos):
+        self.infos = {info["rel_path"]: info for info in infos}
+        self.nodes = []
+        self.local = {} # rel_path -> {이름: 노드 번호}
+        by_name = {}
+        for info in infos:
+            table = self.local[info["rel_path"]] = {}
+            for name, kind, line in info["definitions"]:
+                table.setdefault(name, len(self.nodes))
+                by_name.setdefault(name, []).append(len(self.nodes))
+                self.nodes.append((info["rel_path"], name, kind, line))
+        self.unique = {name: ids[0] for name, ids in by_name.items() if len(ids) == 1}
+
+    def resolve_module(self, rel_path, specifier):
+        if not specifier.startswith("."): return None
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(rel_path), specifier))
+        for suffix in MODULE_SUFFIXES:
+            if base + suffix in self.infos: return base + suffix
+        return None
+
+    def resolve_export(self, module, name, depth=0):
+        """모듈이 내보내는 name을 노드 번호(int) 또는 네임스페이스(("module", 경로))로 해석합니다."""
+        if module is None or depth > 8: return None
+        info = self.infos[module]
+        exported = info["exports"].get(name)
+        if exported:
+            specifier, original = exported
+            if specifier is None:
+                return self.resolve_local(module, (original,), depth + 1)
+            target = self.resolve_module(module, specifier)
+            if original == "*": return ("module", target) if target else None
+            return self.resolve_export(target, original, depth + 1)
+        if name in self.local[module]: return self.local[module][name]
+        for specifier in info["star_exports"]:
+            found = self.resolve_export(self.resolve_module(module, specifier), name, depth + 1)
+            if found is not None: return found
+        return None
+
+    def resolve_local(self, rel_path, path, depth=0):
+        """파일 안에서 쓰인 이름 경로(예: ("Select", "Root"))를 노드 번호로 해석합니다."""
+        head, rest = path[0], path[1:]
+        target = self.local[rel_path].get(head)
+        if target is None and head in self.infos[rel_path]["imports"]:
+            specifier, imported = self.infos[rel_path]["imports"][head]
+            module = self.resolve_module(rel_path, specifier)
+            target = ("module", module) if imported == "*" and module else self.resolve_export(module, imported, depth + 1)
+        for name in rest:
+            if not (isinstance(target, tuple) and target[1]): return None
+            target = self.resolve_export(target[1], name, depth + 1)
+        return target if isinstance(target, int) else None
+
+    def resolve(self, rel_path, path):
+        found = self.resolve_local(rel_path, path)
+        if found is None:
+            # 해석 실패 시: 마지막 이름 또는 결합 이름(Select.Root -> SelectRoot)이 코퍼스에서 유일하면 연결
+            found = self.unique.get(path[-1]) if len(path) == 1 else self.unique.get("".join(path))
+        return found
+
+# --- [그래프 구축] CSR 인접 배열 ---
+def build_graph(search_dir, target_files, workers=1):
+    """대상 파일에서 컴포넌트 의존 그래프를 구축합니다. 반환: (노드 목록, indptr, indices, edge_types, 통계)"""
+    jobs = [(path, path.relative_to(search_dir).as_posix()) for path in target_files]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            infos = list(executor.map(_extract_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        init_worker()
+        infos = [_extract_args(job) for job in jobs]
+    infos = [info for info in infos if info]
+
+    resolver = SymbolResolver(infos)
+    edges = set()
+    unresolved = 0
+    for info in infos:
+        rel_path = info["rel_path"]
+        def_nodes = [resolver.local[rel_path].get(name) for name, _, _ in info["definitions"]]
+        for def_index, edge_type, path in info["refs"]:
+            target = resolver.resolve(rel_path, path)
+            if target is None:
+                unresolved += 1
+            elif target != def_nodes[def_index]:
+                edges.add((def_nodes[def_index], target, edge_type))
+        # import 의존: 파일의 모든 정의 -> import로 가져온 코퍼스 내 심볼 (더 구체적인 간선이 없을 때만)
+        imported = {resolver.resolve_local(rel_path, (name,)) for name in info["imports"]} - {None}
+        specific = {(src, dst) for src, dst, _ in edges}
+        for src in set(def_nodes) - {None}:
+            for dst in imported:
+                if dst != src and (src, dst) not in specific:
+                    edges.add((src, dst, IMPORTS))
+
+    edge_array = np.array(sorted(edges), dtype=np.int64).reshape(-1, 3)
+    counts = np.bincount(edge_array[:, 0], minlength=len(resolver.nodes)) if len(edge_array) else \
+        np.zeros(len(resolver.nodes), dtype=np.int64)
+    indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    stats = {"files": len(infos), "nodes": len(resolver.nodes), "edges": len(edge_array), "unresolved_refs": unresolved,
+             "edges_by_type": {t: int((edge_array[:, 2] == i).sum()) for i, t in enumerate(EDGE_TYPES)}}
+    return resolver.nodes, indptr, edge_array[:, 1].astype(np.int32), edge_array[:, 2].astype(np.int8), stats
+
+def save_graph(output_dir, nodes, indptr, indices, edge_types, stats):
+    output_dir = Path(output_dir)
+    np.savez(output_dir / GRAPH_ARRAYS_NAME, indptr=indptr, indices=indices, edge_types=edge_types)
+    with (output_dir / GRAPH_INFO_NAME).open("w", encoding="utf-8") as f:
+        json.dump({"edge_types": EDGE_TYPES, "stats": stats, "nodes": nodes}, f, ensure_ascii=False)
+
+# --- [조회] ---
+class ComponentGraph:
+    """
+    저장된 CSR 인접 배열 위에서 이웃/다중 홉 탐색을 수행합니다. (질의 시 소스 파일 재탐색 없음)
+    역방향 간선(사용처)은 로드 시 CSR로 1회 구성합니다.
+    """
+    def __init__(self, output_dir):
+        output_dir = Path(output_dir)
+        with (output_dir / GRAPH_INFO_NAME).open("r", encoding="utf-8") as f:
+            info = json.load(f)
+        self.nodes = [tuple(node) for node in info["nodes"]]
+        self.stats = info["stats"]
+        arrays = np.load(output_dir / GRAPH_ARRAYS_NAME)
+        self.indptr, self.indices, self.edge_types = arrays["indptr"], arrays["indices"], arrays["edge_types"]
+        sources = np.repeat(np.arange(len(self.nodes)), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        self.rev_indices = sources[order].astype(np.int32)
+        self.rev_types = self.edge_types[order]
+        self.rev_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=len(self.nodes)))))
+        # (상대 경로, 심볼 이름) -> 노드 번호 (청크 메타데이터의 filepath는 파일 이름뿐이므로 상대 경로는 청크 인덱스에서 조회)
+        self.by_chunk_key = {}
+        for node_id, (rel_path, name, _, _) in enumerate(self.nodes):
+            self.by_chunk_key.setdefault((rel_path, name), []).append(node_id)
+
+    def neighbors(self, node_id, reverse=False):
+        """[(이웃 노드, 간선 유형)]"""
+        indptr, indices, types = ((self.rev_indptr, self.rev_indices, self.rev_types) if reverse
+                                  else (self.indptr, self.indices, self.edge_types))
+        start, end = indptr[node_id], indptr[node_id + 1]
+        return list(zip(indices[start:end].tolist(), types[start:end].tolist()))
+
+    def expand(self, seeds, hops=1, reverse=False):
+        """시드 노드에서 hops 이내로 도달하는 노드의 {노드: 홉 수} (시드 제외)"""
+        seen = {seed: 0 for seed in seeds}
+        frontier = list(seeds)
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for node_id in frontier:
+                for neighbor, _ in self.neighbors(node_id, reverse):
+                    if neighbor not in seen:
+                        seen[neighbor] = hop
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return {node_id: hop for node_id, hop in seen.items() if hop}
+
+    def nodes_for_chunk(self, rel_path, chunk):
+        """rel_path 파일에 있는 청크의 상위 컴포넌트/Hook 노드 (다른 디렉토리의 같은 이름 파일 제외)"""
+        return self.by_chunk_key.get((rel_path, chunk.get("parent_component")), [])
+
+# --- [그래프 확장 검색] ---
+DEFINING_TYPES = {"component": "Component Signature", "hook": "Logic (Hook Definition)"}
+
+def expanded_search(store, graph, chunk_index, query, k=5, hops=1, decay=0.5):
+    """
+    벡터 검색 상위 k개의 상위 컴포넌트에서 그래프를 hops만큼 확장하여,
+    도달한 컴포넌트/Hook의 정의 청크(Signature / Hook Definition)를 점수 감쇠(decay^홉)와 함께 덧붙입니다.
+    반환: [(점수, 청크, 홉 수)] (직접 검색 결과는 홉 0)
+    """
+    # 검색 결과 행이 속한 파일의 상대 경로는 청크 인덱스의 행 구간으로 조회 (인덱스와 데이터셋의 행 순서가 같음)
+    hits = []
+    for row, score in store.search_rows([query], k)[0]:
+        file_row = chunk_index.row_file(row)
+        hits.append((score, store.metadata(row), file_row[0] if file_row else None))
+    results = [(score, chunk, 0) for score, chunk, _ in hits]
+    seen_ids = {(rel_path, chunk["id"]) for _, chunk, rel_path in hits}
+    expanded = {}
+    for score, chunk, rel_path in hits:
+        for node_id, hop in graph.expand(graph.nodes_for_chunk(rel_path, chunk), hops).items():
+            # 점수가 가장 높은 경로의 (점수, 홉 수)를 함께 유지 (동점이면 짧은 경로)
+            expanded[node_id] = max(expanded.get(node_id, (0, hop)), (score * decay ** hop, hop),
+                                    key=lambda item: (item[0], -item[1]))
+
+    for node_id, (score, hop) in sorted(expanded.items(), key=lambda item: -item[1][0]):
+        rel_path, name, kind, line = graph.nodes[node_id]
+        # 노드가 정의된 파일의 행 구간으로 제한 (다른 파일의 동명 컴포넌트/Hook 제외)
+        row_range = chunk_index.file_row_range(rel_path)
+        if row_range is None: continue
+        for chunk in chunk_index.read_rows(chunk_index.component_rows(name, row_range)):
+            if chunk["type"] == DEFINING_TYPES[kind] and chunk["line"] == line:
+                if (rel_path, chunk["id"]) not in seen_ids:
+                    seen_ids.add((rel_path, chunk["id"]))
+                    results.append((score, chunk, hop))
+                break
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="컴포넌트 의존 그래프 (import / JSX 자식 / Hook 호출)")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="코퍼스 전체에서 그래프 구축")
+    build_cmd.add_argument("--workers", type=int, default=1)
+    show_cmd = sub.add_parser("show", help="심볼의 이웃 출력")
+    show_cmd.add_argument("name")
+    query_cmd = sub.add_parser("query", help="그래프 확장 검색")
+    query_cmd.add_argument("text")
+    query_cmd.add_argument("-k", type=int, default=5)
+    query_cmd.add_argument("--hops", type=int, choices=[1, 2], default=1)
+    args = arg_parser.parse_args()
+
+    output_dir = data_pipeline.BASE_DIR / "dataset"
+    if args.command == "build":
+        start = time.perf_counter()
+        search_dir = data_pipeline.get_search_dir()
+        output_dir.mkdir(exist_ok=True)
+        *graph, stats = build_graph(search_dir, collect_target_files(search_dir), workers=args.workers)
+        save_graph(output_dir, *graph, stats)
+        print(f"[Success] 그래프 구축 완료: 노드 {stats['nodes']}개, 간선 {stats['edges']}개 {stats['edges_by_type']}, "
+              f"미해석 참조 {stats['unresolved_refs']}개, {time.perf_counter() - start:.2f}s")
+    elif args.command == "show":
+        graph = ComponentGraph(output_dir)
+        for node_id, (rel_path, name, kind, line) in enumerate(graph.nodes):
+            if name != args.name: continue
+            print(f"[{kind}] {name} ({rel_path}:{line})")
+            for label, reverse in (("->", False), ("<-", True)):
+                for neighbor, edge_type in graph.neighbors(node_id, reverse):
+                    n_path, n_name, n_kind, _ = graph.nodes[neighbor]
+                    print(f"   {label} {EDGE_TYPES[edge_type]:<10} {n_name} ({n_kind}, {n_path})")
+    else:
+        graph, store = ComponentGraph(output_dir), open_store("ours")
+        with ChunkIndex(output_dir) as chunk_index:
+            for score, chunk, hop in expanded_search(store, graph, chunk_index, args.text, args.k, args.hops):
+                content = str(chunk["content"]).replace("\n", " ")
+                print(f"  {'+' * hop or '*'} {score:.3f} {chunk.get('filepath')} / {chunk['parent_component']} ({chunk['type']})")
+                print(f"      내용: \"{content[:75]}{'...' if len(content) > 75 else ''}\"")
+        store.close()
+
+if __name__ == "__main__":
+    main()
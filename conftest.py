@@ -0,0 +1,4 @@
+# --- [pytest 설정] ---
+# 루트의 test_parser.py는 import 시점에 실행되는 파싱 확인 스크립트이므로 테스트 수집에서 제외
+# (루트 conftest.py 위치가 sys.path에 추가되어 tests/에서 최상위 모듈을 바로 import 가능)
+collect_ignore = ["test_parser.py"]
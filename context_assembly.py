@@ -0,0 +1,190 @@
+import argparse
+import json
+import time
+from functools import lru_cache
+import numpy as np
+from chunk_index import ChunkIndex
+from data_pipeline import TOKEN_PATTERN
+from lexical_index import SEARCH_MODES, LexicalIndex, check_aligned, search_rows, symbol_queries
+from retrieval import DATA_DIR, INDEX_DIR, VectorStore
+
+# --- [설정] 검색 결과 -> 토큰 예산 내 프롬프트 문맥 조립 ---
+# 검색된 청크마다 같은 파일의 같은 상위 컴포넌트 청크(선언부, 형제 Hook, JSX 반환부)를 보조 인덱스의
+# 상위 컴포넌트 -> 행 인덱스로 가져와 함께 배치합니다. (데이터셋 재스캔 없음)
+# 예산 배분 우선순위: 검색된 청크 -> 선언부 -> Hook 정의/호출 -> JSX 반환부 (각 단계는 검색 순위 순으로 컴포넌트 순회)
+# 출력 순서: 컴포넌트는 처음 검색된 순위 순, 컴포넌트 안에서는 역할 순 -> 줄 순
+ROLE_ORDER = {"Component Signature": 0, "Logic (Hook Definition)": 1, "Logic (Hook)": 1, "View (JSX)": 2}
+DEFAULT_CONTEXT_BUDGET = 2048 # 문맥 토큰 예산 (data_pipeline.TOKEN_PATTERN 기준)
+DEFAULT_CONTEXT_CACHE = 256   # 조립된 컴포넌트 문맥 LRU 캐시 항목 수
+
+def count_tokens(text):
+    return len(TOKEN_PATTERN.findall(text))
+
+def render_header(rel_path, parent_component):
+    return f"// ===== {rel_path} :: {parent_component or '-'} =====\n"
+
+def render_chunk(chunk):
+    return f"// [{chunk['type']}] L{chunk.get('line')}\n{chunk['content']}\n"
+
+class ContextAssembler:
+    """
+    검색 결과 행 목록을 토큰 예산 안의 문맥 텍스트로 조립합니다.
+    - 컴포넌트 문맥((파일, 상위 컴포넌트) -> 역할/줄 순 정렬된 청크와 토큰 수)은 LRU 캐시로 재사용
+    - 같은 행 또는 같은 본문의 청크(중첩 컴포넌트의 분할 조각, 반복되는 Hook 호출 등)는 1회만 포함
+    """
+    def __init__(self, data_dir=DATA_DIR, cache_size=DEFAULT_CONTEXT_CACHE):
+        self.index = ChunkIndex(data_dir)
+        self.component_context = lru_cache(maxsize=cache_size)(self._load_component)
+        self.latencies = []
+        self.utilizations = []
+        self._cache_base = (0, 0) # reset_stats 시점의 캐시 (적중, 미적중) 수
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_component(self, rel_path, parent_component, row_range):
+        """(파일, 상위 컴포넌트)의 청크를 ((행, 청크, 렌더링 토큰 수), ...)로 반환합니다. (역할 순 -> 줄 순)"""
+        rows = self.index.component_rows(parent_component, row_range)
+        items = [(row, chunk, count_tokens(render_chunk(chunk))) for row, chunk in zip(rows, self.index.read_rows(rows))]
+        items.sort(key=lambda item: (ROLE_ORDER.get(item[1]["type"], len(ROLE_ORDER)), item[1].get("line") or 0, item[0]))
+        return tuple(items)
+
+    def _group(self, row):
+        """검색된 행의 컴포넌트 문맥 키와 청크 목록"""
+        rel_path, start, end = self.index.row_file(row)
+        parent_component = self.index.row_parent(row)
+        if parent_component is None: # 상위 컴포넌트가 없는 청크는 단독 그룹
+            chunk = self.index.read_rows([row])[0]
+            return (rel_path, None, row), ((row, chunk, count_tokens(render_chunk(chunk))),)
+        return (rel_path, parent_component), self.component_context(rel_path, parent_component, (start, end))
+
+    def assemble(self, rows, budget=DEFAULT_CONTEXT_BUDGET):
+        """
+        검색 순위 순 행 목록을 문맥으로 조립합니다.
+        반환: {"text", "chunks", "rows", "tokens", "budget", "utilization", "components", "dropped", "latency_ms"}
+        - tokens: text의 토큰 수 (컴포넌트 머리말 포함), dropped: 예산 부족으로 제외된 후보 청크 수
+        """
+        started = time.perf_counter()
+        groups = {} # 컴포넌트 키 -> 청크 목록 (검색 순위 순 삽입)
+        hit_groups = []
+        for row in dict.fromkeys(rows):
+            key, items = self._group(row)
+            groups.setdefault(key, items)
+            hit_groups.append((key, row))
+
+        selected = {key: set() for key in groups} # 컴포넌트 키 -> 선택된 행
+        seen_contents = set()
+        used, dropped = 0, 0
+
+        def take(key, item):
+            nonlocal used, dropped
+            row, chunk, tokens = item
+            content = str(chunk["content"])
+            if row in selected[key] or content in seen_contents: return
+            cost = tokens + (0 if selected[key] else count_tokens(render_header(key[0], key[1])))
+            if used + cost > budget:
+                dropped += 1
+                return
+            used += cost
+            selected[key].add(row)
+            seen_contents.add(content)
+
+        # 1. 검색된 청크 (순위 순) / 2. 역할 우선순위별로 컴포넌트를 순위 순 순회
+        for key, row in hit_groups:
+            take(key, next(item for item in groups[key] if item[0] == row))
+        for role in sorted(set(ROLE_ORDER.values())) + [len(ROLE_ORDER)]:
+            for key, items in groups.items():
+                for item in items:
+                    if ROLE_ORDER.get(item[1]["type"], len(ROLE_ORDER)) == role: take(key, item)
+
+        parts, chunks, chosen_rows = [], [], []
+        for key, items in groups.items():
+            if not selected[key]: continue
+            parts.append(render_header(key[0], key[1]))
+            for row, chunk, _ in items:
+                if row in selected[key]:
+                    parts.append(render_chunk(chunk))
+                    chunks.append(chunk)
+                    chosen_rows.append(row)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        utilization = used / budget if budget else 0.0
+        self.latencies.append(latency_ms)
+        self.utilizations.append(utilization)
+        return {"text": "".join(parts), "chunks": chunks, "rows": chosen_rows, "tokens": used, "budget": budget,
+                "utilization": utilization, "components": sum(bool(s) for s in selected.values()),
+                "dropped": dropped, "latency_ms": latency_ms}
+
+    def stats(self):
+        """조립 지연 시간(p50/p99), 평균 예산 사용률, 컴포넌트 문맥 캐시 적중률"""
+        info = self.component_context.cache_info()
+        hits, misses = info.hits - self._cache_base[0], info.misses - self._cache_base[1]
+        lookups = hits + misses
+        return {"assembled": len(self.latencies),
+                "p50_ms": float(np.percentile(self.latencies, 50)) if self.latencies else 0.0,
+                "p99_ms": float(np.percentile(self.latencies, 99)) if self.latencies else 0.0,
+                "mean_utilization": float(np.mean(self.utilizations)) if self.utilizations else 0.0,
+                "cache_hit_rate": hits / lookups if lookups else 0.0, "cache_entries": info.currsize}
+
+    def reset_stats(self):
+        """지표 초기화 (캐시 내용은 유지)"""
+        self.latencies.clear()
+        self.utilizations.clear()
+        info = self.component_context.cache_info()
+        self._cache_base = (info.hits, info.misses)
+
+# --- [성능 측정] ---
+def benchmark(assembler, lexical, store, queries, mode="lexical", k=5, budget=DEFAULT_CONTEXT_BUDGET):
+    """심볼 질의의 검색 결과로 문맥을 두 번 조립하여 캐시 미적중(cold) / 적중(warm) 지연 시간과 예산 사용률을 측정합니다."""
+    hits = [[row for row, _ in result] for result in search_rows(mode, queries, k, lexical, store)]
+    report = {"queries": len(queries), "mode": mode, "k": k, "budget": budget}
+    for phase in ("cold", "warm"):
+        assembler.reset_stats()
+        for rows in hits:
+            assembler.assemble(rows, budget)
+        report[phase] = assembler.stats()
+    return report
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="검색 결과의 토큰 예산 문맥 조립")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    query_cmd = sub.add_parser("query", help="검색 후 문맥 조립 결과 출력")
+    query_cmd.add_argument("text")
+    bench_cmd = sub.add_parser("bench", help="조립 지연 시간 / 예산 사용률 / 캐시 적중률 측정")
+    bench_cmd.add_argument("--queries", type=int, default=200)
+    for cmd in (query_cmd, bench_cmd):
+        cmd.add_argument("--mode", choices=SEARCH_MODES, default="lexical",
+                         help="검색 방식 (vector/hybrid는 retrieval.py build --dataset ours 필요)")
+        cmd.add_argument("-k", type=int, default=5, help="문맥에 포함할 검색 결과 수")
+        cmd.add_argument("--budget", type=int, default=DEFAULT_CONTEXT_BUDGET, help="문맥 토큰 예산")
+        cmd.add_argument("--cache-size", type=int, default=DEFAULT_CONTEXT_CACHE, help="컴포넌트 문맥 LRU 캐시 항목 수")
+    args = arg_parser.parse_args()
+
+    lexical = LexicalIndex(DATA_DIR)
+    store = None
+    if args.mode != "lexical":
+        store = VectorStore(INDEX_DIR / "ours")
+        check_aligned(lexical, store)
+    with ContextAssembler(DATA_DIR, args.cache_size) as assembler:
+        if args.command == "query":
+            rows = [row for row, _ in search_rows(args.mode, [args.text], args.k, lexical, store)[0]]
+            result = assembler.assemble(rows, args.budget)
+            print(result["text"])
+            print(f"[Context] 컴포넌트 {result['components']}개 / 청크 {len(result['chunks'])}개, "
+                  f"토큰 {result['tokens']}/{result['budget']} (사용률 {result['utilization']:.1%}), "
+                  f"예산 초과 제외 {result['dropped']}개, {result['latency_ms']:.2f}ms")
+        else:
+            queries = symbol_queries(lexical, args.queries)
+            print(json.dumps(benchmark(assembler, lexical, store, queries, args.mode, args.k, args.budget),
+                             ensure_ascii=False, indent=2))
+    lexical.close()
+    if store: store.close()
+
+if __name__ == "__main__":
+    main()
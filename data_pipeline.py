@@ -1,20 +1,27 @@
+import argparse
+import hashlib
 import json
+import os
+import re
+import shutil
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
-from tree_sitter import Language, Parser
-import tree_sitter_typescript as tst
+import numpy as np
+from chunk_cache import CACHE_NAME, DEFAULT_CACHE_MAX_BYTES, ChunkCache, cache_key, source_fingerprint
+from chunk_index import INDEX_NAME, ChunkIndexWriter
+from chunk_dedup import OCCURRENCE_DATASET, UNIQUE_DATASET, dedup_dataset
+from dataset_io import COMPRESSION_SUFFIXES, ChunkWriter, dataset_path, iter_chunks
+from file_discovery import DEFAULT_DISCOVERY_CONFIG, iter_source_files
+from lexical_index import LEXICAL_DIR_NAME, LexicalIndexWriter
+from parsing import LANGUAGES, get_parser, get_parser_for_file, grammar_version, language_for_file, read_source
+from pipeline_profiler import FileTimer, PipelineProfiler
 
 # --- [설정] ---
 BASE_DIR = Path(__file__).resolve().parent
-TS_LANGUAGE = Language(tst.language_typescript())
-TSX_LANGUAGE = Language(tst.language_tsx())
-
-def get_parser_for_file(filepath):
-    parser = Parser()
-    if str(filepath).endswith(".tsx"):
-        parser.language = TSX_LANGUAGE
-    else:
-        parser.language = TS_LANGUAGE
-    return parser
 
 # --- [Baseline Algorithm] 고정 크기 청킹 (Fixed-size Chunking) ---
 def chunk_baseline(code, chunk_size=500, overlap=50):
@@ -34,149 +41,837 @@ def chunk_baseline(code, chunk_size=500, overlap=50):
         })
     return chunks
 
+# --- [Baseline Algorithm] 토큰 단위 고정 크기 청킹 (Token-aware Fixed-size Chunking) ---
+# 임베딩 모델의 토큰 예산을 근사하는 코드 토크나이저: 식별자 / 숫자 / 공백이 아닌 단일 기호
+TOKEN_PATTERN = re.compile(r"[A-Za-z_$][\w$]*|\d+(?:\.\d+)?|\S")
+BASELINE_MODES = ("chars", "tokens", "lines")
+DEFAULT_BASELINE_CONFIG = {"mode": "chars", "chunk_tokens": 128, "overlap_tokens": 16, "min_tokens": 8}
+
+def token_offsets(code):
+    """코드를 1회 토큰화하여 토큰별 (시작, 끝) 문자 오프셋 배열(shape=(N, 2))을 반환합니다."""
+    spans = [m.span() for m in TOKEN_PATTERN.finditer(code)]
+    return np.array(spans, dtype=np.int64).reshape(-1, 2)
+
+def chunk_baseline_tokens(code, chunk_tokens=128, overlap_tokens=16, min_tokens=8, align_lines=False):
+    """
+    토큰 수 기준으로 고정 크기 윈도우를 배치합니다. 윈도우 경계는 토큰 오프셋 배열 연산으로 계산합니다.
+    - chunk_tokens: 청크 당 토큰 수 / overlap_tokens: 중첩 토큰 수 / min_tokens: 최소 토큰 수(노이즈 제거)
+    - align_lines: 윈도우 경계를 줄 단위로 정렬하여 식별자가 중간에서 잘리지 않도록 함 (모든 줄이 어떤 윈도우에 포함됨)
+    """
+    offsets = token_offsets(code)
+    n = len(offsets)
+    if n == 0: return []
+    if align_lines:
+        # 줄 경계(문자 오프셋)와 각 줄 시작 이전까지의 누적 토큰 수
+        line_lengths = np.fromiter(map(len, code.splitlines(keepends=True)), dtype=np.int64)
+        char_bounds = np.concatenate(([0], np.cumsum(line_lengths)))
+        token_bounds = np.searchsorted(offsets[:, 0], char_bounds)
+        # 정렬된 윈도우 끝에서 중첩 토큰만큼 되돌아간 줄부터 다음 윈도우를 시작하여 마지막 토큰까지 반복 배치
+        # (토큰 격자 시작점을 줄 단위로 내림 정렬하면 윈도우 사이 공백/꼬리 누락이 생길 수 있음)
+        start_list, end_list = [], []
+        start_line = 0
+        while True:
+            # 토큰 예산을 넘지 않는 마지막 줄 경계까지 확장 (예산보다 긴 한 줄은 단독 청크)
+            end_line = int(np.searchsorted(token_bounds, token_bounds[start_line] + chunk_tokens, side="right")) - 1
+            end_line = min(max(end_line, start_line + 1), len(line_lengths))
+            start_list.append(start_line)
+            end_list.append(end_line)
+            if token_bounds[end_line] >= n: break
+            next_line = int(np.searchsorted(token_bounds, token_bounds[end_line] - overlap_tokens, side="right")) - 1
+            start_line = max(next_line, start_line + 1)
+        start_lines, end_lines = np.array(start_list), np.array(end_list)
+        char_starts, char_ends = char_bounds[start_lines], char_bounds[end_lines]
+        counts = token_bounds[end_lines] - token_bounds[start_lines]
+        # 윈도우마다 새 줄을 포함하므로 짧은 꼬리 윈도우도 유지 (파일 전체가 짧을 때만 노이즈로 제거)
+        keep = counts >= (min_tokens if len(counts) == 1 else 1)
+    else:
+        # 이전 윈도우에 완전히 포함되는 꼬리 윈도우는 생성하지 않음
+        stride = max(1, chunk_tokens - overlap_tokens)
+        starts = np.arange(0, max(n - overlap_tokens, 1), stride)
+        ends = np.minimum(starts + chunk_tokens, n)
+        char_starts, char_ends = offsets[starts, 0], offsets[ends - 1, 1]
+        counts = ends - starts
+        keep = counts >= min_tokens # 너무 짧은 노이즈 제거
+    return [{
+        "type": "Baseline (Fixed)",
+        "content": code[start:end],
+        "metadata": "None (Context Lost)", # 문맥 정보 부재 명시
+        "token_count": count,
+    } for start, end, count in zip(char_starts[keep].tolist(), char_ends[keep].tolist(), counts[keep].tolist())]
+
+def run_baseline(code, config):
+    """설정된 모드(chars: 문자 단위, tokens: 토큰 단위, lines: 줄 정렬 토큰 단위)로 Baseline 청킹을 수행합니다."""
+    if config["mode"] == "chars":
+        return chunk_baseline(code)
+    return chunk_baseline_tokens(code, config["chunk_tokens"], config["overlap_tokens"],
+                                 config["min_tokens"], align_lines=config["mode"] == "lines")
+
 # --- [Proposed Algorithm] AST 기반 의미론적 청킹 (Semantic Chunking) ---
-def chunk_ours(tree, code):
+class SourceSpan:
+    """
+    공유 소스 버퍼(memoryview)의 바이트 구간 [start_byte, end_byte)을 가리키는 지연 디코딩 content입니다.
+    - 청킹 단계에서는 복사/디코딩 없이 오프셋만 보관
+    - str() 호출(직렬화, 출력 등) 시점에 1회 디코딩 후 캐시
+    - pickle(워커 → 메인 프로세스 전달) 시에는 일반 str로 변환되어 전달
+    """
+    __slots__ = ("source", "start_byte", "end_byte", "_text")
+
+    def __init__(self, source, start_byte, end_byte):
+        self.source = source
+        self.start_byte = start_byte
+        self.end_byte = end_byte
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = str(self.source[self.start_byte : self.end_byte], "utf8")
+        return self._text
+
+    def __repr__(self):
+        return f"SourceSpan({self.start_byte}, {self.end_byte})"
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+COMPONENT_DECL_TYPES = ("function_declaration", "lexical_declaration")
+HOOK_NAME_PATTERN = re.compile(r"use[A-Z0-9]")
+HOOK_VALUE_TYPES = ("arrow_function", "function_expression", "function")
+JSX_RETURN_TYPES = ("parenthesized_expression", "jsx_element", "jsx_fragment")
+
+def classify_declaration(node, source):
+    """
+    선언 노드(COMPONENT_DECL_TYPES)의 (이름, 종류)를 반환합니다. lexical_declaration은 마지막 선언자 기준
+    - 종류: "component"(PascalCase) / "hook"(useXxx 함수) / None
+    """
+    name, value = "Unknown", None
+    if node.type == "function_declaration":
+        n = node.child_by_field_name("name")
+        if n: name = str(source[n.start_byte : n.end_byte], "utf8")
+        value = node
+    else:
+        for child in node.children:
+            if child.type == "variable_declarator":
+                n = child.child_by_field_name("name")
+                if n: name = str(source[n.start_byte : n.end_byte], "utf8")
+                value = child.child_by_field_name("value")
+    if name and name[0].isupper():
+        return name, "component"
+    if HOOK_NAME_PATTERN.match(name) and value is not None and (value is node or value.type in HOOK_VALUE_TYPES):
+        return name, "hook"
+    return name, None
+
+# --- [크기 제한 계층 분할] 토큰 예산을 넘는 Hook/JSX 청크를 AST 경계로 나누는 설정 ---
+# max_tokens=None이면 비활성화 (기존 출력과 동일). min_tokens 미만의 인접 형제 조각은 하나로 병합
+# engine: "traverse"(chunk_ours 커서 순회) / "query"(query_chunker의 tree-sitter Query 규칙 엔진, 크기 분할 미지원)
+CHUNK_ENGINES = ("traverse", "query")
+DEFAULT_CHUNK_CONFIG = {"max_tokens": None, "min_tokens": 16, "engine": "traverse"}
+TOKEN_BYTES_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode("ascii"))
+SPLIT_BOUNDARY_TYPES = {
+    "jsx": frozenset(("jsx_element", "jsx_self_closing_element", "jsx_expression", "jsx_fragment")),
+    "hook": frozenset(("lexical_declaration", "variable_declaration", "expression_statement", "if_statement",
+                       "return_statement", "for_statement", "for_in_statement", "while_statement", "do_statement",
+                       "try_statement", "switch_statement", "throw_statement", "function_declaration", "pair")),
+}
+SPLIT_PLACEHOLDERS = {"jsx": "{/* ... */}", "hook": "/* ... */"}
+
+def chunk_ours(tree, code, max_tokens=None, min_tokens=16):
     """
     AST를 순회하며 코드의 기능적 단위(Hook, JSX)를 추출하고 구조적 메타데이터를 부여합니다.
+    - tree: Tree 또는 부분 트리 Node (둘 다 walk()로 동일한 커서를 제공)
+    - code: 파싱에 사용한 소스 바이트 (str도 허용)
+    - 단일 순회(Single-pass): 모든 노드를 정확히 한 번 방문하며, 상위 컴포넌트 스택을 직접 관리
+    - 중첩 컴포넌트 내부의 Hook/JSX는 감싸고 있는 모든 컴포넌트에 각각 귀속
+    - 커스텀 Hook 정의부(function useFoo / const useFoo = () => ...)도 독립 청크로 추출하며,
+      내부의 Hook 호출은 해당 커스텀 Hook을 상위 문맥으로 가짐
+    - Hook/JSX 청크의 content는 SourceSpan(바이트 오프셋)으로 보관되며 직렬화 시 디코딩
+    - max_tokens 지정 시: 예산을 넘는 Hook/JSX 청크는 같은 순회 중 하위 경계(자식 JSX 요소, 문장)에서 예산 이내의
+      조각(part) 청크로 나뉘고, 상위 청크는 조각 자리를 생략 표시로 바꾼 골격(skeleton)과 children 링크를 가짐
     """
-    chunks = []
-    code_bytes = bytes(code, "utf8")
-    
-    def get_text(node):
-        return code_bytes[node.start_byte : node.end_byte].decode("utf8")
-
-    def traverse(node, parent_name):
-        # 1. Hook 추출
-        if node.type == "call_expression":
-            func_node = node.child_by_field_name("function")
-            if func_node and get_text(func_node).startswith("use"):
-                chunks.append({
-                    "id": f"{parent_name}_hook_{node.start_point[0]}",
-                    "type": "Logic (Hook)",
-                    "parent_component": parent_name,
-                    "content": get_text(node),
-                    "line": node.start_point[0] + 1
-                })
+    source = memoryview(code.encode("utf8") if isinstance(code, str) else code)
+    token_starts = None
+
+    def count_tokens(start, end):
+        # 파일 전체 토큰 시작 오프셋을 최초 1회 계산 후 구간 토큰 수는 이진 탐색으로 계산
+        nonlocal token_starts
+        if token_starts is None:
+            token_starts = np.fromiter((m.start() for m in TOKEN_BYTES_PATTERN.finditer(source)), dtype=np.int64)
+        return int(np.searchsorted(token_starts, end) - np.searchsorted(token_starts, start))
+
+    # 컴포넌트 프레임: [선언 깊이, 컴포넌트 이름, 청크 목록, 탐색 중단 깊이(None=탐색 중)]
+    components = [] # 선언 순서(pre-order)대로 누적
+    stack = []      # 현재 노드를 감싸고 있는 컴포넌트 프레임
+    # 분할 문맥: 예산 초과 청크의 서브트리를 순회하는 동안 유지
+    # {depth, kind, start, end, parents: [(프레임, 상위 청크)], parts: [(시작, 끝)], pending, blocked}
+    # 분할 중인 청크 안의 중첩 컴포넌트가 다시 예산 초과 청크를 만들 수 있으므로 스택으로 관리 (바깥 분할도 계속 진행)
+    splits = []
+
+    def start_split(kind, depth, start, end, chunks):
+        for _, chunk in chunks:
+            chunk["children"] = []
+        splits.append({"depth": depth, "kind": kind, "start": start, "end": end, "parents": chunks,
+                       "parts": [], "pending": None, "blocked": None})
+
+    def flush_part(split):
+        # 대기 중인 조각 [시작, 끝, 시작 (행, 열), 토큰 수, 상위 노드 ID]을 상위 프레임별 청크로 기록
+        pending = split["pending"]
+        if pending is None: return
+        split["pending"] = None
+        start, end, (row, column), tokens, _ = pending
+        split["parts"].append((start, end))
+        content = SourceSpan(source, start, end)
+        for frame, parent in split["parents"]:
+            # 조각은 서로 겹치지 않으므로 시작 (행, 열)로 유일 (한 줄에 여러 조각이 있어도 충돌 없음, ID는 행으로 끝남)
+            part_id = f"{frame[1]}_{split['kind']}part_c{column}_{row}"
+            frame[2].append({
+                "id": part_id,
+                "type": parent["type"],
+                "parent_component": frame[1],
+                "content": content,
+                "line": row + 1,
+                "parent_chunk": parent["id"],
+                "token_count": tokens
+            })
+            parent["children"].append(part_id)
+
+    def add_part(split, node, tokens):
+        pending = split["pending"]
+        parent_id = node.parent.id
+        if pending and pending[4] == parent_id and (pending[3] < min_tokens or tokens < min_tokens):
+            # 작은 인접 형제 병합: 형제 사이 구간(JSX 텍스트 등)까지 포함한 토큰 수가 예산 이내일 때만
+            merged = count_tokens(pending[0], node.end_byte)
+            if merged <= max_tokens:
+                pending[1] = node.end_byte
+                pending[3] = merged
                 return
+        flush_part(split)
+        split["pending"] = [node.start_byte, node.end_byte, node.start_point, tokens, parent_id]
 
-        # 2. JSX 추출
-        if node.type == "return_statement":
-            for child in node.children:
-                if child.type in ["parenthesized_expression", "jsx_element", "jsx_fragment"]:
-                    chunks.append({
-                        "id": f"{parent_name}_jsx_{node.start_point[0]}",
-                        "type": "View (JSX)",
-                        "parent_component": parent_name,
-                        "content": get_text(child),
-                        "line": node.start_point[0] + 1
-                    })
-                    return
+    def end_split(split):
+        # 상위 청크 content: 조각 구간을 생략 표시로 바꾼 골격
+        flush_part(split)
+        pieces, position = [], split["start"]
+        for start, end in split["parts"]:
+            pieces.append(str(source[position:start], "utf8"))
+            pieces.append(SPLIT_PLACEHOLDERS[split["kind"]])
+            position = end
+        pieces.append(str(source[position : split["end"]], "utf8"))
+        skeleton = "".join(pieces)
+        for _, parent in split["parents"]:
+            parent["content"] = skeleton
 
-        for child in node.children:
-            traverse(child, parent_name)
+    def visit(node, depth):
+        # 벗어난 서브트리 정리: 컴포넌트 범위 종료 및 Hook/JSX 하위 탐색 중단 해제
+        while splits and splits[-1]["depth"] >= depth:
+            end_split(splits.pop())
+        for split in splits:
+            if split["blocked"] is not None and split["blocked"] >= depth:
+                split["blocked"] = None
+            if (split["blocked"] is None and node.type in SPLIT_BOUNDARY_TYPES[split["kind"]]
+                    and not (node.type == "jsx_expression" and node.parent.type == "jsx_attribute")):
+                tokens = count_tokens(node.start_byte, node.end_byte)
+                if tokens <= max_tokens:
+                    add_part(split, node, tokens)
+                    split["blocked"] = depth
+                else:
+                    flush_part(split) # 예산 초과 경계는 하위 경계에서 다시 분할
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        for frame in stack:
+            if frame[3] is not None and frame[3] >= depth:
+                frame[3] = None
 
-    cursor = tree.walk()
-    visited_children = False
-    
-    while True:
-        node = cursor.node
-        if node.type in ["function_declaration", "lexical_declaration"]:
-            name = "Unknown"
-            if node.type == "function_declaration":
-                n = node.child_by_field_name("name")
-                if n: name = get_text(n)
-            elif node.type == "lexical_declaration":
+        active = [frame for frame in stack if frame[3] is None]
+        if active:
+            # 1. Hook 추출 (Hook 내부는 단일 청크로 간주하여 하위 탐색 중단)
+            if node.type == "call_expression":
+                func_node = node.child_by_field_name("function")
+                # 디코딩 없이 callee 앞 3바이트만 비교
+                if func_node and source[func_node.start_byte : func_node.start_byte + 3] == b"use":
+                    content = SourceSpan(source, node.start_byte, node.end_byte)
+                    emitted = []
+                    for frame in active:
+                        chunk = {
+                            "id": f"{frame[1]}_hook_{node.start_point[0]}",
+                            "type": "Logic (Hook)",
+                            "parent_component": frame[1],
+                            "content": content,
+                            "line": node.start_point[0] + 1
+                        }
+                        frame[2].append(chunk)
+                        emitted.append((frame, chunk))
+                        frame[3] = depth
+                    if max_tokens and count_tokens(node.start_byte, node.end_byte) > max_tokens:
+                        start_split("hook", depth, node.start_byte, node.end_byte, emitted)
+
+            # 2. JSX 추출
+            elif node.type == "return_statement":
                 for child in node.children:
-                    if child.type == "variable_declarator":
-                        n = child.child_by_field_name("name")
-                        if n: name = get_text(n)
-            
-            if name and name[0].isupper():
-                chunks.append({
+                    if child.type in JSX_RETURN_TYPES:
+                        content = SourceSpan(source, child.start_byte, child.end_byte)
+                        emitted = []
+                        for frame in active:
+                            chunk = {
+                                "id": f"{frame[1]}_jsx_{node.start_point[0]}",
+                                "type": "View (JSX)",
+                                "parent_component": frame[1],
+                                "content": content,
+                                "line": node.start_point[0] + 1
+                            }
+                            frame[2].append(chunk)
+                            emitted.append((frame, chunk))
+                            frame[3] = depth
+                        if max_tokens and count_tokens(child.start_byte, child.end_byte) > max_tokens:
+                            start_split("jsx", depth, child.start_byte, child.end_byte, emitted)
+                        break
+
+        # 3. 컴포넌트 선언부(PascalCase) / 커스텀 Hook 정의부(useXxx) 식별
+        if node.type in COMPONENT_DECL_TYPES:
+            name, kind = classify_declaration(node, source)
+            chunk = None
+            if kind == "component":
+                chunk = {
                     "id": f"{name}_sig_{node.start_point[0]}",
                     "type": "Component Signature",
                     "parent_component": name,
                     "content": f"Component: {name}",
                     "line": node.start_point[0] + 1
-                })
-                traverse(node, name)
-
-        if not visited_children and cursor.goto_first_child():
-            visited_children = False
-        elif cursor.goto_next_sibling():
-            visited_children = False
-        elif cursor.goto_parent():
-            visited_children = True
+                }
+            elif kind == "hook":
+                chunk = {
+                    "id": f"{name}_hookdef_{node.start_point[0]}",
+                    "type": "Logic (Hook Definition)",
+                    "parent_component": name,
+                    "content": SourceSpan(source, node.start_byte, node.end_byte),
+                    "line": node.start_point[0] + 1
+                }
+            if chunk:
+                frame = [depth, name, [chunk], None]
+                components.append(frame)
+                stack.append(frame)
+
+    # 트리 순회 이동 (각 노드 1회 방문)
+    cursor = tree.walk()
+    depth = 0
+    finished = False
+    while not finished:
+        visit(cursor.node, depth)
+        if cursor.goto_first_child():
+            depth += 1
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                finished = True
+                break
+            depth -= 1
+    while splits:
+        end_split(splits.pop())
+
+    # 컴포넌트 선언 순서대로 병합 (동일 ID는 최초 위치 유지)
+    chunks = {}
+    for frame in components:
+        for chunk in frame[2]:
+            chunks[chunk["id"]] = chunk
+    return list(chunks.values())
+
+# 청커 버전: 청킹 함수 소스 + 규칙 상수의 해시 (청킹 로직 변경 시 캐시/매니페스트 자동 무효화)
+CHUNKER_VERSION = source_fingerprint(
+    (chunk_baseline, token_offsets, chunk_baseline_tokens, run_baseline, SourceSpan, classify_declaration, chunk_ours),
+    [TOKEN_PATTERN, COMPONENT_DECL_TYPES, HOOK_NAME_PATTERN, HOOK_VALUE_TYPES, JSX_RETURN_TYPES,
+     SPLIT_BOUNDARY_TYPES, SPLIT_PLACEHOLDERS])
+
+def chunker_version(chunk_config=DEFAULT_CHUNK_CONFIG):
+    """청킹 엔진별 버전 식별자 (query 엔진은 규칙/엔진 모듈 소스 해시 포함)"""
+    if chunk_config["engine"] == "query":
+        from query_chunker import ENGINE_VERSION # query_chunker가 이 모듈을 import하므로 사용 시점에 로드
+        return f"{CHUNKER_VERSION}:{ENGINE_VERSION}"
+    return CHUNKER_VERSION
+
+# --- [대용량/생성 파일 정책] 크기 인지 읽기 단계 ---
+# 읽기 전에 파일 크기(stat)와 앞부분 표본만으로 처리 방식을 정하여, 최소화 번들/생성 코드가 파서와 워커 메모리를 점유하지 않도록 함
+# - full: 정상 처리 / baseline: 앞부분 max_file_bytes만 읽어 Baseline 청크만 생성(파싱 생략) / skip: 제외
+# - memory_bytes: 처리 중(워커 실행 ~ 기록 완료 전) 파일들의 추정 메모리 합 상한 (병렬 처리 시에도 적용)
+FILE_POLICIES = ("full", "baseline", "skip")
+DEFAULT_LIMIT_CONFIG = {"max_file_bytes": 1 << 20, "memory_bytes": 1 << 30, "oversize": "baseline", "generated": "skip"}
+MEMORY_PER_SOURCE_BYTE = 16 # 소스 1바이트당 처리 중 추정 메모리 (구문 트리 + 청크 dict + 결과 전달 버퍼, 보수적 근사)
+FILE_MEMORY_OVERHEAD = 1 << 20 # 파일당 고정 추정 메모리
+SNIFF_BYTES = 64 << 10 # 생성 코드 판별용 앞부분 표본 크기
+GENERATED_HEADER_BYTES = 1024 # 생성 표식을 찾는 파일 머리 구간
+GENERATED_MARKERS = re.compile(rb"@generated\b|DO NOT EDIT|This file (?:is|was|has been) (?:auto-?|automatically )generated",
+                               re.IGNORECASE)
+MINIFIED_LINE_BYTES = 1000 # 표본의 평균 줄 길이가 이를 넘으면 최소화 코드로 간주
+
+def file_memory(size, limit_config=DEFAULT_LIMIT_CONFIG, policy="full"):
+    """파일 1개를 처리하는 동안의 추정 메모리(바이트)"""
+    if policy == "skip": return 0
+    if policy == "baseline": size = min(size, limit_config["max_file_bytes"])
+    return FILE_MEMORY_OVERHEAD + size * MEMORY_PER_SOURCE_BYTE
+
+def plan_file(filepath, size, limit_config=DEFAULT_LIMIT_CONFIG):
+    """
+    파일을 읽기 전에 처리 방식을 결정하여 (정책, 사유)를 반환합니다. (사유: None / "oversize" / "generated")
+    - oversize: max_file_bytes 초과 또는 추정 처리 메모리가 memory_bytes 초과
+    - generated: 머리 구간의 생성 표식(@generated 등) 또는 표본 평균 줄 길이가 MINIFIED_LINE_BYTES 초과(최소화 코드)
+    """
+    if size > limit_config["max_file_bytes"] or file_memory(size) > limit_config["memory_bytes"]:
+        return limit_config["oversize"], "oversize"
+    with open(filepath, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+    if GENERATED_MARKERS.search(sample, 0, GENERATED_HEADER_BYTES) or \
+            len(sample) / (sample.count(b"\n") + 1) > MINIFIED_LINE_BYTES:
+        return limit_config["generated"], "generated"
+    return "full", None
+
+# --- [파일 단위 처리] ---
+def init_worker():
+    """워커 프로세스 시작 시 1회 실행: 언어별 Parser를 파서 풀에 미리 생성하여 작업 간 재사용합니다."""
+    for language_name in LANGUAGES:
+        get_parser(language_name)
+
+def process_file(filepath, baseline_config=DEFAULT_BASELINE_CONFIG, profile=False, chunk_config=DEFAULT_CHUNK_CONFIG,
+                 policy="full", max_bytes=DEFAULT_LIMIT_CONFIG["max_file_bytes"]):
+    """
+    단일 파일을 읽고 파싱하여 (Baseline 청크, Proposed 청크)를 반환합니다.
+    처리 실패 시 None을 반환합니다.
+    - chunk_config: Proposed 청크 크기 제한 설정 (DEFAULT_CHUNK_CONFIG 참고)
+    - policy: plan_file이 결정한 처리 방식 (baseline: 앞부분 max_bytes의 Baseline 청크만 / skip: 빈 결과)
+    - profile=True: (결과, 단계별 계측 record)를 반환 (비활성화 시 계측 비용 없음)
+    """
+    timer = FileTimer(filepath) if profile else None
+    if policy != "full":
+        result = process_limited(filepath, baseline_config, policy, max_bytes, timer)
+        return (result, timer.record) if timer else result
+    try:
+        code_bytes = read_source(filepath)
+        if timer: timer.lap("read")
+        tree = get_parser_for_file(filepath).parse(code_bytes)
+        if timer: timer.lap("parse")
+
+        # A. Baseline 처리 (문자 단위 분할이므로 1회 디코딩)
+        base_chunks = run_baseline(code_bytes.decode("utf8"), baseline_config)
+        for c in base_chunks: c['filepath'] = filepath.name
+        if timer: timer.lap("baseline")
+
+        # B. Proposed 처리
+        if chunk_config["engine"] == "query":
+            from query_chunker import chunk_query
+            our_chunks = chunk_query(tree, code_bytes)
         else:
-            break
-            
-    return chunks
+            our_chunks = chunk_ours(tree, code_bytes, chunk_config["max_tokens"], chunk_config["min_tokens"]) # ID 기준 중복 없이 반환
+        for c in our_chunks: c['filepath'] = filepath.name
+        if timer:
+            timer.lap("traverse")
+            timer.record["nodes"] = tree.root_node.descendant_count
+            timer.record["chunks"] = {"baseline": len(base_chunks), "ours": len(our_chunks)}
 
-# --- [실행 파이프라인] ---
-def run_pipeline():
-    print("[Process] 데이터셋 구축 파이프라인(Dataset Pipeline) 가동 시작...")
-    
-    # 전체 파일 탐색 (재귀적)
-    search_dir = BASE_DIR / "base-ui" / "packages" / "react" / "src"
-    raw_files = list(search_dir.rglob("*.tsx"))
-    
-    # 노이즈 필터링: 테스트 코드, 의존성 모듈 제외
-    target_files = []
-    for f in raw_files:
-        f_str = str(f)
-        if "node_modules" in f_str: continue
-        if ".test." in f_str or ".spec." in f_str: continue
-        # 필요 시 예제 코드(docs) 포함/제외 결정
-        if "docs" in f_str: continue 
-        target_files.append(f)
+        result = base_chunks, our_chunks
+    except Exception as e:
+        # 인코딩 오류 등은 결과에서 제외 (계측 활성화 시 예외 유형 기록)
+        if timer: timer.record["error"] = {"type": type(e).__name__, "message": str(e)[:200]}
+        result = None
+    return (result, timer.record) if timer else result
+
+def process_limited(filepath, baseline_config, policy, max_bytes, timer=None):
+    """
+    대용량/생성 파일: 파싱 없이 앞부분 max_bytes(마지막 줄바꿈까지)의 Baseline 청크만 생성합니다.
+    처리 실패 시 None을 반환합니다. (정상 처리 경로와 동일하게 실패 파일로 집계)
+    """
+    if timer: timer.record["policy"] = policy
+    if policy == "skip": return [], []
+    try:
+        code_bytes = read_source(filepath, max_bytes)
+        if len(code_bytes) >= max_bytes:
+            code_bytes = code_bytes[: code_bytes.rfind(b"\n") + 1] or code_bytes
+        if timer: timer.lap("read")
+        base_chunks = run_baseline(code_bytes.decode("utf8", "ignore"), baseline_config) # 잘린 멀티바이트 문자 무시
+        for c in base_chunks: c['filepath'] = filepath.name
+    except Exception as e:
+        # 읽기 오류 등은 결과에서 제외 (계측 활성화 시 예외 유형 기록)
+        if timer: timer.record["error"] = {"type": type(e).__name__, "message": str(e)[:200]}
+        return None
+    if timer:
+        timer.lap("baseline")
+        timer.record["chunks"]["baseline"] = len(base_chunks)
+    return base_chunks, []
+
+# --- [처리 단계 간 역압(backpressure)] ---
+def bounded_map(executor, fn, tasks, memory_bytes):
+    """
+    executor.map처럼 입력 순서대로 결과를 반환하되, 제출 후 기록이 끝나지 않은 작업의 추정 메모리 합이
+    memory_bytes 이하가 되도록 제출을 지연합니다. (기록 단계가 느리면 파싱 단계가 대기)
+    - tasks: (인자 튜플, 추정 메모리) 이터러블 (상한보다 큰 작업은 처리 중인 작업이 없을 때 단독 제출)
+    """
+    pending = deque() # (future, 추정 메모리), 제출 순서 = 반환 순서
+    in_flight = 0
+    tasks = iter(tasks)
+    task = next(tasks, None)
+    while task or pending:
+        while task and (not pending or in_flight + task[1] <= memory_bytes):
+            pending.append((executor.submit(fn, *task[0]), task[1]))
+            in_flight += task[1]
+            task = next(tasks, None)
+        future, cost = pending.popleft()
+        yield future.result()
+        in_flight -= cost # 소비 측이 결과 기록을 마치고 다음 결과를 요청한 시점에 반환
+
+# --- [청킹 결과 캐시] (파일 내용 해시, 문법 버전, 청커 버전, 설정) -> (Baseline 청크, Proposed 청크) ---
+def file_cache_key(filepath, sha256, baseline_config=DEFAULT_BASELINE_CONFIG, chunk_config=DEFAULT_CHUNK_CONFIG):
+    return cache_key(sha256, grammar_version(language_for_file(filepath)), chunker_version(chunk_config),
+                     {"baseline": baseline_config, "chunking": chunk_config})
+
+def load_chunks(filepath, cache, baseline_config=DEFAULT_BASELINE_CONFIG, chunk_config=DEFAULT_CHUNK_CONFIG,
+                limit_config=DEFAULT_LIMIT_CONFIG):
+    """
+    단일 파일의 (Baseline 청크, Proposed 청크)를 캐시 우선으로 반환합니다. (다른 스크립트에서 재파싱 없이 재사용)
+    캐시에 없으면 처리 후 저장하며, 처리 실패 시 None을 반환합니다. 대용량/생성 파일은 정책대로 처리(캐시 안 함)합니다.
+    """
+    filepath = Path(filepath)
+    policy, _ = plan_file(filepath, filepath.stat().st_size, limit_config)
+    if policy != "full": return process_limited(filepath, baseline_config, policy, limit_config["max_file_bytes"])
+    key = file_cache_key(filepath, file_digest(filepath), baseline_config, chunk_config)
+    result = cache.get(key)
+    if result is None:
+        result = process_file(filepath, baseline_config, chunk_config=chunk_config)
+        if result is None: return None
+        cache.put(key, result)
+    base_chunks, our_chunks = result
+    for c in base_chunks + our_chunks: c['filepath'] = filepath.name
+    return base_chunks, our_chunks
+
+# --- [증분 빌드] 파일 내용 해시 기반 매니페스트 ---
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 3 # 청킹 로직/출력 형식 변경 시 증가 (이전 매니페스트 무효화)
+
+def file_digest(filepath):
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with filepath.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(output_dir, baseline_config=DEFAULT_BASELINE_CONFIG, chunk_config=DEFAULT_CHUNK_CONFIG,
+                  limit_config=DEFAULT_LIMIT_CONFIG):
+    """
+    이전 빌드의 매니페스트를 로드합니다.
+    매니페스트가 없거나 버전/청커 버전/Baseline 설정/청크 크기 설정/파일 정책/데이터셋 파일이 맞지 않으면 None을 반환합니다(전체 재구축).
+    """
+    try:
+        with (output_dir / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION: return None
+    if manifest.get("chunker") != chunker_version(chunk_config): return None
+    if manifest.get("baseline") != baseline_config: return None
+    if dict(DEFAULT_CHUNK_CONFIG, **manifest.get("chunking", {})) != chunk_config: return None
+    if dict(DEFAULT_LIMIT_CONFIG, **manifest.get("limits", {})) != limit_config: return None
+    if not all((output_dir / name).exists() for name in manifest["datasets"].values()): return None
+    return manifest
+
+class PreviousDataset:
+    """
+    이전 빌드의 데이터셋을 순방향으로 한 번만 스캔하며 파일 단위 청크 묶음을 꺼냅니다.
+    파일 목록은 상대 경로 순으로 정렬되어 있으므로, 재사용 파일도 이전 매니페스트와 같은 순서로 요청됩니다.
+    """
+    def __init__(self, manifest, output_dir):
+        self.entries = iter(manifest["files"].items())
+        self.base_iter = iter_chunks(output_dir / manifest["datasets"]["baseline"])
+        self.our_iter = iter_chunks(output_dir / manifest["datasets"]["ours"])
+
+    def take(self, rel_path):
+        # 데이터셋은 매니페스트의 파일 순서대로 저장되므로 청크 수만큼 읽어 구간을 복원
+        for prev_path, entry in self.entries:
+            base_chunks = list(islice(self.base_iter, entry["baseline_count"]))
+            our_chunks = list(islice(self.our_iter, len(entry["chunk_ids"])))
+            if prev_path == rel_path:
+                return base_chunks, our_chunks
+        raise KeyError(rel_path)
+
+    def close(self):
+        self.base_iter.close()
+        self.our_iter.close()
+
+# --- [파일 탐색] ---
+def get_search_dir():
+    """분석 대상 소스 루트 (MUI Base-UI react 패키지)"""
+    return BASE_DIR / "base-ui" / "packages" / "react" / "src"
+
+def collect_target_files(search_dir, discovery_config=DEFAULT_DISCOVERY_CONFIG):
+    """분석 대상 소스 파일을 탐색하여 상대 경로 순으로 정렬된 목록을 반환합니다."""
+    # 노이즈 필터링(테스트 코드, 의존성 모듈, 예제 코드, .gitignore 대상)은 탐색 중 가지치기로 적용
+    # 탐색 순서가 곧 상대 경로 정렬 순서 (결정적 출력 순서 및 증분 빌드의 순방향 재사용 보장)
+    # iter_source_files는 지연 생성기이지만 여기서는 전체 목록으로 모음 (탐색 완료 전 파싱 시작은 하지 않음):
+    # - docs 포함 대체 탐색 여부는 전체 파일 수를 알아야 결정 가능 (대체 탐색은 정렬 순서가 다른 새 목록)
+    # - run_pipeline은 매니페스트 순서대로 청크를 기록하고 삭제 파일(이전 매니페스트 - 현재 목록)을 계산하므로
+    #   처리 전에 전체 대상 집합이 필요 / 다른 스크립트(그래프, 벤치마크 등)도 목록(len, 반복 순회)을 사용
+    # 가지치기 탐색 비용은 파싱/해시 대비 작으므로 목록화 지연은 무시할 수준
+    target_files = list(iter_source_files(search_dir, discovery_config))
 
     # 타겟 파일 부족 시 예외 처리 (실험용 데이터 확보를 위해 범위 확장)
-    if len(target_files) < 10:
+    if len(target_files) < 10 and "docs" in discovery_config["exclude_dirs"]:
         print("[Info] 소스 코드 수량이 부족하여 docs(예제) 디렉토리를 포함합니다.")
-        target_files = [f for f in raw_files if "node_modules" not in str(f) and ".test." not in str(f)]
+        fallback_config = dict(discovery_config, exclude_dirs=[d for d in discovery_config["exclude_dirs"] if d != "docs"],
+                               exclude=[p for p in discovery_config["exclude"] if p != "*.spec.*"])
+        target_files = list(iter_source_files(search_dir, fallback_config))
+    return target_files
 
-    print(f"[Info] 수집된 분석 대상 파일: {len(target_files)}개")
-
-    dataset_baseline = []
-    dataset_ours = []
+# --- [실행 파이프라인] ---
+def run_pipeline(workers=1, incremental=True, compression="none", baseline_config=DEFAULT_BASELINE_CONFIG,
+                 profile_path=None, profile_top=10, discovery_config=DEFAULT_DISCOVERY_CONFIG, dedup=False,
+                 chunk_config=DEFAULT_CHUNK_CONFIG, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+                 limit_config=DEFAULT_LIMIT_CONFIG, lexical=True):
+    """
+    - cache_max_bytes: 청킹 결과 캐시 용량 상한 (None: 캐시 비활성화)
+    - lexical: Proposed 청크의 BM25 역색인(dataset/bm25/) 구축 여부
+    - limit_config: 대용량/생성 파일 정책과 처리 중 메모리 상한 (DEFAULT_LIMIT_CONFIG 참고)
+    """
+    chunk_config = dict(DEFAULT_CHUNK_CONFIG, **chunk_config)
+    if chunk_config["engine"] == "query" and chunk_config["max_tokens"]:
+        raise ValueError("크기 제한 분할(max_tokens)은 traverse 엔진에서만 지원합니다.")
+    limit_config = dict(DEFAULT_LIMIT_CONFIG, **limit_config)
+    for reason in ("oversize", "generated"):
+        if limit_config[reason] not in FILE_POLICIES:
+            raise ValueError(f"알 수 없는 파일 정책: {limit_config[reason]} ({'/'.join(FILE_POLICIES)})")
+    print("[Process] 데이터셋 구축 파이프라인(Dataset Pipeline) 가동 시작...")
+    # 계측 레이어 (profile_path 지정 시에만 활성화)
+    profiler = PipelineProfiler(top_n=profile_top) if profile_path else None
+    
+    search_dir = get_search_dir()
+    target_files = collect_target_files(search_dir, discovery_config)
+    print(f"[Info] 수집된 분석 대상 파일: {len(target_files)}개 "
+          f"({dict(sorted(Counter(language_for_file(p) for p in target_files).items()))})")
 
-    for filepath in target_files:
-        try:
-            with filepath.open("r", encoding="utf-8") as f:
-                code = f.read()
-            
-            parser = get_parser_for_file(filepath)
-            tree = parser.parse(bytes(code, "utf8"))
-            
-            # A. Baseline 처리
-            base_chunks = chunk_baseline(code)
-            for c in base_chunks: c['filepath'] = filepath.name
-            dataset_baseline.extend(base_chunks)
-            
-            # B. Proposed 처리
-            our_chunks = chunk_ours(tree, code)
-            unique_ours = {v['id']: v for v in our_chunks}.values() # ID 기반 중복 제거
-            for c in unique_ours: c['filepath'] = filepath.name
-            dataset_ours.extend(unique_ours)
-            
-        except Exception as e:
-            # 인코딩 오류 등은 무시
-            pass
-
-    # 결과 저장
     output_dir = BASE_DIR / "dataset"
     output_dir.mkdir(exist_ok=True)
 
-    with (output_dir / "dataset_baseline.json").open("w", encoding="utf-8") as f:
-        json.dump(dataset_baseline, f, indent=2, ensure_ascii=False)
-        
-    with (output_dir / "dataset_ours.json").open("w", encoding="utf-8") as f:
-        json.dump(list(dataset_ours), f, indent=2, ensure_ascii=False)
+    # 증분 빌드: 내용 해시가 동일한 파일은 이전 청크를 재사용 (mtime/크기 동일 시 해시 계산 생략)
+    manifest = load_manifest(output_dir, baseline_config, chunk_config, limit_config) if incremental else None
+    previous = manifest["files"] if manifest else {}
+    manifest_files = {}
+    stale_files = [] # (경로, 정책, 추정 메모리)
+    limited = {} # 대용량/생성 파일 정책 적용 파일 -> (정책, 사유)
+    # 청킹 결과 캐시: 매니페스트로 재사용할 수 없는 파일도 같은 내용/버전/설정의 이전 결과가 있으면 파싱 생략
+    cache = ChunkCache(output_dir / CACHE_NAME, cache_max_bytes) if cache_max_bytes is not None else None
+    cache_keys, cached = {}, set() # 재사용 불가 파일의 캐시 키 / 캐시 적중 파일
+    for filepath in target_files:
+        rel_path = filepath.relative_to(search_dir).as_posix()
+        stat = filepath.stat()
+        prev = previous.get(rel_path)
+        if prev and prev["mtime"] == stat.st_mtime and prev["size"] == stat.st_size:
+            sha256 = prev["sha256"]
+        else:
+            sha256 = file_digest(filepath)
+
+        entry = {"sha256": sha256, "mtime": stat.st_mtime, "size": stat.st_size}
+        entry["reuse"] = bool(prev and prev["sha256"] == sha256)
+        if not entry["reuse"]:
+            # 크기 인지 읽기 단계: 전체를 읽기 전에 크기와 앞부분 표본으로 처리 방식 결정
+            policy, reason = plan_file(filepath, stat.st_size, limit_config)
+            if reason: limited[rel_path] = (policy, reason)
+            # 정책으로 축소 처리되는 파일은 캐시하지 않음 (캐시 키는 정상 처리 결과 기준)
+            key = cache_keys[rel_path] = file_cache_key(filepath, sha256, baseline_config, chunk_config) \
+                if cache and policy == "full" else None
+            if key and key in cache: cached.add(rel_path)
+            else: stale_files.append((filepath, policy, file_memory(stat.st_size, limit_config, policy)))
+        manifest_files[rel_path] = entry
+
+    if previous:
+        deleted = len(previous.keys() - manifest_files.keys())
+        reused = len(manifest_files) - len(stale_files)
+        print(f"[Info] 증분 빌드: 재사용 {reused}개 / 재청킹 {len(stale_files)}개 / 삭제 {deleted}개")
+    if cached:
+        print(f"[Info] 청킹 결과 캐시 적중: {len(cached)}개 파일 (파싱 생략)")
+    if limited:
+        counts = Counter(f"{reason}->{policy}" for policy, reason in limited.values())
+        print(f"[Info] 대용량/생성 파일 정책 적용: {dict(sorted(counts.items()))}")
+
+    # 결과 저장: 파일 처리가 끝나는 즉시 청크를 한 줄씩 기록 (임시 파일 기록 후 교체)
+    # 저장 도중 중단되어도 불일치 매니페스트가 남지 않도록 매니페스트는 마지막에 기록
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists(): manifest_path.unlink()
+    final_paths = {name: dataset_path(output_dir, f"dataset_{name}", compression) for name in ("baseline", "ours")}
+
+    with ExitStack() as stack:
+        writers = {name: stack.enter_context(ChunkWriter(path.with_name(f".tmp-{path.name}")))
+                   for name, path in final_paths.items()}
+        # 보조 인덱스(파일/컴포넌트/유형 -> 청크)는 청크 기록과 동시에 구축
+        index_writer = ChunkIndexWriter(output_dir / INDEX_NAME)
+        stack.push(lambda exc_type, exc, tb: index_writer.abort() if exc_type else None)
+        # BM25 역색인도 같은 행 순서로 구축 (재사용/캐시 파일 포함 전체 Proposed 청크)
+        lexical_writer = LexicalIndexWriter(output_dir / LEXICAL_DIR_NAME) if lexical else None
+        if lexical_writer: stack.push(lambda exc_type, exc, tb: lexical_writer.abort() if exc_type else None)
+        if previous:
+            reader = PreviousDataset(manifest, output_dir)
+            stack.callback(reader.close)
+        if cache: stack.callback(cache.close)
+
+        tasks = (((filepath, baseline_config, profiler is not None, chunk_config, policy, limit_config["max_file_bytes"]),
+                  memory) for filepath, policy, memory in stale_files)
+        if workers > 1 and len(stale_files) > 1:
+            # 병렬 처리: 워커별로 파서를 1회 초기화, 입력 순서대로 결과를 반환(결정적 병합)
+            # 처리 중(제출 ~ 기록 완료) 파일의 추정 메모리 합이 memory_bytes를 넘지 않도록 제출을 제한
+            print(f"[Info] 병렬 처리 모드: 워커 {workers}개 (처리 중 메모리 상한 {limit_config['memory_bytes'] >> 20}MB)")
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=init_worker))
+            stale_results = bounded_map(executor, process_file, tasks, limit_config["memory_bytes"])
+        else:
+            init_worker()
+            stale_results = (process_file(*args) for args, _ in tasks)
+
+        failed = 0
+        for rel_path, entry in manifest_files.items():
+            record = None
+            if entry.pop("reuse"):
+                base_chunks, our_chunks = reader.take(rel_path)
+                if profiler: profiler.add_reused()
+            elif rel_path in cached:
+                # 기록 도중 LRU로 제거되었거나 손상된 항목은 그 자리에서 재처리
+                result = cache.get(cache_keys[rel_path]) or process_file(
+                    search_dir / rel_path, baseline_config, chunk_config=chunk_config)
+                if result is None: failed += 1
+                base_chunks, our_chunks = result or ([], [])
+                filename = Path(rel_path).name # 같은 내용의 다른 파일에서 저장된 결과일 수 있으므로 파일 이름 갱신
+                for c in base_chunks + our_chunks: c['filepath'] = filename
+                if profiler: profiler.add_cached()
+            else:
+                result = next(stale_results)
+                if profiler:
+                    result, record = result
+                    profiler.add(record)
+                if result is None: failed += 1
+                elif cache_keys.get(rel_path): cache.put(cache_keys[rel_path], result)
+                # 인코딩 오류 등으로 처리 실패한 파일은 빈 결과로 기록
+                base_chunks, our_chunks = result or ([], [])
+            entry["baseline_count"] = len(base_chunks)
+            entry["chunk_ids"] = [c['id'] for c in our_chunks]
+            if profiler: serialize_start = time.perf_counter()
+            base_start, our_start = writers["baseline"].count, writers["ours"].count
+            base_offsets = [writers["baseline"].write(c) for c in base_chunks]
+            our_offsets = [writers["ours"].write(c) for c in our_chunks]
+            index_writer.add_file(rel_path, (base_start, writers["baseline"].count), base_offsets,
+                                  (our_start, writers["ours"].count), our_chunks, our_offsets)
+            if lexical_writer: lexical_writer.add_all(our_chunks)
+            if profiler: profiler.add_serialize(record, time.perf_counter() - serialize_start)
+        cache_stats = cache.stats() if cache else None
+
+    for name, path in final_paths.items():
+        writers[name].path.replace(path)
+        # 이전 형식(JSON/다른 압축 방식)으로 남아 있는 데이터셋 정리
+        for stale_path in [output_dir / f"dataset_{name}.json"] + [
+                dataset_path(output_dir, f"dataset_{name}", c) for c in COMPRESSION_SUFFIXES]:
+            if stale_path != path and stale_path.exists(): stale_path.unlink()
+
+    index_writer.close({name: path.name for name, path in final_paths.items()})
+    if lexical_writer:
+        lexical_info = lexical_writer.close(final_paths["ours"].name)
+    elif (output_dir / LEXICAL_DIR_NAME).exists():
+        shutil.rmtree(output_dir / LEXICAL_DIR_NAME) # 비활성화 시 이전 역색인 정리 (데이터셋과 불일치)
+
+    # 내용 주소 기반 중복 제거: 고유 본문 테이블 + 출현 테이블 (비활성화 시 이전 결과 정리)
+    dedup_paths = {name: dataset_path(output_dir, name, compression) for name in (UNIQUE_DATASET, OCCURRENCE_DATASET)}
+    if dedup:
+        total, unique = dedup_dataset(final_paths["ours"], *(p.with_name(f".tmp-{p.name}") for p in dedup_paths.values()))
+        for path in dedup_paths.values():
+            path.with_name(f".tmp-{path.name}").replace(path)
+    for name, path in dedup_paths.items():
+        for stale_path in [dataset_path(output_dir, name, c) for c in COMPRESSION_SUFFIXES]:
+            if (stale_path != path or not dedup) and stale_path.exists(): stale_path.unlink()
+
+    with manifest_path.open("w", encoding="utf-8") as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "chunker": chunker_version(chunk_config),
+            "baseline": baseline_config,
+            "chunking": chunk_config,
+            "limits": limit_config,
+            "discovery": discovery_config, # 파일 단위 재사용과 무관 (감시 모드 종료 시 재구축이 같은 탐색 설정을 쓰도록 기록)
+            "datasets": {name: path.name for name, path in final_paths.items()},
+            "files": manifest_files,
+        }, f, ensure_ascii=False)
 
     print("\n[Success] 데이터셋 구축 완료.")
-    print(f"   - Baseline(Fixed-size) 데이터: {len(dataset_baseline)}개 청크 생성")
-    print(f"   - Proposed(AST-based) 데이터: {len(dataset_ours)}개 청크 생성")
+    print(f"   - Baseline(Fixed-size) 데이터: {writers['baseline'].count}개 청크 생성")
+    print(f"   - Proposed(AST-based) 데이터: {writers['ours'].count}개 청크 생성")
+    if dedup:
+        print(f"   - 중복 제거(Content-addressed): 고유 {unique}개 / 전체 {total}개 "
+              f"(임베딩 대상 {100 * (1 - unique / max(1, total)):.1f}% 감소)")
+    if lexical_writer:
+        print(f"   - BM25 역색인: 어휘 {lexical_info['terms']}개 / 문서 {lexical_info['docs']}개")
+    if cache_stats:
+        print(f"   - 청킹 결과 캐시: 적중 {len(cached)}개 / 저장 {cache_stats['entries']}개 "
+              f"({cache_stats['bytes'] / (1 << 20):.2f}MB / 최대 {cache_stats['max_bytes'] / (1 << 20):.0f}MB, "
+              f"LRU 제거 {cache_stats['evicted']}개)")
+    if limited:
+        print(f"   - 대용량/생성 파일: {len(limited)}개 정책 적용 (Baseline만 "
+              f"{sum(policy == 'baseline' for policy, _ in limited.values())}개 / 제외 "
+              f"{sum(policy == 'skip' for policy, _ in limited.values())}개)")
     print(f"   - 저장 경로: {output_dir}")
+    if failed:
+        print(f"[Warning] 처리 실패로 제외된 파일: {failed}개 (상세 원인은 --profile 리포트 참고)")
+
+    if profiler:
+        profiler.print_summary()
+        profiler.write(profile_path)
+        print(f"[Profile] 계측 리포트 저장: {profile_path}")
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="AST 기반 청킹 데이터셋 구축 파이프라인")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="파일 단위 병렬 처리 프로세스 수 (0: CPU 코어 수, 기본값: 1=직렬)")
+    arg_parser.add_argument("--full", action="store_true",
+                            help="매니페스트를 무시하고 전체 파일을 재청킹")
+    arg_parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default="none",
+                            help="데이터셋(JSONL) 압축 방식 (기본값: none)")
+    arg_parser.add_argument("--baseline", choices=BASELINE_MODES, default="chars",
+                            help="Baseline 분할 단위 (chars: 문자, tokens: 토큰, lines: 줄 정렬 토큰, 기본값: chars)")
+    arg_parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_BASELINE_CONFIG["chunk_tokens"],
+                            help="토큰 모드의 청크 당 토큰 수")
+    arg_parser.add_argument("--overlap-tokens", type=int, default=DEFAULT_BASELINE_CONFIG["overlap_tokens"],
+                            help="토큰 모드의 중첩 토큰 수")
+    arg_parser.add_argument("--max-tokens", type=int, default=DEFAULT_CHUNK_CONFIG["max_tokens"],
+                            help="Proposed 청크 토큰 예산 (초과 시 JSX 하위 요소/Hook 본문 문장 단위로 계층 분할, 기본값: 분할 안 함)")
+    arg_parser.add_argument("--engine", choices=CHUNK_ENGINES, default=DEFAULT_CHUNK_CONFIG["engine"],
+                            help="Proposed 청킹 엔진 (traverse: 커서 순회, query: tree-sitter Query 규칙, 기본값: traverse)")
+    arg_parser.add_argument("--min-part-tokens", type=int, default=DEFAULT_CHUNK_CONFIG["min_tokens"],
+                            help="분할 조각 최소 토큰 수 (미만인 인접 형제 조각은 병합)")
+    arg_parser.add_argument("--profile", nargs="?", const=str(BASE_DIR / "dataset" / "profile_report.json"),
+                            default=None, metavar="PATH",
+                            help="단계별 계측 활성화 및 JSON 리포트 경로 (기본값: dataset/profile_report.json)")
+    arg_parser.add_argument("--profile-top", type=int, default=10, help="리포트에 포함할 느린 파일 수")
+    arg_parser.add_argument("--include", action="append", default=None, metavar="GLOB",
+                            help="수집할 파일 패턴 (반복 지정 가능, 기본값: TS/TSX/JS/JSX 확장자)")
+    arg_parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                            help="추가로 제외할 파일 패턴 (반복 지정 가능)")
+    arg_parser.add_argument("--dedup", action="store_true",
+                            help="정규화된 content 해시 기준 중복 제거 데이터셋(고유 본문 + 출현 테이블) 추가 생성")
+    arg_parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES >> 20,
+                            help="청킹 결과 캐시 용량 상한(MB, 초과 시 LRU 제거)")
+    arg_parser.add_argument("--no-cache", action="store_true", help="청킹 결과 캐시 사용 안 함")
+    arg_parser.add_argument("--no-lexical", action="store_true", help="BM25 역색인(dataset/bm25/) 구축 안 함")
+    arg_parser.add_argument("--no-gitignore", action="store_true", help=".gitignore 규칙 무시")
+    arg_parser.add_argument("--max-file-kb", type=int, default=DEFAULT_LIMIT_CONFIG["max_file_bytes"] >> 10,
+                            help="정상 처리할 최대 파일 크기(KB), 초과 시 --oversize 정책 적용")
+    arg_parser.add_argument("--oversize", choices=FILE_POLICIES, default=DEFAULT_LIMIT_CONFIG["oversize"],
+                            help="대용량 파일 정책 (baseline: 앞부분 Baseline 청크만, 기본값: baseline)")
+    arg_parser.add_argument("--generated", choices=FILE_POLICIES, default=DEFAULT_LIMIT_CONFIG["generated"],
+                            help="생성/최소화 코드 파일 정책 (기본값: skip)")
+    arg_parser.add_argument("--memory-mb", type=int, default=DEFAULT_LIMIT_CONFIG["memory_bytes"] >> 20,
+                            help="처리 중 파일들의 추정 메모리 합 상한(MB, 병렬 처리 제출 제한)")
+    args = arg_parser.parse_args()
+    discovery_config = dict(DEFAULT_DISCOVERY_CONFIG,
+                            include=args.include or DEFAULT_DISCOVERY_CONFIG["include"],
+                            exclude=DEFAULT_DISCOVERY_CONFIG["exclude"] + args.exclude,
+                            gitignore=not args.no_gitignore)
+    baseline_config = dict(DEFAULT_BASELINE_CONFIG, mode=args.baseline,
+                           chunk_tokens=args.chunk_tokens, overlap_tokens=args.overlap_tokens)
+    if args.engine == "query" and args.max_tokens:
+        arg_parser.error("--max-tokens는 --engine traverse에서만 지원합니다.")
+    chunk_config = dict(DEFAULT_CHUNK_CONFIG, max_tokens=args.max_tokens, min_tokens=args.min_part_tokens,
+                        engine=args.engine)
+    limit_config = dict(DEFAULT_LIMIT_CONFIG, max_file_bytes=args.max_file_kb << 10, memory_bytes=args.memory_mb << 20,
+                        oversize=args.oversize, generated=args.generated)
+    run_pipeline(workers=args.workers or os.cpu_count() or 1, incremental=not args.full,
+                 compression=args.compress, baseline_config=baseline_config,
+                 profile_path=args.profile, profile_top=args.profile_top, discovery_config=discovery_config,
+                 dedup=args.dedup, chunk_config=chunk_config,
+                 cache_max_bytes=None if args.no_cache else args.cache_max_mb << 20, limit_config=limit_config,
+                 lexical=not args.no_lexical)
\ No newline at end of file
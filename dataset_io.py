@@ -0,0 +1,127 @@
+import gzip
+import io
+import json
+from pathlib import Path
+
+# --- [설정] 데이터셋 파일 형식 ---
+# 한 줄에 청크 하나(JSON Lines)를 기록하며, 확장자에 따라 압축 여부를 결정
+COMPRESSION_SUFFIXES = {
+    "none": ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+
+def dataset_path(data_dir, name, compression="none"):
+    """데이터셋 이름(예: dataset_ours)과 압축 방식으로 파일 경로를 생성합니다."""
+    return Path(data_dir) / f"{name}{COMPRESSION_SUFFIXES[compression]}"
+
+def find_dataset(data_dir, name):
+    """저장된 데이터셋 파일을 압축 형식에 관계없이 탐색합니다. 없으면 None을 반환합니다."""
+    for suffix in COMPRESSION_SUFFIXES.values():
+        path = Path(data_dir) / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+def _open_binary(path, mode):
+    """확장자에 맞는 (압축 해제된) 바이너리 스트림을 엽니다. mode: 'r' 또는 'w'"""
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, mode + "b")
+    if path.name.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd 압축을 사용하려면 'pip install zstandard'가 필요합니다.")
+        raw = path.open(mode + "b")
+        if mode == "w":
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return path.open(mode + "b")
+
+def _open_text(path, mode):
+    """확장자에 맞는 (압축) 텍스트 스트림을 엽니다. mode: 'r' 또는 'w' (줄바꿈은 항상 '\\n', 바이트 오프셋 고정)"""
+    return io.TextIOWrapper(_open_binary(path, mode), encoding="utf-8", newline="\n")
+
+class ChunkWriter:
+    """
+    청크를 생성 즉시 한 줄씩 기록하는 스트리밍 writer입니다.
+    전체 데이터셋을 메모리에 보관하지 않으므로 코퍼스 규모와 무관하게 메모리 사용량이 일정합니다.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self.offset = 0 # 압축 해제 기준 다음 줄의 바이트 오프셋
+        self._f = _open_text(self.path, "w")
+
+    def write(self, chunk):
+        """청크 1개를 기록하고 해당 줄의 (압축 해제 기준) 바이트 오프셋을 반환합니다."""
+        # 지연 디코딩 content(SourceSpan 등)는 직렬화 시점에 str로 변환
+        line = json.dumps(chunk, ensure_ascii=False, default=str) + "\n"
+        self._f.write(line)
+        offset = self.offset
+        self.offset += len(line.encode("utf8"))
+        self.count += 1
+        return offset
+
+    def write_all(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_chunks(path):
+    """데이터셋 파일을 한 줄씩 읽어 청크를 지연(lazy) 반환합니다."""
+    with _open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class ChunkReader:
+    """반복할 때마다 파일을 처음부터 다시 읽는 재순회 가능한 지연 reader입니다."""
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __iter__(self):
+        return iter_chunks(self.path)
+
+class ChunkSeeker:
+    """
+    바이트 오프셋 목록으로 데이터셋의 특정 줄만 읽는 임의 접근 reader입니다.
+    비압축 파일은 seek 후 1줄만 읽으며, 압축 파일은 오프셋 오름차순으로 전진 탐색합니다(역방향 시 재개방).
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self._f = None
+        self._position = 0
+
+    def _goto(self, offset):
+        compressed = self.path.suffix != ".jsonl"
+        if self._f is None or (compressed and offset < self._position):
+            if self._f: self._f.close()
+            self._f = _open_binary(self.path, "r")
+            self._position = 0
+        if compressed:
+            self._f.read(offset - self._position)
+        else:
+            self._f.seek(offset)
+
+    def read(self, offsets):
+        """요청한 오프셋 순서대로 청크 목록을 반환합니다."""
+        chunks = {}
+        for offset in sorted(set(offsets)):
+            self._goto(offset)
+            line = self._f.readline()
+            self._position = offset + len(line)
+            chunks[offset] = json.loads(line)
+        return [chunks[offset] for offset in offsets]
+
+    def close(self):
+        if self._f: self._f.close()
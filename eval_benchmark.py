@@ -0,0 +1,210 @@
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import data_pipeline
+from data_pipeline import DEFAULT_BASELINE_CONFIG, HOOK_NAME_PATTERN, chunk_ours, collect_target_files, run_baseline
+from dataset_io import ChunkWriter
+from parsing import parse_file
+from retrieval import HashingEmbedder, VectorStore, build_index
+
+# --- [설정] ---
+BASE_DIR = Path(__file__).resolve().parent
+REPORT_PATH = BASE_DIR / "dataset" / "eval_report.json"
+FUNCTION_VALUE_TYPES = ("arrow_function", "function_expression", "function", "call_expression")
+
+# --- [정답 생성] 질의 -> 정답 코드 구간(gold span) ---
+def extract_gold(tree, source, rel_path):
+    """
+    AST에서 질의와 정답 구간을 생성합니다.
+    - hook_call: 커스텀 Hook 이름 -> 해당 Hook 호출 위치
+    - hook_definition: 커스텀 Hook 이름 -> Hook 정의부
+    - component: 컴포넌트 이름 -> 컴포넌트 정의부
+    반환: [(질의 유형, 질의 문자열, (파일, 시작 줄, 끝 줄))]
+    """
+    pairs = []
+
+    def text(node):
+        return source[node.start_byte : node.end_byte].decode("utf8")
+
+    def span(node):
+        return (rel_path, node.start_point[0] + 1, node.end_point[0] + 1)
+
+    cursor = tree.walk()
+    finished = False
+    while not finished:
+        node = cursor.node
+        name_node = None
+        if node.type == "function_declaration":
+            name_node = node.child_by_field_name("name")
+        elif node.type == "variable_declarator":
+            value = node.child_by_field_name("value")
+            if value is not None and value.type in FUNCTION_VALUE_TYPES:
+                name_node = node.child_by_field_name("name")
+        if name_node is not None and name_node.type == "identifier":
+            name = text(name_node)
+            if HOOK_NAME_PATTERN.match(name):
+                pairs.append(("hook_definition", name, span(node)))
+            elif name[0].isupper():
+                pairs.append(("component", name, span(node)))
+
+        if node.type == "call_expression":
+            callee = node.child_by_field_name("function")
+            if callee is not None and callee.type == "identifier" and HOOK_NAME_PATTERN.match(text(callee)):
+                pairs.append(("hook_call", text(callee), span(node)))
+
+        if cursor.goto_first_child(): continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                finished = True
+                break
+    return pairs
+
+# --- [청크 구간 복원] ---
+def baseline_spans(code, chunks):
+    """Baseline 청크의 (시작 줄, 끝 줄)을 원본에서의 위치로 복원합니다. (청크는 원본 순서로 생성됨)"""
+    spans = []
+    pos = 0
+    for chunk in chunks:
+        start = code.find(chunk["content"], pos)
+        if start < 0: start = code.find(chunk["content"])
+        first = code.count("\n", 0, start) + 1
+        spans.append((first, first + chunk["content"].count("\n")))
+        pos = start + 1
+    return spans
+
+def ours_spans(chunks):
+    """Proposed 청크의 (시작 줄, 끝 줄): 시작 줄 메타데이터 + content 줄 수"""
+    return [(c["line"], c["line"] + str(c["content"]).count("\n")) for c in chunks]
+
+# --- [코퍼스 준비] ---
+def prepare_corpus(target_files, search_dir, baseline_config):
+    """
+    대상 파일을 두 방식으로 청킹하고 정답 질의를 생성합니다.
+    반환: ({방식: [(청크, (파일, 시작 줄, 끝 줄))]}, {(질의 유형, 질의): [정답 구간]}, {방식: 청킹 시간(s)})
+    """
+    corpora = {"baseline": [], "ours": []}
+    chunk_seconds = {"baseline": 0.0, "ours": 0.0}
+    queries = {}
+    for filepath in target_files:
+        try:
+            tree, source = parse_file(filepath)
+            code = source.decode("utf8")
+        except Exception:
+            continue
+        rel_path = filepath.relative_to(search_dir).as_posix()
+
+        start = time.perf_counter()
+        base_chunks = run_baseline(code, baseline_config)
+        chunk_seconds["baseline"] += time.perf_counter() - start
+        start = time.perf_counter()
+        our_chunks = chunk_ours(tree, source)
+        chunk_seconds["ours"] += time.perf_counter() - start
+
+        for method, chunks, spans in (("baseline", base_chunks, baseline_spans(code, base_chunks)),
+                                      ("ours", our_chunks, ours_spans(our_chunks))):
+            for chunk, (first, last) in zip(chunks, spans):
+                chunk["filepath"] = rel_path
+                corpora[method].append((chunk, (rel_path, first, last)))
+
+        for kind, query, gold in extract_gold(tree, source, rel_path):
+            queries.setdefault((kind, query), []).append(gold)
+    return corpora, queries, chunk_seconds
+
+def is_relevant(span, golds):
+    """같은 파일에서 줄 구간이 겹치면 정답으로 간주합니다."""
+    path, first, last = span
+    return any(path == g_path and first <= g_last and g_first <= last for g_path, g_first, g_last in golds)
+
+def directory_size(path):
+    return sum(p.stat().st_size for p in Path(path).iterdir() if p.is_file())
+
+# --- [평가] ---
+def evaluate(method, corpus, queries, n_files, chunk_seconds, ks=(1, 5, 10), dim=256):
+    """한 청킹 방식에 대해 인덱스 구축 후 recall@k, MRR, 비용 지표를 측정합니다."""
+    spans = [span for _, span in corpus]
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_path = Path(tmp) / f"{method}.jsonl"
+        with ChunkWriter(dataset_path) as writer:
+            writer.write_all(chunk for chunk, _ in corpus)
+        start = time.perf_counter()
+        build_index(dataset_path, Path(tmp) / "index", HashingEmbedder(dim=dim))
+        index_seconds = time.perf_counter() - start
+        index_bytes = directory_size(Path(tmp) / "index")
+
+        store = VectorStore(Path(tmp) / "index")
+        max_k = max(ks)
+        hits_at = {k: 0 for k in ks}
+        reciprocal_ranks, latencies = [], []
+        by_kind = {}
+        for (kind, query), golds in queries:
+            start = time.perf_counter()
+            hits = store.search_rows([query], max_k)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            rank = next((i + 1 for i, (row, _) in enumerate(hits) if is_relevant(spans[row], golds)), None)
+            reciprocal_ranks.append(1 / rank if rank else 0.0)
+            for k in ks:
+                if rank and rank <= k: hits_at[k] += 1
+            stats = by_kind.setdefault(kind, [0, 0])
+            stats[0] += 1
+            stats[1] += 1 if rank and rank <= max_k else 0
+        store.close()
+
+    n = max(1, len(queries))
+    return {
+        "method": method,
+        "chunks": len(corpus),
+        "chunks_per_file": len(corpus) / max(1, n_files),
+        **{f"recall@{k}": hits_at[k] / n for k in ks},
+        f"mrr@{max_k}": float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0,
+        f"recall@{max_k}_by_type": {kind: hit / total for kind, (total, hit) in sorted(by_kind.items())},
+        "index_bytes": index_bytes,
+        "chunk_seconds": chunk_seconds,
+        "index_build_seconds": index_seconds,
+        "query_p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+        "query_p99_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+    }
+
+def run_benchmark(max_queries=500, baseline_config=DEFAULT_BASELINE_CONFIG, seed=0):
+    print("[Process] 검색 성능 평가(Retrieval Benchmark) 시작...")
+    search_dir = data_pipeline.get_search_dir()
+    target_files = collect_target_files(search_dir)
+    corpora, queries, chunk_seconds = prepare_corpus(target_files, search_dir, baseline_config)
+
+    # 질의 유형이 고르게 포함되도록 정렬 후 고정 시드로 샘플링
+    query_items = sorted(queries.items())
+    random.Random(seed).shuffle(query_items)
+    query_items = query_items[:max_queries]
+    print(f"[Info] 평가 대상 파일: {len(target_files)}개 / 질의: {len(query_items)}개")
+
+    report = [evaluate(method, corpora[method], query_items, len(target_files), chunk_seconds[method])
+              for method in ("baseline", "ours")]
+
+    print("\n[Result] 청킹 방식별 검색 품질 및 비용")
+    for row in report:
+        print(f" ({row['method']}) 청크 {row['chunks']}개 (파일당 {row['chunks_per_file']:.1f}개)")
+        print(f"   - recall@1/5/10: {row['recall@1']:.3f} / {row['recall@5']:.3f} / {row['recall@10']:.3f}"
+              f"  MRR@10: {row['mrr@10']:.3f}")
+        print(f"   - 유형별 recall@10: {row['recall@10_by_type']}")
+        print(f"   - 인덱스 크기: {row['index_bytes'] / 1024:.1f} KiB, 청킹 {row['chunk_seconds']:.3f}s, "
+              f"인덱스 구축 {row['index_build_seconds']:.3f}s")
+        print(f"   - 질의 지연 p50/p99: {row['query_p50_ms']:.2f} / {row['query_p99_ms']:.2f} ms")
+
+    REPORT_PATH.parent.mkdir(exist_ok=True)
+    with REPORT_PATH.open("w", encoding="utf-8") as f:
+        json.dump({"files": len(target_files), "queries": len(query_items), "results": report},
+                  f, indent=2, ensure_ascii=False)
+    print(f"\n[Success] 평가 리포트 저장: {REPORT_PATH}")
+    return report
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Baseline vs Proposed 청킹 검색 성능 평가")
+    arg_parser.add_argument("--max-queries", type=int, default=500, help="평가 질의 최대 개수")
+    arg_parser.add_argument("--baseline", choices=data_pipeline.BASELINE_MODES, default="chars",
+                            help="Baseline 분할 단위")
+    args = arg_parser.parse_args()
+    run_benchmark(max_queries=args.max_queries,
+                  baseline_config=dict(DEFAULT_BASELINE_CONFIG, mode=args.baseline))
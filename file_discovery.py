@@ -0,0 +1,170 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+# --- [설정] 기본 탐색 규칙 ---
+# - include: 수집할 파일 이름 패턴 / exclude: 제외할 파일 패턴 ('/' 포함 시 루트 기준 상대 경로로 매칭)
+# - exclude_dirs: 하위로 내려가기 전에 가지치기(prune)할 디렉토리 이름
+DEFAULT_DISCOVERY_CONFIG = {
+    "include": ["*.tsx", "*.ts", "*.mts", "*.cts", "*.jsx", "*.js", "*.mjs", "*.cjs"],
+    "exclude": ["*.test.*", "*.spec.*", "*.d.ts", "*.d.mts", "*.d.cts"],
+    "exclude_dirs": ["node_modules", "docs", ".git"],
+    "gitignore": True,
+}
+
+# --- [.gitignore] 패턴 해석 ---
+def _translate_gitignore(pattern):
+    """gitignore 글롭 패턴을 정규식 본문으로 변환합니다. (*, ?, [...], ** 지원)"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"): body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+class GitIgnore:
+    """
+    하나의 .gitignore 파일 규칙 집합입니다. 마지막으로 매칭된 규칙이 우선합니다('!' 부정 규칙 포함).
+    - '/'를 포함한 패턴은 .gitignore 위치 기준 상대 경로에, 그 외 패턴은 이름에 매칭
+    - 끝이 '/'인 패턴은 디렉토리에만 적용
+    """
+    def __init__(self, base_dir, lines):
+        self.base_dir = Path(base_dir)
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"): continue
+            negate = line.startswith("!")
+            if negate: line = line[1:]
+            if line.startswith("\\"): line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line: continue
+            self.rules.append((re.compile(_translate_gitignore(line) + r"\Z"), negate, dir_only, anchored))
+
+    @classmethod
+    def load(cls, directory):
+        path = Path(directory) / ".gitignore"
+        try:
+            with path.open("r", encoding="utf-8", errors="replace") as f:
+                return cls(directory, f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path, name, is_dir):
+        """매칭 결과: True(무시), False(부정 규칙으로 포함), None(해당 규칙 없음)"""
+        result = None
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir: continue
+            if regex.match(rel_path if anchored else name):
+                result = not negate
+        return result
+
+def _ancestor_gitignores(root):
+    """탐색 루트의 상위 디렉토리(git 저장소 루트까지)에 있는 .gitignore를 상위 → 하위 순으로 로드합니다."""
+    ignores = []
+    for directory in Path(root).resolve().parents:
+        ignore = GitIgnore.load(directory)
+        if ignore: ignores.append(ignore)
+        if (directory / ".git").exists(): break
+    return ignores[::-1]
+
+def _is_ignored(ignores, path, name, is_dir):
+    ignored = False
+    for ignore in ignores:
+        rel_path = Path(os.path.relpath(path, ignore.base_dir)).as_posix()
+        result = ignore.match(rel_path, name, is_dir)
+        if result is not None: ignored = result
+    return ignored
+
+# --- [탐색] ---
+def _scan(directory):
+    """
+    디렉토리 항목을 읽어 (이름, 경로, 디렉토리 여부) 목록과 .gitignore를 반환합니다.
+    디렉토리 이름 뒤에 '/'를 붙인 키로 정렬하여, 전위 순회 결과가 상대 경로 문자열 정렬 순서와 일치하도록 합니다.
+    """
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            entries.append((entry.name, entry.path, is_dir))
+    entries.sort(key=lambda e: e[0] + "/" if e[2] else e[0])
+    return entries, GitIgnore.load(directory)
+
+def _matches(patterns, rel_path, name):
+    return any(fnmatchcase(rel_path if "/" in p else name, p) for p in patterns)
+
+def iter_source_files(root, config=DEFAULT_DISCOVERY_CONFIG, workers=4):
+    """
+    os.scandir 기반으로 소스 파일을 지연(lazy) 탐색하여 Path를 하나씩 반환합니다.
+    - 제외 디렉토리와 .gitignore 대상은 하위로 내려가기 전에 가지치기
+    - workers > 1이면 하위 디렉토리 scandir를 스레드로 미리 요청(prefetch)하되, 반환 순서는 상대 경로 정렬 순서로 고정
+    """
+    root = Path(root)
+    if not root.is_dir(): return
+    exclude_dirs = set(config["exclude_dirs"])
+    use_gitignore = config.get("gitignore", True)
+    base_ignores = _ancestor_gitignores(root) if use_gitignore else []
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def submit(directory):
+        if executor: return executor.submit(_scan, directory)
+        return directory
+
+    def result(pending):
+        return pending.result() if executor else _scan(pending)
+
+    def walk(pending, rel_dir, ignores):
+        entries, local_ignore = result(pending)
+        if use_gitignore and local_ignore: ignores = ignores + [local_ignore]
+
+        # 필터 선적용: 하위 디렉토리는 순회 전에 가지치기 후 scandir 선요청
+        children = []
+        for name, path, is_dir in entries:
+            rel_path = f"{rel_dir}{name}"
+            if is_dir:
+                if name in exclude_dirs: continue
+                if ignores and _is_ignored(ignores, path, name, True): continue
+                children.append((name, path, True, rel_path, submit(path)))
+            else:
+                if not _matches(config["include"], rel_path, name): continue
+                if _matches(config["exclude"], rel_path, name): continue
+                if ignores and _is_ignored(ignores, path, name, False): continue
+                children.append((name, path, False, rel_path, None))
+
+        for name, path, is_dir, rel_path, pending_child in children:
+            if is_dir:
+                yield from walk(pending_child, rel_path + "/", ignores)
+            else:
+                yield Path(path)
+
+    try:
+        yield from walk(submit(str(root)), "", base_ignores)
+    finally:
+        if executor: executor.shutdown(wait=False, cancel_futures=True)
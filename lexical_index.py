@@ -0,0 +1,312 @@
+import argparse
+import json
+import math
+import shutil
+import time
+from array import array
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from chunk_index import ChunkIndex
+from retrieval import DATA_DIR, IDENTIFIER_PATTERN, INDEX_DIR, VectorStore, tokenize_code
+
+# --- [설정] BM25 역색인 (Proposed 데이터셋 행 단위, 데이터셋 디렉토리에 저장) ---
+# 식별자 인식 토크나이저(tokenize_code: 원본 식별자 + camelCase/snake_case 하위 단어)로 본문과 메타데이터를 색인하여
+# useControlled / SelectTrigger 같은 정확한 심볼 질의를 벡터 전체 점수 계산 없이 포스팅 목록만으로 처리합니다.
+# 파일 구성 (bm25/):
+# - info.json: 문서 수, 평균 문서 길이, BM25 파라미터, 원본 데이터셋 이름
+# - terms.txt: 정렬된 어휘 (한 줄에 하나, 줄 번호 = 어휘 번호)
+# - term_offsets.i64: 어휘별 포스팅 바이트 구간 경계 (어휘 수 + 1) / term_df.i32: 어휘별 문서 빈도
+# - postings.bin: 어휘별 (행 번호 차분, 가중 빈도) varint 쌍 * df (메모리 매핑 로드)
+# - doc_lengths.i32: 행별 가중 문서 길이
+LEXICAL_DIR_NAME = "bm25"
+FIELD_WEIGHTS = {"content": 1, "parent_component": 3, "type": 1, "filepath": 1, "repo": 1} # 필드별 빈도 가중치 (BM25F 근사)
+DEFAULT_BM25 = {"k1": 1.2, "b": 0.75}
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+RRF_K = 60 # Reciprocal Rank Fusion 순위 완화 상수
+
+# --- [varint 인코딩] 7비트 단위 가변 길이 정수 (NumPy 일괄 변환) ---
+def encode_varints(values):
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= np.uint64(1 << shift)
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for i in range(int(lengths.max(initial=0))):
+        sel = lengths > i
+        byte = (values[sel] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        out[starts[sel] + i] = byte | np.where(lengths[sel] > i + 1, 0x80, 0).astype(np.uint64)
+    return out, lengths
+
+def decode_varints(data):
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) == 0: return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    values = (data & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(values, starts)
+
+# --- [구축] ---
+@lru_cache(maxsize=1 << 16)
+def identifier_terms(identifier):
+    return tuple(tokenize_code(identifier))
+
+def chunk_terms(chunk):
+    """
+    청크의 (어휘 -> 가중 빈도): 본문과 메타데이터 필드를 FIELD_WEIGHTS 가중치로 합산합니다.
+    tokenize_code와 같은 어휘를 만들되, 고유 식별자별로 1회만 분해합니다. (반복 식별자의 하위 단어 분리 캐시)
+    """
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = chunk.get(field)
+        if not value: continue
+        for identifier, n in Counter(IDENTIFIER_PATTERN.findall(str(value))).items():
+            for token in identifier_terms(identifier):
+                counts[token] += n * weight
+    return counts
+
+class LexicalIndexWriter:
+    """
+    파이프라인이 Proposed 청크를 기록하는 순서(= 데이터셋 행 순서)대로 청크를 받아 역색인을 구축합니다.
+    포스팅은 어휘별 array('I')로 메모리에 모은 뒤 close() 시 정렬/압축하여 임시 디렉토리에 기록 후 교체합니다.
+    """
+    def __init__(self, path, bm25=DEFAULT_BM25):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".tmp-{self.path.name}")
+        self.bm25 = bm25
+        self.postings = {} # 어휘 -> (행 번호 array, 가중 빈도 array)
+        self.doc_lengths = array("I")
+
+    def add(self, chunk):
+        row = len(self.doc_lengths)
+        counts = chunk_terms(chunk)
+        self.doc_lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("I"))
+            entry[0].append(row)
+            entry[1].append(tf)
+
+    def add_all(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+
+    def close(self, source):
+        """source: 색인한 데이터셋 파일 이름"""
+        if self.tmp_path.exists(): shutil.rmtree(self.tmp_path)
+        self.tmp_path.mkdir(parents=True)
+        terms = sorted(self.postings)
+        df = np.fromiter((len(self.postings[t][0]) for t in terms), dtype=np.int64, count=len(terms))
+        # 전체 어휘의 포스팅을 어휘 순서로 이어 붙여 차분/인코딩을 1회에 수행 (어휘 첫 항목은 행 번호 그대로)
+        rows = np.frombuffer(b"".join(self.postings[t][0] for t in terms), dtype=np.uint32).astype(np.int64)
+        tfs = np.frombuffer(b"".join(self.postings[t][1] for t in terms), dtype=np.uint32)
+        term_starts = np.cumsum(df) - df
+        deltas = np.diff(rows, prepend=0)
+        deltas[term_starts[df > 0]] = rows[term_starts[df > 0]]
+        values = np.empty(2 * len(rows), dtype=np.int64)
+        values[0::2], values[1::2] = deltas, tfs
+        data, lengths = encode_varints(values)
+        byte_bounds = np.concatenate(([0], np.cumsum(lengths)))[np.concatenate(([0], np.cumsum(2 * df)))]
+
+        data.tofile(self.tmp_path / "postings.bin")
+        byte_bounds.astype(np.int64).tofile(self.tmp_path / "term_offsets.i64")
+        df.astype(np.int32).tofile(self.tmp_path / "term_df.i32")
+        np.frombuffer(self.doc_lengths, dtype=np.uint32).astype(np.int32).tofile(self.tmp_path / "doc_lengths.i32")
+        (self.tmp_path / "terms.txt").write_text("\n".join(terms), encoding="utf-8")
+        docs = len(self.doc_lengths)
+        info = {"docs": docs, "terms": len(terms), "avgdl": sum(self.doc_lengths) / max(1, docs),
+                "source": source, "fields": FIELD_WEIGHTS, **self.bm25}
+        with (self.tmp_path / "info.json").open("w", encoding="utf-8") as f:
+            json.dump(info, f)
+        if self.path.exists(): shutil.rmtree(self.path)
+        self.tmp_path.replace(self.path)
+        self.postings.clear()
+        return info
+
+    def abort(self):
+        if self.tmp_path.exists(): shutil.rmtree(self.tmp_path)
+
+# --- [검색] ---
+class LexicalIndex:
+    """
+    BM25 역색인 검색. 질의 어휘의 포스팅만 복원하여 점수를 누적하므로 계산량은 일치 문서 수에 비례합니다.
+    행 번호는 Proposed 데이터셋 / 보조 인덱스(ChunkIndex) / 'ours' 벡터 인덱스의 행 번호와 같습니다.
+    """
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = Path(data_dir)
+        path = self.data_dir / LEXICAL_DIR_NAME
+        if not (path / "info.json").exists():
+            raise FileNotFoundError(f"{path} 을 찾을 수 없습니다. data_pipeline.py를 먼저 실행하십시오.")
+        with (path / "info.json").open("r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        self.rows = self.info["docs"]
+        terms = (path / "terms.txt").read_text(encoding="utf-8")
+        self.term_ids = {term: i for i, term in enumerate(terms.split("\n"))} if terms else {}
+        self.offsets = np.fromfile(path / "term_offsets.i64", dtype=np.int64)
+        self.df = np.fromfile(path / "term_df.i32", dtype=np.int32)
+        self.doc_lengths = np.fromfile(path / "doc_lengths.i32", dtype=np.int32)
+        self.postings_data = (np.memmap(path / "postings.bin", dtype=np.uint8, mode="r")
+                              if self.offsets[-1] else np.zeros(0, dtype=np.uint8))
+        k1, b, avgdl = self.info["k1"], self.info["b"], self.info["avgdl"] or 1.0
+        # 문서 길이 정규화 항 k1 * (1 - b + b * dl / avgdl)은 질의와 무관하므로 미리 계산
+        self.norms = (k1 * (1 - b + b * self.doc_lengths / avgdl)).astype(np.float32)
+        self._chunk_index = None
+
+    def close(self):
+        if self._chunk_index: self._chunk_index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def postings(self, term):
+        """어휘의 (행 번호 배열, 가중 빈도 배열). 색인에 없으면 빈 배열"""
+        term_id = self.term_ids.get(term)
+        if term_id is None: return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        values = decode_varints(self.postings_data[self.offsets[term_id] : self.offsets[term_id + 1]])
+        return np.cumsum(values[0::2]), values[1::2]
+
+    def idf(self, df):
+        return math.log(1 + (self.rows - df + 0.5) / (df + 0.5))
+
+    def score(self, query):
+        """질의 1개의 (일치 행 번호 배열, BM25 점수 배열)"""
+        k1 = self.info["k1"]
+        row_parts, score_parts = [], []
+        for term in dict.fromkeys(tokenize_code(query)): # 질의 내 중복 어휘는 1회만 (입력 순서 유지)
+            rows, tfs = self.postings(term)
+            if len(rows) == 0: continue
+            row_parts.append(rows)
+            score_parts.append(self.idf(len(rows)) * tfs * (k1 + 1) / (tfs + self.norms[rows]))
+        if not row_parts: return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows, inverse = np.unique(np.concatenate(row_parts), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate(score_parts))
+
+    def search_rows(self, queries, k=10):
+        """질의 문자열 목록에 대한 상위 k개 (행 번호, 점수) 목록을 반환합니다. (VectorStore.search_rows와 같은 형식)"""
+        results = []
+        for query in queries:
+            rows, scores = self.score(query)
+            top = np.argpartition(-scores, k)[:k] if len(rows) > k else np.arange(len(rows))
+            top = top[np.lexsort((rows[top], -scores[top]))] # 점수 내림차순, 동점은 행 번호 순
+            results.append(list(zip(rows[top].tolist(), scores[top].tolist())))
+        return results
+
+    def chunk_index(self):
+        """청크 본문/메타데이터 조회용 보조 인덱스 (최초 호출 시 열기)"""
+        if self._chunk_index is None: self._chunk_index = ChunkIndex(self.data_dir)
+        return self._chunk_index
+
+    def read_rows(self, rows):
+        return self.chunk_index().read_rows(rows)
+
+    def search(self, queries, k=10):
+        """질의 문자열 목록에 대한 상위 k개 (점수, 청크) 목록을 반환합니다."""
+        results = []
+        for hits in self.search_rows(queries, k):
+            chunks = self.read_rows([row for row, _ in hits])
+            results.append([(score, chunk) for (_, score), chunk in zip(hits, chunks)])
+        return results
+
+# --- [융합 순위] ---
+def fuse_rankings(rankings, k=10, rrf_k=RRF_K):
+    """
+    여러 순위 목록 [(행 번호, 점수)]를 Reciprocal Rank Fusion(sum 1 / (rrf_k + 순위))으로 결합합니다.
+    점수 척도가 다른 BM25와 코사인 유사도를 정규화 없이 결합하기 위해 순위만 사용합니다.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (row, _) in enumerate(ranking, 1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+def hybrid_search_rows(lexical, searcher, queries, k=10, candidates=50):
+    """
+    BM25 상위 후보와 벡터 검색 상위 후보를 RRF로 결합합니다.
+    - searcher: VectorStore 또는 IVFIndex (search_rows(queries, k) 제공, 'ours' 데이터셋으로 구축된 인덱스)
+    - candidates: 각 검색기에서 가져올 후보 수
+    """
+    lexical_hits = lexical.search_rows(queries, candidates)
+    vector_hits = searcher.search_rows(queries, candidates)
+    return [fuse_rankings(pair, k) for pair in zip(lexical_hits, vector_hits)]
+
+def check_aligned(lexical, store):
+    """벡터 인덱스가 역색인과 같은 데이터셋(행 번호 체계)으로 구축되었는지 확인합니다."""
+    if store.info.get("source") != lexical.info["source"] or store.rows != lexical.rows:
+        raise ValueError(f"벡터 인덱스({store.info.get('source')}, {store.rows}행)가 역색인({lexical.info['source']}, "
+                         f"{lexical.rows}행)과 다른 데이터셋입니다. retrieval.py build --dataset ours로 재구축하십시오.")
+
+def search_rows(mode, queries, k=10, lexical=None, store=None, candidates=50):
+    """mode별 (행 번호, 점수) 목록: vector / lexical / hybrid"""
+    if mode == "lexical": return lexical.search_rows(queries, k)
+    if mode == "vector": return store.search_rows(queries, k)
+    return hybrid_search_rows(lexical, store, queries, k, candidates)
+
+# --- [성능 측정] 정확한 심볼 질의 ---
+def symbol_queries(lexical, n=200, seed=0):
+    """보조 인덱스의 상위 컴포넌트 이름(정답: 해당 컴포넌트의 청크)을 심볼 질의로 샘플링합니다."""
+    names = [r[0] for r in lexical.chunk_index().conn.execute(
+        "SELECT DISTINCT parent_component FROM chunks WHERE parent_component IS NOT NULL ORDER BY parent_component")]
+    rng = np.random.default_rng(seed)
+    return [names[i] for i in sorted(rng.choice(len(names), size=min(n, len(names)), replace=False))]
+
+def benchmark(lexical, store, queries, k=10):
+    """모드별 질의 지연 시간(ms)과 심볼 적중률(상위 1개 / 상위 k개에 해당 컴포넌트 청크 포함)을 측정합니다."""
+    conn = lexical.chunk_index().conn
+    gold = {name: {r[0] for r in conn.execute("SELECT row FROM chunks WHERE parent_component = ?", (name,))}
+            for name in queries}
+    report = {}
+    for mode in SEARCH_MODES:
+        latencies, top1, topk = [], 0, 0
+        for query in queries:
+            start = time.perf_counter()
+            hits = search_rows(mode, [query], k, lexical, store)[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            rows = [row for row, _ in hits]
+            top1 += bool(rows) and rows[0] in gold[query]
+            topk += bool(gold[query].intersection(rows))
+        report[mode] = {"p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+                        "p99_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+                        "hit@1": top1 / max(1, len(queries)), f"hit@{k}": topk / max(1, len(queries))}
+    return report
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="BM25 역색인 검색 및 벡터 검색과의 융합 순위")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    query_cmd = sub.add_parser("query", help="검색")
+    query_cmd.add_argument("text")
+    query_cmd.add_argument("--mode", choices=SEARCH_MODES, default="hybrid")
+    query_cmd.add_argument("-k", type=int, default=5)
+    query_cmd.add_argument("--candidates", type=int, default=50, help="hybrid 모드에서 검색기별 후보 수")
+    bench_cmd = sub.add_parser("bench", help="정확한 심볼 질의의 모드별 지연 시간 / 적중률 측정")
+    bench_cmd.add_argument("--queries", type=int, default=200)
+    bench_cmd.add_argument("-k", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    lexical = LexicalIndex(DATA_DIR)
+    store = None
+    if args.command == "bench" or args.mode != "lexical":
+        store = VectorStore(INDEX_DIR / "ours")
+        check_aligned(lexical, store)
+    if args.command == "query":
+        hits = search_rows(args.mode, [args.text], args.k, lexical, store, args.candidates)[0]
+        chunks = lexical.read_rows([row for row, _ in hits])
+        for rank, ((row, score), chunk) in enumerate(zip(hits, chunks), 1):
+            content = str(chunk["content"]).replace("\n", " ")
+            print(f"  [{rank}] {score:.3f} {chunk.get('filepath')} / {chunk.get('parent_component', '-')} ({chunk['type']})")
+            print(f"      내용: \"{content[:75]}{'...' if len(content) > 75 else ''}\"")
+    else:
+        queries = symbol_queries(lexical, args.queries)
+        print(json.dumps({"queries": len(queries), "rows": lexical.rows, "terms": lexical.info["terms"],
+                          **benchmark(lexical, store, queries, args.k)}, ensure_ascii=False, indent=2))
+    lexical.close()
+    if store: store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import threading
+from importlib import metadata
+from pathlib import Path
+from tree_sitter import Language, Parser
+import tree_sitter_javascript as tsj
+import tree_sitter_typescript as tst
+
+# --- [설정] 언어 로드 (tree-sitter 0.25+ API) ---
+# tree-sitter-typescript 패키지가 제공하는 PyCapsule을 Language로 래핑하여 프로세스당 1회만 생성
+LANGUAGES = {
+    "typescript": Language(tst.language_typescript()),
+    "tsx": Language(tst.language_tsx()),
+    "javascript": Language(tsj.language()),
+}
+TS_LANGUAGE = LANGUAGES["typescript"]
+TSX_LANGUAGE = LANGUAGES["tsx"]
+JS_LANGUAGE = LANGUAGES["javascript"]
+
+# 확장자 -> 언어 이름 (미등록 확장자는 DEFAULT_LANGUAGE로 처리)
+# JavaScript 문법은 JSX를 기본 포함하므로 .js 파일 내의 JSX도 별도 판별 없이 jsx_element로 파싱됨
+EXTENSION_LANGUAGES = {
+    ".tsx": "tsx",
+    ".ts": "typescript",
+    ".mts": "typescript",
+    ".cts": "typescript",
+    ".jsx": "javascript",
+    ".js": "javascript",
+    ".mjs": "javascript",
+    ".cjs": "javascript",
+}
+DEFAULT_LANGUAGE = "typescript"
+
+# 언어 -> 문법 패키지 (청킹 결과 캐시의 문법 버전 식별자에 사용)
+GRAMMAR_PACKAGES = {
+    "typescript": "tree-sitter-typescript",
+    "tsx": "tree-sitter-typescript",
+    "javascript": "tree-sitter-javascript",
+}
+
+# --- [파서 풀] 스레드별 · 언어별 Parser 캐시 ---
+# tree_sitter.Parser는 스레드 간 공유가 안전하지 않으므로 스레드마다 언어별 인스턴스를 1개씩 재사용
+_local = threading.local()
+
+def language_for_file(filepath):
+    """파일 확장자로 사용할 언어 이름을 결정합니다."""
+    return EXTENSION_LANGUAGES.get(Path(filepath).suffix, DEFAULT_LANGUAGE)
+
+def grammar_version(language_name):
+    """언어별 문법 버전 식별자: tree-sitter 런타임/문법 패키지 버전 + 언어 ABI 버전"""
+    versions = []
+    for package in ("tree-sitter", GRAMMAR_PACKAGES[language_name]):
+        try:
+            versions.append(f"{package}=={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{package}==unknown")
+    return f"{language_name}:{','.join(versions)}:abi{LANGUAGES[language_name].abi_version}"
+
+def get_parser(language_name):
+    """현재 스레드에 캐시된 언어별 Parser를 반환합니다. (최초 호출 시 생성)"""
+    parsers = getattr(_local, "parsers", None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    parser = parsers.get(language_name)
+    if parser is None:
+        parser = Parser()
+        parser.language = LANGUAGES[language_name]
+        parsers[language_name] = parser
+    return parser
+
+def get_parser_for_file(filepath):
+    return get_parser(language_for_file(filepath))
+
+def read_source(filepath, limit=None):
+    """
+    파일을 바이트로 읽어 반환합니다. (텍스트 모드 읽기와 동일하게 줄바꿈을 '\\n'으로 정규화)
+    str 디코딩/재인코딩 없이 파서와 청커가 같은 바이트 버퍼를 공유합니다.
+    - limit: 앞부분 최대 바이트 수 (None: 전체)
+    """
+    with open(filepath, "rb") as f:
+        source = f.read(limit)
+    if b"\r" in source:
+        source = source.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return source
+
+def parse_file(filepath):
+    """파일을 파싱하여 (Tree, 소스 바이트)를 반환합니다."""
+    source = read_source(filepath)
+    tree = get_parser_for_file(filepath).parse(source)
+    return tree, source
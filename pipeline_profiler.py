@@ -0,0 +1,125 @@
+import heapq
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+# --- [설정] 계측 단계 ---
+# read: 파일 읽기 / parse: AST 생성 / baseline: 고정 크기 청킹 / traverse: AST 청킹 / serialize: 데이터셋 기록
+STAGES = ("read", "parse", "baseline", "traverse", "serialize")
+
+class FileTimer:
+    """
+    단일 파일 처리 중 단계별 경과 시간과 노드/청크 수를 기록합니다.
+    워커 프로세스에서 생성되며, 결과(record)는 일반 dict이므로 pickle로 메인 프로세스에 전달됩니다.
+    """
+    __slots__ = ("record", "_last")
+
+    def __init__(self, path):
+        self.record = {"path": str(path), "stages": dict.fromkeys(STAGES, 0.0),
+                       "nodes": 0, "chunks": {"baseline": 0, "ours": 0}, "error": None, "policy": "full"}
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        """직전 lap 이후 경과 시간을 stage에 누적합니다."""
+        now = time.perf_counter()
+        self.record["stages"][stage] += now - self._last
+        self._last = now
+
+class PipelineProfiler:
+    """
+    파이프라인 단계별 시간, 파일별 노드/청크 수, 예외 유형별 오류 수를 집계합니다.
+    비활성화 시에는 생성하지 않으며(profiler=None), 파이프라인은 계측 코드를 건너뜁니다.
+    """
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.started = time.perf_counter()
+        self.stage_totals = dict.fromkeys(STAGES, 0.0)
+        self.errors = Counter()
+        self.error_samples = {}
+        self.files = 0
+        self.reused = 0
+        self.cached = 0
+        self.limited = Counter() # 대용량/생성 파일 정책별 파일 수
+        self.nodes = 0
+        self.chunks = Counter()
+        self._slowest = [] # (총 시간, 순번, record) 최소 힙으로 상위 N개 유지
+        self._seq = 0
+
+    def add(self, record):
+        """워커가 반환한 파일 단위 record를 집계합니다. (처리 시간 순위는 add_serialize에서 반영)"""
+        self.files += 1
+        for stage, seconds in record["stages"].items():
+            self.stage_totals[stage] += seconds
+        self.nodes += record["nodes"]
+        self.chunks.update(record["chunks"])
+        if record["policy"] != "full": self.limited[record["policy"]] += 1
+        if record["error"]:
+            error_type = record["error"]["type"]
+            self.errors[error_type] += 1
+            self.error_samples.setdefault(error_type, record["path"])
+
+    def _rank(self, record):
+        # 직렬화 시간까지 반영된 최종 총 시간으로 상위 N개 힙 갱신
+        total = sum(record["stages"].values())
+        item = (total, self._seq, record)
+        self._seq += 1
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        elif total > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def add_reused(self):
+        """증분 빌드에서 재사용된(처리하지 않은) 파일 수를 집계합니다."""
+        self.reused += 1
+
+    def add_cached(self):
+        """청킹 결과 캐시에서 로드된(파싱하지 않은) 파일 수를 집계합니다."""
+        self.cached += 1
+
+    def add_serialize(self, record, seconds):
+        """메인 프로세스에서 측정한 직렬화 시간을 해당 파일 record와 전체 합계에 반영합니다."""
+        self.stage_totals["serialize"] += seconds
+        if record is not None:
+            record["stages"]["serialize"] += seconds
+            self._rank(record)
+
+    def report(self):
+        """기계 판독용(JSON 직렬화 가능) 리포트를 생성합니다."""
+        slowest = [dict(record, total_seconds=total) for total, _, record in sorted(self._slowest, reverse=True)]
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "files_processed": self.files,
+            "files_reused": self.reused,
+            "files_cached": self.cached,
+            "files_failed": sum(self.errors.values()),
+            "files_limited": dict(self.limited),
+            "stage_seconds": self.stage_totals,
+            "nodes": self.nodes,
+            "chunks": dict(self.chunks),
+            "errors": dict(self.errors),
+            "error_samples": self.error_samples,
+            "slowest_files": slowest,
+        }
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+    def print_summary(self):
+        report = self.report()
+        print("\n[Profile] 단계별 처리 시간")
+        for stage, seconds in report["stage_seconds"].items():
+            print(f"   - {stage:<10}: {seconds:.3f}s")
+        print(f"   - 처리 {report['files_processed']}개 / 재사용 {report['files_reused']}개 / 캐시 {report['files_cached']}개 / 실패 {report['files_failed']}개, "
+              f"노드 {report['nodes']}개, 전체 {report['wall_seconds']:.3f}s")
+        if report["errors"]:
+            print(f"   - 오류 유형: {report['errors']}")
+        if report["files_limited"]:
+            print(f"   - 대용량/생성 파일 정책: {report['files_limited']}")
+        print(f"[Profile] 처리 시간 상위 {len(report['slowest_files'])}개 파일")
+        for record in report["slowest_files"]:
+            print(f"   - {record['total_seconds'] * 1000:8.2f}ms  노드 {record['nodes']:>6}  "
+                  f"청크 {record['chunks']['ours']:>4}  {record['path']}")
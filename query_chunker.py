@@ -0,0 +1,267 @@
+import argparse
+import json
+import sys
+import time
+from tree_sitter import Query, QueryCursor, QueryError
+import data_pipeline
+from chunk_cache import source_fingerprint
+from data_pipeline import HOOK_NAME_PATTERN, HOOK_VALUE_TYPES, SourceSpan, chunk_ours, collect_target_files
+from parsing import language_for_file, parse_file
+
+# --- [선언적 추출 규칙] tree-sitter Query 패턴 기반 ---
+# 노드 탐색과 패턴 일치는 C(QueryCursor)에서 수행하고, Python은 일치 결과(캡처)만 받아 일괄로 청크를 구성합니다.
+# 규칙 형식 (dict, 등록 순서가 우선순위):
+# - role "scope": 상위 문맥을 여는 선언 (컴포넌트 / 커스텀 Hook 정의)
+#   - query 캡처: @scope(선언 노드), @name(이름 노드), @value(선택: 선언자의 값 노드)
+#   - accept(name, value): 이름/값으로 선언 채택 여부 결정 (생략 시 모두 채택)
+#   - 같은 선언 노드에 선언자가 여러 개면 마지막 선언자 기준 (chunk_ours와 동일)
+#   - id_tag / chunk_type / content("signature": "Component: 이름", "span": 선언 전체)
+# - role "unit": 감싸고 있는 모든 scope에 귀속되는 청크 (Hook 호출 / JSX 반환)
+#   - query 캡처: @unit(청크 경계 노드, 하위의 다른 unit은 같은 scope에 중복 귀속되지 않음), @content(선택: 본문 노드)
+#   - id_tag / chunk_type (청크 ID: {상위 이름}_{id_tag}_{@unit 시작 행})
+# - fallback(선택): query의 노드 유형이 없는 문법에서 대신 컴파일할 패턴 (예: JSX가 없는 TypeScript 문법)
+# 언어 문법에 없는 노드 유형을 쓰고 fallback도 컴파일되지 않는 규칙은 해당 언어에서만 제외됩니다.
+CORE_RULES = [
+    {
+        "name": "component_declaration",
+        "role": "scope",
+        "query": """
+            (function_declaration name: (_) @name) @scope
+            (lexical_declaration (variable_declarator name: (_) @name)) @scope
+        """,
+        "accept": lambda name, value: name[:1].isupper(),
+        "id_tag": "sig",
+        "chunk_type": "Component Signature",
+        "content": "signature",
+    },
+    {
+        "name": "hook_definition",
+        "role": "scope",
+        # function_declaration은 선언 자체를 값으로 캡처, 선언자는 초기값이 없으면 값 없음(채택 안 함)
+        # (선언자 값을 필수로 하면 let useA = () => {}, useB; 에서 마지막 선언자가 아닌 useA가 남으므로 선택 캡처 유지)
+        "query": """
+            (function_declaration name: (_) @name) @scope @value
+            (lexical_declaration (variable_declarator name: (_) @name value: (_)? @value)) @scope
+        """,
+        "accept": lambda name, value: bool(HOOK_NAME_PATTERN.match(name)) and value is not None and (
+            value.type == "function_declaration" or value.type in HOOK_VALUE_TYPES),
+        "id_tag": "hookdef",
+        "chunk_type": "Logic (Hook Definition)",
+        "content": "span",
+    },
+    {
+        "name": "hook_call",
+        "role": "unit",
+        "query": """((call_expression function: (_) @callee) @unit (#match? @callee "^use"))""",
+        "id_tag": "hook",
+        "chunk_type": "Logic (Hook)",
+    },
+    {
+        "name": "jsx_return",
+        "role": "unit",
+        # JSX_RETURN_TYPES 중 jsx_fragment는 현재 문법에 없는 유형(<></>도 jsx_element)이므로 제외
+        "query": """(return_statement [(parenthesized_expression) (jsx_element)] @content) @unit""",
+        # TypeScript(.ts) 문법에는 jsx_element가 없으므로 괄호식만 (chunk_ours와 동일하게 return (...)은 View 청크)
+        "fallback": """(return_statement (parenthesized_expression) @content) @unit""",
+        "id_tag": "jsx",
+        "chunk_type": "View (JSX)",
+    },
+]
+
+# forwardRef / memo로 감싼 익명 default export 컴포넌트 (export default memo(function Foo() {...}))
+# const Foo = forwardRef(...) 형태는 component_declaration이 이미 처리하므로 export 문의 값으로 한정
+WRAPPER_RULES = [
+    {
+        "name": "wrapped_component",
+        "role": "scope",
+        "query": """
+            (export_statement value: (call_expression
+                function: (_) @wrapper
+                arguments: (arguments (function_expression name: (identifier) @name))) @scope
+                (#match? @wrapper "^(React\\\\.)?(forwardRef|memo)$"))
+            (export_statement value: (call_expression
+                function: (_) @wrapper
+                arguments: (arguments (call_expression
+                    function: (_) @inner
+                    arguments: (arguments (function_expression name: (identifier) @name))))) @scope
+                (#match? @wrapper "^(React\\\\.)?(forwardRef|memo)$")
+                (#match? @inner "^(React\\\\.)?(forwardRef|memo)$"))
+        """,
+        "accept": lambda name, value: name[:1].isupper(),
+        "id_tag": "sig",
+        "chunk_type": "Component Signature",
+        "content": "signature",
+    },
+]
+DEFAULT_RULES = CORE_RULES + WRAPPER_RULES
+
+class QueryChunker:
+    """
+    규칙 집합을 언어별로 1회 컴파일(단일 Query로 결합)하여 재사용하는 추출 엔진입니다.
+    - 사용자 규칙 추가: QueryChunker(DEFAULT_RULES + [rule])
+    - CORE_RULES만 사용하면 chunk_ours(max_tokens=None)와 동일한 청크를 생성
+    """
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = list(rules)
+        self._compiled = {} # Language -> (Query, 패턴 번호별 (규칙 번호, 규칙), 제외/대체된 규칙 {이름: 상태})
+
+    def compile(self, language):
+        compiled = self._compiled.get(language)
+        if compiled is None:
+            sources, pattern_rules, degraded = [], [], {}
+            for index, rule in enumerate(self.rules):
+                # 문법에 없는 노드 유형(예: TypeScript 문법의 JSX)이면 fallback 패턴, 그것도 실패하면 제외
+                candidates = [("query", rule["query"])] + ([("fallback", rule["fallback"])] if "fallback" in rule else [])
+                for variant, source in candidates:
+                    try:
+                        pattern_count = Query(language, source).pattern_count
+                    except QueryError:
+                        continue
+                    sources.append(source)
+                    pattern_rules.extend([(index, rule)] * pattern_count)
+                    if variant == "fallback": degraded[rule["name"]] = "fallback"
+                    break
+                else:
+                    degraded[rule["name"]] = "skipped"
+            compiled = self._compiled[language] = (Query(language, "\n".join(sources)), pattern_rules, degraded)
+        return compiled
+
+    def chunk(self, tree, code, language=None):
+        """
+        - tree: Tree 또는 부분 트리 Node (Node는 language 지정 필요)
+        - 반환: chunk_ours와 같은 형식의 청크 목록 (ID 기준 중복 없음)
+        """
+        source = memoryview(code.encode("utf8") if isinstance(code, str) else code)
+        root = getattr(tree, "root_node", tree)
+        query, pattern_rules, _ = self.compile(language or tree.language)
+
+        # 1. 일치 결과 수집 (C에서 탐색 완료, Python은 캡처만 처리)
+        declarations = {} # (선언 노드 ID, 규칙 번호) -> (선언 노드, 이름 노드, 값 노드) - 마지막 선언자 유지
+        events = []       # (시작 바이트, -끝 바이트, 0=scope/1=unit, 규칙 번호, 노드, 본문 노드, 규칙)
+        for pattern_index, captures in QueryCursor(query).matches(root):
+            rule_index, rule = pattern_rules[pattern_index]
+            if rule["role"] == "scope":
+                scope, name_node = captures["scope"][0], captures["name"][0]
+                key = (scope.id, rule_index)
+                previous = declarations.get(key)
+                if previous is None or name_node.start_byte > previous[1].start_byte:
+                    value = captures.get("value")
+                    declarations[key] = (scope, name_node, value[0] if value else None)
+            else:
+                unit = captures["unit"][0]
+                content = captures.get("content", captures["unit"])[0]
+                events.append((unit.start_byte, -unit.end_byte, 1, rule_index, unit, content, rule))
+
+        # 2. 선언 분류: 같은 선언 노드에 일치한 규칙 중 먼저 등록된 규칙부터 accept 검사
+        classified = {}
+        for (scope_id, rule_index), (scope, name_node, value) in sorted(declarations.items(), key=lambda x: x[0][1]):
+            if scope_id in classified: continue
+            rule = self.rules[rule_index]
+            name = str(source[name_node.start_byte : name_node.end_byte], "utf8")
+            if rule.get("accept") is None or rule["accept"](name, value):
+                classified[scope_id] = (scope, name, rule)
+        for scope, name, rule in classified.values():
+            events.append((scope.start_byte, -scope.end_byte, 0, 0, scope, name, rule))
+
+        # 3. 선언 순서(pre-order) 스윕: scope 스택과 scope별 차단 구간(마지막으로 귀속된 unit의 끝)으로 귀속 결정
+        events.sort(key=lambda e: e[:4])
+        components, stack = [], [] # 프레임: [끝 바이트, 이름, 청크 목록, 차단 끝 바이트]
+        for start, neg_end, role, _, node, payload, rule in events:
+            while stack and stack[-1][0] <= start:
+                stack.pop()
+            if role == 0:
+                name, row = payload, node.start_point[0]
+                content = (f"Component: {name}" if rule["content"] == "signature"
+                           else SourceSpan(source, node.start_byte, node.end_byte))
+                frame = [-neg_end, name, [{
+                    "id": f"{name}_{rule['id_tag']}_{row}",
+                    "type": rule["chunk_type"],
+                    "parent_component": name,
+                    "content": content,
+                    "line": row + 1
+                }], 0]
+                components.append(frame)
+                stack.append(frame)
+            elif stack:
+                row = node.start_point[0]
+                content = SourceSpan(source, payload.start_byte, payload.end_byte)
+                for frame in stack:
+                    if start < frame[3]: continue # 이 scope에 이미 귀속된 unit의 하위
+                    frame[2].append({
+                        "id": f"{frame[1]}_{rule['id_tag']}_{row}",
+                        "type": rule["chunk_type"],
+                        "parent_component": frame[1],
+                        "content": content,
+                        "line": row + 1
+                    })
+                    frame[3] = -neg_end
+
+        # 컴포넌트 선언 순서대로 병합 (동일 ID는 최초 위치 유지)
+        chunks = {}
+        for frame in components:
+            for chunk in frame[2]:
+                chunks[chunk["id"]] = chunk
+        return list(chunks.values())
+
+DEFAULT_CHUNKER = QueryChunker()
+# 엔진 버전: 모듈 소스 해시 (규칙/엔진 수정 시 청킹 결과 캐시·매니페스트 자동 무효화)
+ENGINE_VERSION = source_fingerprint([sys.modules[__name__]], [])
+
+def chunk_query(tree, code, language=None):
+    """기본 규칙 집합(DEFAULT_RULES)으로 청크를 추출합니다."""
+    return DEFAULT_CHUNKER.chunk(tree, code, language)
+
+# --- [벤치마크] 순회 기반 chunk_ours vs Query 엔진 ---
+def run_benchmark(repeat=5):
+    """
+    전체 대상 파일을 미리 파싱한 뒤 청킹 단계만 반복 측정합니다. (파싱/입출력 제외)
+    CORE_RULES 엔진의 출력이 chunk_ours와 동일한지 함께 검증합니다.
+    """
+    print("[Process] 청킹 엔진 벤치마크 시작...")
+    target_files = collect_target_files(data_pipeline.get_search_dir())
+    corpus = [(path, *parse_file(path)) for path in target_files]
+    nodes = sum(tree.root_node.descendant_count for _, tree, _ in corpus)
+    print(f"[Info] 대상 파일: {len(corpus)}개 / 노드: {nodes}개 / 반복: {repeat}회")
+
+    core = QueryChunker(CORE_RULES)
+    engines = {
+        "traverse": lambda tree, source: chunk_ours(tree, source),
+        "query_core": core.chunk,
+        "query_default": DEFAULT_CHUNKER.chunk,
+    }
+    for engine in (core, DEFAULT_CHUNKER): # 언어별 컴파일은 측정에서 제외
+        for path, tree, _ in corpus: engine.compile(tree.language)
+
+    def serialize(chunks):
+        return json.dumps(chunks, ensure_ascii=False, default=str)
+
+    mismatched = [path.name for path, tree, source in corpus
+                  if serialize(chunk_ours(tree, source)) != serialize(core.chunk(tree, source))]
+
+    report = {}
+    for name, engine in engines.items():
+        best, chunk_count = float("inf"), 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            chunk_count = sum(len(engine(tree, source)) for _, tree, source in corpus)
+            best = min(best, time.perf_counter() - started)
+        report[name] = {"seconds": best, "chunks": chunk_count}
+
+    print("\n[Result] 청킹 단계 처리 시간 (반복 중 최솟값)")
+    base = report["traverse"]["seconds"]
+    for name, row in report.items():
+        print(f"   - {name:<14}: {row['seconds'] * 1000:8.2f}ms  청크 {row['chunks']:>6}개  "
+              f"(파일당 {row['seconds'] * 1e6 / max(1, len(corpus)):.1f}µs, 속도 x{base / row['seconds']:.2f})")
+    degraded = {language_for_file(path): DEFAULT_CHUNKER.compile(tree.language)[2] for path, tree, _ in corpus}
+    print(f"   - 언어별 제외/대체(fallback) 규칙: {degraded}")
+    if mismatched:
+        print(f"[Warning] CORE_RULES 결과가 chunk_ours와 다른 파일: {len(mismatched)}개 (예: {mismatched[:5]})")
+    else:
+        print("[Success] CORE_RULES 결과가 모든 파일에서 chunk_ours와 동일합니다.")
+    return report
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="tree-sitter Query 기반 청크 추출 엔진 벤치마크")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수")
+    args = arg_parser.parse_args()
+    run_benchmark(repeat=args.repeat)
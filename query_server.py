@@ -0,0 +1,329 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from pathlib import Path
+import numpy as np
+from retrieval import INDEX_DIR, META_NAME, VectorStore, tokenize_code
+
+# --- [설정] ---
+FILTER_FIELDS = ("type", "parent_component", "filepath") # 검색 필터로 사용할 메타데이터 필드
+MAX_BODY_BYTES = 1 << 20
+REJECT_LINGER_SECONDS = 1.0 # 잘못된 요청에 400 응답 후 남은 입력을 버리며 연결 종료를 기다리는 최대 시간
+
+# --- [메타데이터 필터 컬럼] ---
+class FilterColumns:
+    """
+    필터 필드별 값을 정수 코드 배열(int32, 행 단위)로 보관하여 질의 시 메타데이터를 읽지 않고 마스크를 계산합니다.
+    서버 시작 시 메타데이터 테이블을 1회 스캔하여 구축합니다.
+    """
+    def __init__(self, index_dir, rows):
+        self.vocab = {field: {} for field in FILTER_FIELDS}
+        self.codes = {field: np.full(rows, -1, dtype=np.int32) for field in FILTER_FIELDS}
+        with (Path(index_dir) / META_NAME).open("rb") as f:
+            for row, line in enumerate(f):
+                chunk = json.loads(line)
+                for field in FILTER_FIELDS:
+                    value = chunk.get(field)
+                    if value is None: continue
+                    vocab = self.vocab[field]
+                    self.codes[field][row] = vocab.setdefault(value, len(vocab))
+
+    def validate(self, filters):
+        """필터 조건 형식 검사 (필드 -> 스칼라 값). 잘못된 조건은 배치에 넣기 전에 ValueError로 거부"""
+        if not isinstance(filters, dict):
+            raise ValueError("filters는 필드 -> 값 객체여야 합니다.")
+        for field, value in filters.items():
+            if field not in self.codes:
+                raise ValueError(f"지원하지 않는 필터 필드: {field}")
+            if not isinstance(value, (str, int, float, bool)):
+                raise ValueError(f"필터 값은 문자열/숫자여야 합니다: {field}")
+        return filters
+
+    def mask(self, filters):
+        """필터 조건(필드 -> 값)을 모두 만족하는 행의 bool 마스크. 조건이 없으면 None"""
+        mask = None
+        for field, value in filters.items():
+            if field not in self.codes:
+                raise ValueError(f"지원하지 않는 필터 필드: {field}")
+            code = self.vocab[field].get(value)
+            field_mask = (self.codes[field] == code) if code is not None else np.zeros(len(self.codes[field]), dtype=bool)
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+# --- [마이크로 배치 검색] ---
+class BatchingSearcher:
+    """
+    동시에 도착한 질의를 최대 max_batch개 또는 max_wait 동안 모아 행렬 곱 1회로 점수를 계산합니다.
+    점수 계산은 스레드 풀에서 실행하여(NumPy 연산 중 GIL 해제) 이벤트 루프가 요청 수신을 계속하도록 합니다.
+    """
+    def __init__(self, store, columns, max_batch=64, max_wait=0.002):
+        self.store = store
+        self.columns = columns
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=10000) # 최근 요청 지연 (ms)
+
+    async def search(self, query, k=10, filters=None):
+        # 요청 단위 검증: 잘못된 요청이 같은 배치의 다른 요청을 실패시키지 않도록 큐에 넣기 전에 거부
+        if k < 1: raise ValueError(f"k는 1 이상이어야 합니다: {k}")
+        filters = self.columns.validate(filters or {})
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.queue.put((query, k, filters, future))
+        results = await future
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        self.requests += 1
+        return results
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await loop.run_in_executor(None, self._search_batch, batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done(): future.set_exception(e)
+                continue
+            self.batches += 1
+            for (*_, future), result in zip(batch, results):
+                if future.done(): continue
+                if isinstance(result, Exception): future.set_exception(result)
+                else: future.set_result(result)
+
+    def _search_batch(self, batch):
+        """배치 점수 계산 후 요청별 결과 목록을 반환합니다. (요청별 필터/top-k 단계의 예외는 해당 요청의 결과로 반환)"""
+        query_vectors = self.store.embedder.embed([query for query, *_ in batch])
+        scores = self.store.score(query_vectors)
+        results = []
+        for row_scores, (_, k, filters, _) in zip(scores, batch):
+            try:
+                mask = self.columns.mask(filters)
+                if mask is not None:
+                    row_scores = np.where(mask, row_scores, -np.inf)
+                hits = self.store.top_k(row_scores[None], k)[0]
+                results.append([{"score": score, "chunk": self.store.metadata(row)}
+                                for row, score in hits if score != -np.inf])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        latencies = np.fromiter(self.latencies, dtype=np.float64)
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.store.rows,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / max(1, self.batches),
+            "throughput_qps": self.requests / max(elapsed, 1e-9),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+        }
+
+# --- [HTTP/JSON 서버] 표준 라이브러리 asyncio 스트림 기반 (HTTP/1.1 keep-alive) ---
+async def read_request(reader):
+    """요청 1건을 읽어 (메서드, 경로, 헤더, 본문)을 반환합니다. 연결이 닫히면 None"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES: raise ValueError("요청 본문이 너무 큽니다.")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+def write_response(writer, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf8")
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+
+async def handle(searcher, method, path, body):
+    """라우팅: POST /search, GET /stats, GET /health"""
+    if method == "POST" and path == "/search":
+        request = json.loads(body or b"{}")
+        if not isinstance(request, dict): raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+        start = time.perf_counter()
+        results = await searcher.search(str(request["query"]), int(request.get("k", 10)), request.get("filters"))
+        return 200, {"results": results, "ms": (time.perf_counter() - start) * 1000}
+    if method == "GET" and path == "/stats":
+        return 200, searcher.stats()
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok"}
+    return 404, {"error": f"{method} {path}"}
+
+async def reject(reader, writer, error):
+    """
+    400 응답 후 쓰기 방향을 닫고 남은 요청 데이터를 잠시 버립니다. (lingering close)
+    읽지 않은 데이터가 남은 채 소켓을 닫으면 RST가 전송되어 클라이언트가 응답을 받지 못할 수 있음
+    """
+    write_response(writer, 400, {"error": error})
+    if writer.can_write_eof(): writer.write_eof()
+    await writer.drain()
+
+    async def discard():
+        while await reader.read(1 << 16): pass
+    try:
+        await asyncio.wait_for(discard(), REJECT_LINGER_SECONDS)
+    except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+        pass
+
+async def handle_connection(searcher, reader, writer):
+    """
+    연결 1개의 요청들을 순서대로 처리합니다. (keep-alive)
+    - 잘못된 요청 줄/헤더, 본문 크기 초과, 헤더 길이 초과, 요청 도중 연결 종료는 400 응답 후 연결 종료
+      (본문을 다 읽지 못해 다음 요청 경계를 알 수 없으므로 연결을 재사용하지 않음)
+    """
+    try:
+        while True:
+            try:
+                method, path, _, body = await read_request(reader)
+            except asyncio.IncompleteReadError as e:
+                # 요청 사이에서 연결이 닫힌 경우(partial 없음)는 정상 종료
+                if e.partial: await reject(reader, writer, "IncompleteReadError: 요청이 완료되지 않았습니다.")
+                break
+            except ConnectionError:
+                break
+            except (asyncio.LimitOverrunError, ValueError) as e:
+                await reject(reader, writer, f"{type(e).__name__}: {e}")
+                break
+            try:
+                status, payload = await handle(searcher, method, path, body)
+            except (KeyError, ValueError) as e:
+                status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+            except Exception as e:
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            write_response(writer, status, payload)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(index_dir, host="127.0.0.1", port=8765, max_batch=64, max_wait_ms=2.0):
+    store = VectorStore(index_dir)
+    columns = FilterColumns(index_dir, store.rows)
+    searcher = BatchingSearcher(store, columns, max_batch=max_batch, max_wait=max_wait_ms / 1000)
+    batcher = asyncio.create_task(searcher.run())
+
+    async def on_connect(reader, writer):
+        await handle_connection(searcher, reader, writer)
+
+    server = await asyncio.start_server(on_connect, host, port)
+    print(f"[Server] 인덱스 {index_dir} ({store.rows}행) 로드 완료. http://{host}:{port} 대기 중... (Ctrl+C 종료)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+        store.close()
+
+# --- [부하 테스트 클라이언트] ---
+async def _post(reader, writer, host, payload):
+    body = json.dumps(payload).encode("utf8")
+    writer.write(f"POST /search HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                  if line.lower().startswith(b"content-length:"))
+    return status, json.loads(await reader.readexactly(length))
+
+async def load_test(queries, host="127.0.0.1", port=8765, concurrency=32, total=2000, k=10):
+    """
+    keep-alive 연결 concurrency개로 질의 total건을 동시에 전송하여 처리량(QPS)과 지연(p50/p99)을 측정합니다.
+    """
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                start = time.perf_counter()
+                status, _ = await _post(reader, writer, host, {"query": queries[i % len(queries)], "k": k})
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200: errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                  if line.lower().startswith(b"content-length:"))
+    server_stats = json.loads(await reader.readexactly(length))
+    writer.close()
+    return {
+        "requests": len(latencies), "errors": errors, "concurrency": concurrency,
+        "throughput_qps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)), "p99_ms": float(np.percentile(latencies, 99)),
+        "server_mean_batch_size": server_stats["mean_batch_size"],
+    }
+
+def sample_queries(index_dir, n=200, seed=0):
+    """인덱스에 저장된 청크 본문에서 부하 테스트용 질의를 샘플링합니다."""
+    store = VectorStore(index_dir)
+    rows = random.Random(seed).sample(range(store.rows), min(n, store.rows))
+    queries = [" ".join(tokenize_code(str(store.metadata(r)["content"]))[:8]) for r in rows]
+    store.close()
+    return queries
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="청크 저장소 비동기 검색 서버 (HTTP/JSON, 마이크로 배치)")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="검색 서버 실행")
+    serve_cmd.add_argument("--index", choices=["baseline", "ours", "dedup"], default="ours")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    serve_cmd.add_argument("--max-batch", type=int, default=64, help="배치당 최대 질의 수")
+    serve_cmd.add_argument("--max-wait-ms", type=float, default=2.0, help="배치 수집 최대 대기 시간 (ms)")
+    load_cmd = sub.add_parser("loadtest", help="로컬 서버 부하 테스트")
+    load_cmd.add_argument("--index", choices=["baseline", "ours", "dedup"], default="ours",
+                          help="질의 샘플링에 사용할 인덱스")
+    load_cmd.add_argument("--host", default="127.0.0.1")
+    load_cmd.add_argument("--port", type=int, default=8765)
+    load_cmd.add_argument("--concurrency", type=int, default=32)
+    load_cmd.add_argument("--requests", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    index_dir = INDEX_DIR / args.index
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(index_dir, args.host, args.port, args.max_batch, args.max_wait_ms))
+        except KeyboardInterrupt:
+            print("\n[Server] 종료.")
+    else:
+        report = asyncio.run(load_test(sample_queries(index_dir), args.host, args.port,
+                                       args.concurrency, args.requests))
+        print(f"[LoadTest] 요청 {report['requests']}건 (오류 {report['errors']}), 동시 연결 {report['concurrency']}개")
+        print(f"   - 처리량: {report['throughput_qps']:.1f} QPS, 평균 배치 크기: {report['server_mean_batch_size']:.1f}")
+        print(f"   - 지연 p50/p99: {report['p50_ms']:.2f} / {report['p99_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import json
+import re
+import time
+import zlib
+from pathlib import Path
+import numpy as np
+from chunk_dedup import OCCURRENCE_DATASET, OccurrenceTable
+from dataset_io import find_dataset, iter_chunks
+
+# --- [설정] ---
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "dataset"
+INDEX_DIR = BASE_DIR / "index"
+DATASET_NAMES = {"baseline": "dataset_baseline", "ours": "dataset_ours", "dedup": "dataset_ours_unique"}
+
+VECTORS_NAME = "vectors.f32"   # 임베딩 행렬 (float32, row-major, 메모리 매핑 로드)
+META_NAME = "meta.jsonl"       # 청크 메타데이터 테이블 (행 번호 = 벡터 행 번호)
+OFFSETS_NAME = "meta.idx"      # 메타데이터 행별 바이트 오프셋 (int64) - 상위 k개만 seek하여 로드
+INFO_NAME = "index.json"       # 인덱스 정보 (행 수, 차원, 임베더 설정, 빌드 지문)
+
+# --- [토크나이저] 식별자 인식 코드 토큰화 ---
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*|\d+")
+SUBWORD_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z]|\d|\b)|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+def split_identifier(identifier):
+    """camelCase / PascalCase / snake_case 식별자를 소문자 하위 단어로 분리합니다. (예: useSelectRoot -> use, select, root)"""
+    return [part.lower() for part in SUBWORD_PATTERN.findall(identifier.replace("$", "_"))]
+
+def tokenize_code(text):
+    """
+    코드 텍스트를 식별자 단위로 토큰화합니다.
+    원본 식별자(소문자)와 하위 단어를 함께 반환하여 정확한 심볼과 부분 단어 모두 매칭되도록 합니다.
+    """
+    tokens = []
+    for identifier in IDENTIFIER_PATTERN.findall(text):
+        lowered = identifier.lower()
+        tokens.append(lowered)
+        parts = split_identifier(identifier)
+        if len(parts) > 1 or (parts and parts[0] != lowered):
+            tokens.extend(parts)
+    return tokens
+
+def embedding_text(chunk):
+    """
+    청크의 임베딩 입력 텍스트: 구조적 메타데이터(상위 컴포넌트, 유형)를 본문 앞에 결합합니다.
+    중복 제거된 고유 청크는 출현한 모든 상위 컴포넌트(parents)를 결합합니다.
+    """
+    parent = " ".join(chunk["parents"]) if chunk.get("parents") else chunk.get("parent_component")
+    if parent:
+        return f"{parent} {chunk['type']}\n{chunk['content']}"
+    return str(chunk["content"])
+
+# --- [임베더] 네트워크 없이 동작하는 로컬 임베더 ---
+class HashingEmbedder:
+    """
+    Feature Hashing + TF-IDF 임베더 (기본값).
+    - 토큰을 CRC32로 dim개 버킷에 사상하고 부호 해싱으로 충돌 편향을 상쇄
+    - fit() 시 버킷 단위 문서 빈도로 IDF를 학습하며, 결과 벡터는 L2 정규화 (내적 = 코사인 유사도)
+    """
+    name = "hashing"
+
+    def __init__(self, dim=256, idf=None):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32) if idf is None else np.asarray(idf, dtype=np.float32)
+
+    def _buckets(self, text):
+        counts = {}
+        for token in tokenize_code(text):
+            h = zlib.crc32(token.encode("utf8"))
+            bucket = h % self.dim
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def fit(self, texts):
+        """버킷 단위 문서 빈도(DF)로 IDF 가중치를 학습합니다. texts는 1회 순회 가능한 iterable이면 충분합니다."""
+        df = np.zeros(self.dim, dtype=np.float64)
+        n_docs = 0
+        for text in texts:
+            buckets = list(self._buckets(text))
+            df[buckets] += 1
+            n_docs += 1
+        self.idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        return self
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, value in self._buckets(text).items():
+                # 부호 보존 로그 TF
+                vectors[row, bucket] = np.sign(value) * np.log1p(abs(value))
+        vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def config(self):
+        return {"name": self.name, "dim": self.dim, "idf": self.idf.tolist()}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(dim=config["dim"], idf=config.get("idf"))
+
+# 임베더 레지스트리: 새 임베더는 name / fit / embed / config / from_config를 구현하여 등록
+EMBEDDERS = {HashingEmbedder.name: HashingEmbedder}
+
+def register_embedder(embedder_cls):
+    EMBEDDERS[embedder_cls.name] = embedder_cls
+    return embedder_cls
+
+# --- [인덱스 구축] ---
+def build_index(dataset_path, index_dir, embedder=None, batch_size=1024):
+    """
+    데이터셋(JSONL)을 스트리밍으로 읽어 임베딩 행렬과 메타데이터 테이블을 디스크에 기록합니다.
+    배치 단위로 임베딩/기록하므로 메모리 사용량은 batch_size에만 비례합니다.
+    """
+    embedder = embedder or HashingEmbedder()
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1차 패스: 임베더 학습 (IDF 등)
+    if hasattr(embedder, "fit"):
+        embedder.fit(embedding_text(c) for c in iter_chunks(dataset_path))
+
+    # 2차 패스: 배치 임베딩 후 순차 기록
+    rows = 0
+    offsets = []
+    # 빌드 지문: 임베더 설정 + 메타데이터 행의 해시 (행 수가 같아도 내용이 바뀌면 파생 인덱스(IVF 등)를 무효화)
+    fingerprint = hashlib.sha256(json.dumps(embedder.config(), sort_keys=True).encode("utf8"))
+    with (index_dir / VECTORS_NAME).open("wb") as vec_f, (index_dir / META_NAME).open("wb") as meta_f:
+        batch = []
+
+        def flush():
+            vec_f.write(embedder.embed([embedding_text(c) for c in batch]).tobytes())
+            for chunk in batch:
+                offsets.append(meta_f.tell())
+                line = json.dumps(chunk, ensure_ascii=False).encode("utf8") + b"\n"
+                fingerprint.update(line)
+                meta_f.write(line)
+            batch.clear()
+
+        for chunk in iter_chunks(dataset_path):
+            batch.append(chunk)
+            rows += 1
+            if len(batch) >= batch_size: flush()
+        if batch: flush()
+
+    np.asarray(offsets, dtype=np.int64).tofile(index_dir / OFFSETS_NAME)
+    with (index_dir / INFO_NAME).open("w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "dim": embedder.dim, "source": Path(dataset_path).name, "fingerprint": fingerprint.hexdigest(),
+                   "embedder": embedder.config()}, f)
+    return rows
+
+# --- [검색 엔진] ---
+class VectorStore:
+    """
+    메모리 매핑된 float32 임베딩 행렬 위에서 top-k 검색을 수행합니다.
+    - 질의는 배치로 임베딩 후 행렬 곱 1회로 전체 점수를 계산
+    - 메타데이터는 오프셋 테이블로 상위 k개 행만 읽어 반환
+    """
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        with (self.index_dir / INFO_NAME).open("r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        config = self.info["embedder"]
+        self.embedder = EMBEDDERS[config["name"]].from_config(config)
+        self.rows, self.dim = self.info["rows"], self.info["dim"]
+        self.vectors = (np.memmap(self.index_dir / VECTORS_NAME, dtype=np.float32, mode="r",
+                                  shape=(self.rows, self.dim))
+                        if self.rows else np.zeros((0, self.dim), dtype=np.float32))
+        self.offsets = np.fromfile(self.index_dir / OFFSETS_NAME, dtype=np.int64)
+        self._meta_f = (self.index_dir / META_NAME).open("rb")
+
+    def close(self):
+        self._meta_f.close()
+
+    def metadata(self, row):
+        """행 번호에 해당하는 청크 메타데이터를 읽습니다."""
+        self._meta_f.seek(int(self.offsets[row]))
+        return json.loads(self._meta_f.readline())
+
+    def score(self, query_vectors):
+        """(질의 수, dim) 질의 행렬에 대한 전체 점수 행렬 (질의 수, rows)을 반환합니다."""
+        # (rows, dim) @ (dim, 질의 수): 행렬을 한 번만 순차 스캔하도록 저장 순서(row-major)대로 곱셈
+        return (self.vectors @ query_vectors.T).T
+
+    def top_k(self, scores, k):
+        """점수 행렬에서 질의별 상위 k개 (행 번호, 점수)를 내림차순으로 반환합니다."""
+        k = min(k, scores.shape[1])
+        if k == 0: return [[] for _ in range(len(scores))]
+        part = np.argpartition(scores, -k, axis=1)[:, -k:]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        rows = np.take_along_axis(part, order, axis=1)
+        return [list(zip(r.tolist(), s.tolist())) for r, s in zip(rows, np.take_along_axis(part_scores, order, axis=1))]
+
+    def search_rows(self, queries, k=10):
+        """질의 문자열 목록에 대한 상위 k개 (행 번호, 점수) 목록을 반환합니다."""
+        return self.top_k(self.score(self.embedder.embed(queries)), k)
+
+    def search(self, queries, k=10):
+        """질의 문자열 목록에 대한 상위 k개 (점수, 청크) 목록을 반환합니다."""
+        return [[(score, self.metadata(row)) for row, score in hits] for hits in self.search_rows(queries, k)]
+
+def open_store(name="ours"):
+    return VectorStore(INDEX_DIR / name)
+
+# --- [성능 측정] ---
+def benchmark(store, n_queries=200, k=10, batch_size=1):
+    """저장된 청크 본문에서 질의를 샘플링하여 검색 지연 시간(ms)을 측정합니다."""
+    rng = np.random.default_rng(0)
+    sample_rows = rng.choice(store.rows, size=min(n_queries, store.rows), replace=False)
+    queries = [" ".join(tokenize_code(str(store.metadata(r)["content"]))[:8]) for r in sample_rows]
+    latencies = []
+    for i in range(0, len(queries), batch_size):
+        start = time.perf_counter()
+        store.search_rows(queries[i : i + batch_size], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"rows": store.rows, "dim": store.dim, "queries": len(queries), "batch_size": batch_size,
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if latencies else 0.0}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="청크 데이터셋 임베딩 및 로컬 벡터 검색")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="데이터셋을 임베딩하여 인덱스 구축")
+    build_cmd.add_argument("--dataset", choices=["baseline", "ours", "dedup", "both"], default="both",
+                           help="dedup: 중복 제거 고유 청크 (data_pipeline.py --dedup 필요)")
+    build_cmd.add_argument("--dim", type=int, default=256, help="해싱 임베딩 차원 (기본값: 256)")
+    query_cmd = sub.add_parser("query", help="인덱스 검색")
+    query_cmd.add_argument("text")
+    query_cmd.add_argument("--index", choices=["baseline", "ours", "dedup"], default="ours")
+    query_cmd.add_argument("-k", type=int, default=5)
+    bench_cmd = sub.add_parser("bench", help="검색 지연 시간 측정")
+    bench_cmd.add_argument("--index", choices=["baseline", "ours", "dedup"], default="ours")
+    bench_cmd.add_argument("--batch-size", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    if args.command == "build":
+        names = ["baseline", "ours"] if args.dataset == "both" else [args.dataset]
+        for name in names:
+            path = find_dataset(DATA_DIR, DATASET_NAMES[name])
+            if path is None:
+                print(f"[Error] {DATASET_NAMES[name]} 데이터셋이 없습니다. data_pipeline.py를 먼저 실행하십시오.")
+                continue
+            start = time.perf_counter()
+            rows = build_index(path, INDEX_DIR / name, HashingEmbedder(dim=args.dim))
+            print(f"[Success] '{name}' 인덱스 구축 완료: {rows}개 청크, {time.perf_counter() - start:.2f}s -> {INDEX_DIR / name}")
+    elif args.command == "query":
+        store = open_store(args.index)
+        occurrence_path = find_dataset(DATA_DIR, OCCURRENCE_DATASET)
+        occurrences = OccurrenceTable(occurrence_path) if occurrence_path else None
+        for rank, (score, chunk) in enumerate(store.search([args.text], args.k)[0], 1):
+            content = str(chunk["content"]).replace("\n", " ")
+            if "occurrences" in chunk and occurrences:
+                locations = ", ".join(f"{o['filepath']}:{o['line']}" for o in occurrences.get(chunk["hash"])[:3])
+                print(f"  [{rank}] {score:.3f} x{chunk['occurrences']} {locations} / "
+                      f"{', '.join(chunk['parents'][:3]) or '-'} ({chunk['type']})")
+            else:
+                print(f"  [{rank}] {score:.3f} {chunk.get('filepath')} / {chunk.get('parent_component', '-')} ({chunk['type']})")
+            print(f"      내용: \"{content[:75]}{'...' if len(content) > 75 else ''}\"")
+        store.close()
+    else:
+        store = open_store(args.index)
+        print(json.dumps(benchmark(store, batch_size=args.batch_size), ensure_ascii=False))
+        store.close()
+
+if __name__ == "__main__":
+    main()
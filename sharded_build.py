@@ -0,0 +1,415 @@
+import argparse
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+import data_pipeline
+from chunk_dedup import OCCURRENCE_DATASET, UNIQUE_DATASET, dedup_dataset
+from chunk_index import INDEX_NAME, ChunkIndexWriter
+from data_pipeline import (DEFAULT_BASELINE_CONFIG, DEFAULT_CHUNK_CONFIG, DEFAULT_LIMIT_CONFIG, MANIFEST_NAME,
+                           chunker_version, collect_target_files, init_worker, plan_file, process_file)
+from dataset_io import COMPRESSION_SUFFIXES, ChunkWriter, dataset_path, iter_chunks
+from file_discovery import DEFAULT_DISCOVERY_CONFIG
+from lexical_index import LEXICAL_DIR_NAME, LexicalIndexWriter
+
+# --- [설정] 다중 저장소 샤드 빌드 ---
+# 코디네이터가 여러 저장소(search_dir)의 파일 목록을 샤드로 나누어 공유 디렉토리 큐에 올리고,
+# 워커(로컬 서브프로세스 또는 같은 디렉토리를 마운트한 다른 호스트)가 샤드를 하나씩 점유하여 처리합니다.
+# 빌드 디렉토리 구조:
+# - plan.json: 저장소 루트, 청킹 설정, 샤드 목록 (워커는 이 파일만 보고 처리)
+# - queue/{pending,running,done,failed}/<샤드 ID>.json: 상태 이동은 원자적 rename (점유 경쟁 없음)
+# - shards/<샤드 ID>/: 샤드별 청크 출력 (임시 디렉토리에 기록 후 rename으로 완료 처리)
+# 샤드 ID는 포함 파일 목록(경로, 크기, mtime)의 해시를 포함하므로, 재실행 시 변경 없는 완료 샤드는 재사용됩니다.
+BUILD_DIR = data_pipeline.BASE_DIR / "build"
+QUEUE_STATES = ("pending", "running", "done", "failed")
+DEFAULT_SHARD_SIZE = 200  # 샤드당 파일 수
+DEFAULT_LEASE_SECONDS = 120 # 하트비트(점유 파일 mtime)가 이 시간 이상 갱신되지 않으면 워커 중단으로 간주하여 재할당
+DEFAULT_MAX_ATTEMPTS = 3
+
+# --- [계획] 저장소 탐색 및 샤드 분할 ---
+def repo_names(roots):
+    """저장소 루트 -> 고유 이름 (디렉토리 이름, 중복 시 번호 부여)"""
+    names = {}
+    for root in roots:
+        name, n = root.name, 2
+        while name in names.values():
+            name, n = f"{root.name}-{n}", n + 1
+        names[root] = name
+    return names
+
+def plan_shards(roots, shard_size=DEFAULT_SHARD_SIZE, discovery_config=DEFAULT_DISCOVERY_CONFIG):
+    """
+    저장소별로 파일을 상대 경로 순서대로 나누어 샤드 목록을 생성합니다.
+    - 여러 루트에 겹쳐 포함된 파일(중첩 루트, 심볼릭 링크)은 처음 등장한 저장소에서 1회만 처리
+    - 반환: ({저장소 이름: 루트 경로}, [{"id", "files": [[저장소, 상대 경로], ...]}])
+    """
+    seen, shards = set(), []
+    names = repo_names([Path(root).absolute() for root in roots])
+    for root, repo in names.items():
+        files = []
+        for path in collect_target_files(root, discovery_config):
+            real = path.resolve()
+            if real in seen: continue
+            seen.add(real)
+            stat = path.stat()
+            files.append((path.relative_to(root).as_posix(), stat.st_size, stat.st_mtime_ns))
+        for index, start in enumerate(range(0, len(files), shard_size)):
+            batch = files[start : start + shard_size]
+            digest = hashlib.blake2b(json.dumps(batch).encode("utf8"), digest_size=6).hexdigest()
+            shards.append({"id": f"{repo}-{index:05d}-{digest}", "files": [[repo, rel] for rel, _, _ in batch]})
+    return {repo: str(root) for root, repo in names.items()}, shards
+
+class ShardQueue:
+    """공유 디렉토리 큐. 상태 전이는 같은 파일 시스템 내 rename이므로 여러 프로세스/호스트가 동시에 사용해도 안전합니다."""
+    def __init__(self, build_dir):
+        self.build_dir = Path(build_dir)
+        self.shard_dir = self.build_dir / "shards"
+        self.dirs = {state: self.build_dir / "queue" / state for state in QUEUE_STATES}
+
+    def init(self):
+        for path in [self.shard_dir, *self.dirs.values()]:
+            path.mkdir(parents=True, exist_ok=True)
+
+    def ids(self, state):
+        return sorted(p.stem for p in self.dirs[state].glob("*.json"))
+
+    def state_of(self, shard_id):
+        for state in QUEUE_STATES:
+            if (self.dirs[state] / f"{shard_id}.json").exists(): return state
+        return None
+
+    def read(self, state, shard_id):
+        with (self.dirs[state] / f"{shard_id}.json").open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write(self, state, shard_id, record):
+        path = self.dirs[state] / f"{shard_id}.json"
+        tmp_path = path.with_name(f".tmp-{path.name}")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def move(self, shard_id, src, dst):
+        """상태 전이. 다른 프로세스가 먼저 옮긴 경우 False"""
+        try:
+            os.rename(self.dirs[src] / f"{shard_id}.json", self.dirs[dst] / f"{shard_id}.json")
+            return True
+        except FileNotFoundError:
+            return False
+
+    def claim(self, worker_id):
+        """대기 중인 샤드 하나를 점유합니다. (없으면 None)"""
+        for shard_id in self.ids("pending"):
+            if self.move(shard_id, "pending", "running"):
+                record = dict(self.read("running", shard_id), worker=worker_id, claimed=time.time())
+                self.write("running", shard_id, record)
+                return record
+        return None
+
+    def heartbeat(self, shard_id):
+        try:
+            os.utime(self.dirs["running"] / f"{shard_id}.json")
+        except FileNotFoundError:
+            pass # 코디네이터가 재할당한 경우
+
+# --- [워커] 샤드 처리 ---
+def process_shard(build_dir, plan, record, queue):
+    """
+    샤드의 파일을 처리하여 shards/<샤드 ID>/에 기록합니다.
+    - dataset_baseline.jsonl / dataset_ours.jsonl: 파일 순서대로 기록된 청크 (청크마다 repo 필드 추가)
+    - files.json: [[저장소, 상대 경로, Baseline 청크 수, Proposed 청크 수, 처리 실패 여부], ...]
+    """
+    shard_id = record["id"]
+    out_dir = queue.shard_dir / shard_id
+    tmp_dir = queue.shard_dir / f".tmp-{shard_id}-{record['worker']}"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    with ChunkWriter(tmp_dir / "dataset_baseline.jsonl") as base_writer, \
+         ChunkWriter(tmp_dir / "dataset_ours.jsonl") as our_writer:
+        for repo, rel_path in record["files"]:
+            filepath = Path(plan["roots"][repo]) / rel_path
+            try:
+                policy, _ = plan_file(filepath, filepath.stat().st_size, plan["limits"])
+            except OSError: # 계획 수립 이후 삭제/이동된 파일은 처리 실패로 기록
+                result = None
+            else:
+                result = process_file(filepath, plan["baseline"], chunk_config=plan["chunking"],
+                                      policy=policy, max_bytes=plan["limits"]["max_file_bytes"])
+            base_chunks, our_chunks = result or ([], [])
+            for c in base_chunks + our_chunks: c["repo"] = repo
+            base_writer.write_all(base_chunks)
+            our_writer.write_all(our_chunks)
+            files.append([repo, rel_path, len(base_chunks), len(our_chunks), result is None])
+            queue.heartbeat(shard_id)
+    with (tmp_dir / "files.json").open("w", encoding="utf-8") as f:
+        json.dump(files, f, ensure_ascii=False)
+    try:
+        tmp_dir.rename(out_dir)
+    except OSError:
+        # 임대 만료로 재할당된 다른 워커가 먼저 완료한 경우: 동일 입력의 결과이므로 폐기
+        for path in tmp_dir.iterdir(): path.unlink()
+        tmp_dir.rmdir()
+    return sum(f[4] for f in files)
+
+def run_worker(build_dir, exit_when_empty=False, poll=1.0):
+    """대기 중인 샤드를 하나씩 점유하여 처리합니다. exit_when_empty=False이면 빌드가 끝날 때까지 대기합니다."""
+    queue = ShardQueue(build_dir)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    with (Path(build_dir) / "plan.json").open("r", encoding="utf-8") as f:
+        plan = json.load(f)
+    init_worker()
+    processed = 0
+    while True:
+        record = queue.claim(worker_id)
+        if record is None:
+            if exit_when_empty or not (queue.ids("pending") or queue.ids("running")): break
+            time.sleep(poll)
+            continue
+        shard_id = record["id"]
+        try:
+            failed_files = process_shard(build_dir, plan, record, queue)
+            record, state = dict(record, failed_files=failed_files, finished=time.time()), "done"
+            processed += 1
+        except Exception as e:
+            record, state = dict(record, error=f"{type(e).__name__}: {str(e)[:200]}"), "failed"
+            print(f"[Worker {worker_id}] 샤드 실패: {shard_id} ({type(e).__name__}: {e})")
+        # 임대 만료로 이미 재할당된 샤드는 상태를 덮어쓰지 않음
+        if queue.state_of(shard_id) == "running":
+            queue.write("running", shard_id, record)
+            queue.move(shard_id, "running", state)
+    print(f"[Worker {worker_id}] 처리한 샤드: {processed}개")
+
+# --- [코디네이터] ---
+def prepare_build(build_dir, roots, shard_size, baseline_config, chunk_config, discovery_config):
+    """
+    샤드 계획을 기록하고 큐를 구성합니다.
+    - 이전 빌드에서 완료된 샤드(같은 ID, 같은 설정)는 재사용하고 나머지만 대기열에 등록
+    - 실패한 샤드는 시도 횟수를 초기화하여 다시 등록, 계획에 없는 샤드 출력은 정리
+    """
+    build_dir = Path(build_dir)
+    queue = ShardQueue(build_dir)
+    queue.init()
+    repos, shards = plan_shards(roots, shard_size, discovery_config)
+    plan = {"roots": repos, "baseline": baseline_config, "chunking": chunk_config, "limits": DEFAULT_LIMIT_CONFIG,
+            "chunker": chunker_version(chunk_config), "shards": [s["id"] for s in shards]}
+
+    plan_path = build_dir / "plan.json"
+    previous = {}
+    if plan_path.exists():
+        with plan_path.open("r", encoding="utf-8") as f:
+            previous = json.load(f)
+    same_config = all(previous.get(key) == plan[key] for key in ("roots", "baseline", "chunking", "limits", "chunker"))
+
+    planned = {s["id"] for s in shards}
+    for state in QUEUE_STATES:
+        for shard_id in queue.ids(state):
+            if shard_id not in planned or not same_config or (state == "done" and not (queue.shard_dir / shard_id).exists()):
+                (queue.dirs[state] / f"{shard_id}.json").unlink()
+    for path in queue.shard_dir.iterdir():
+        if path.name not in planned or not same_config or queue.state_of(path.name) != "done":
+            if path.is_dir():
+                for child in path.iterdir(): child.unlink()
+                path.rmdir()
+
+    reused = 0
+    for shard in shards:
+        state = queue.state_of(shard["id"])
+        if state == "done":
+            reused += 1
+        elif state == "running":
+            queue.move(shard["id"], "running", "pending") # 이전 코디네이터 실행에서 중단된 샤드
+        elif state == "failed":
+            queue.write("failed", shard["id"], dict(shard, attempts=0))
+            queue.move(shard["id"], "failed", "pending")
+        elif state is None:
+            queue.write("pending", shard["id"], dict(shard, attempts=0))
+
+    tmp_path = plan_path.with_name(".tmp-plan.json")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False)
+    tmp_path.replace(plan_path)
+    files = sum(len(s["files"]) for s in shards)
+    print(f"[Info] 저장소 {len(repos)}개 / 파일 {files}개 / 샤드 {len(shards)}개 (완료 샤드 재사용 {reused}개)")
+    return plan
+
+def requeue(queue, lease_seconds, max_attempts, dead_workers=()):
+    """
+    임대가 만료된 점유 샤드와 재시도 가능한 실패 샤드를 대기열로 되돌립니다. 반환: 재할당 수
+    - dead_workers: 종료가 확인된 로컬 워커 ID (임대 만료를 기다리지 않고 즉시 재할당)
+    """
+    moved = 0
+    now = time.time()
+    for shard_id in queue.ids("running"):
+        path = queue.dirs["running"] / f"{shard_id}.json"
+        try:
+            expired = now - path.stat().st_mtime > lease_seconds or queue.read("running", shard_id).get("worker") in dead_workers
+        except (FileNotFoundError, ValueError):
+            continue # 상태 전이 중이거나 점유 기록 작성 중
+        if expired and queue.move(shard_id, "running", "failed"):
+            record = queue.read("failed", shard_id)
+            queue.write("failed", shard_id, dict(record, error=f"임대 만료 (worker={record.get('worker')})"))
+    for shard_id in queue.ids("failed"):
+        record = queue.read("failed", shard_id)
+        if record["attempts"] + 1 >= max_attempts: continue
+        print(f"[Retry] 샤드 재시도: {shard_id} ({record.get('error')})")
+        queue.write("failed", shard_id, {"id": shard_id, "files": record["files"], "attempts": record["attempts"] + 1})
+        if queue.move(shard_id, "failed", "pending"): moved += 1
+    return moved
+
+def coordinate(build_dir, local_workers=2, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, poll=1.0):
+    """
+    로컬 워커 서브프로세스를 유지하면서 모든 샤드가 완료(또는 재시도 소진)될 때까지 큐를 감시합니다.
+    다른 호스트의 워커는 같은 빌드 디렉토리로 `python sharded_build.py worker`를 실행하면 함께 처리합니다.
+    반환: 재시도를 소진한 실패 샤드 ID 목록
+    """
+    queue = ShardQueue(build_dir)
+    command = [sys.executable, str(Path(__file__).resolve()), "worker", "--build-dir", str(build_dir), "--exit-when-empty"]
+    workers, dead_workers = [], set()
+    host = socket.gethostname()
+    total = sum(len(queue.ids(state)) for state in QUEUE_STATES)
+    last_done = -1
+    try:
+        while True:
+            for worker in workers:
+                if worker.poll() is not None: dead_workers.add(f"{host}-{worker.pid}")
+            workers = [w for w in workers if w.poll() is None]
+            requeue(queue, lease_seconds, max_attempts, dead_workers)
+            pending, running, done = (len(queue.ids(s)) for s in ("pending", "running", "done"))
+            if done != last_done:
+                print(f"[Progress] 완료 {done}/{total} (대기 {pending}, 처리 중 {running})")
+                last_done = done
+            if not pending and not running: break
+            while pending and len(workers) < min(local_workers, pending):
+                workers.append(subprocess.Popen(command))
+            time.sleep(poll)
+    finally:
+        for worker in workers:
+            worker.wait()
+    return queue.ids("failed")
+
+# --- [병합] 샤드 출력 -> 단일 데이터셋 + 보조 인덱스 + 중복 제거 테이블 ---
+def merge_shards(build_dir, output_dir, compression="none"):
+    """
+    계획 순서대로 샤드 출력을 스트리밍 병합합니다.
+    - 보조 인덱스의 파일 경로는 "저장소/상대 경로"
+    - BM25 역색인(bm25/)을 같은 행 순서로 함께 구축
+    - 청크 본문 해시 기준 중복 제거 테이블(고유 본문 + 출현 위치)을 함께 생성 (저장소 간 복사된 코드 통합)
+    - 단일 저장소 증분 빌드 매니페스트는 병합 데이터셋과 맞지 않으므로 제거
+    """
+    build_dir, output_dir = Path(build_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    queue = ShardQueue(build_dir)
+    with (build_dir / "plan.json").open("r", encoding="utf-8") as f:
+        plan = json.load(f)
+
+    final_paths = {name: dataset_path(output_dir, f"dataset_{name}", compression) for name in ("baseline", "ours")}
+    index_writer = ChunkIndexWriter(output_dir / INDEX_NAME)
+    lexical_writer = LexicalIndexWriter(output_dir / LEXICAL_DIR_NAME)
+    failed_files = 0
+    try:
+        with ChunkWriter(final_paths["baseline"].with_name(f".tmp-{final_paths['baseline'].name}")) as base_writer, \
+             ChunkWriter(final_paths["ours"].with_name(f".tmp-{final_paths['ours'].name}")) as our_writer:
+            for shard_id in plan["shards"]:
+                shard_dir = queue.shard_dir / shard_id
+                with (shard_dir / "files.json").open("r", encoding="utf-8") as f:
+                    files = json.load(f)
+                base_iter = iter_chunks(shard_dir / "dataset_baseline.jsonl")
+                our_iter = iter_chunks(shard_dir / "dataset_ours.jsonl")
+                for repo, rel_path, base_count, our_count, failed in files:
+                    failed_files += failed
+                    base_chunks, our_chunks = list(islice(base_iter, base_count)), list(islice(our_iter, our_count))
+                    base_start, our_start = base_writer.count, our_writer.count
+                    base_offsets = [base_writer.write(c) for c in base_chunks]
+                    our_offsets = [our_writer.write(c) for c in our_chunks]
+                    index_writer.add_file(f"{repo}/{rel_path}", (base_start, base_writer.count), base_offsets,
+                                          (our_start, our_writer.count), our_chunks, our_offsets)
+                    lexical_writer.add_all(our_chunks)
+    except BaseException:
+        index_writer.abort()
+        lexical_writer.abort()
+        raise
+    for name, path in final_paths.items():
+        path.with_name(f".tmp-{path.name}").replace(path)
+        for stale_path in [dataset_path(output_dir, f"dataset_{name}", c) for c in COMPRESSION_SUFFIXES]:
+            if stale_path != path and stale_path.exists(): stale_path.unlink()
+    index_writer.close({name: path.name for name, path in final_paths.items()})
+    lexical_writer.close(final_paths["ours"].name)
+
+    dedup_paths = [dataset_path(output_dir, name, compression) for name in (UNIQUE_DATASET, OCCURRENCE_DATASET)]
+    total, unique = dedup_dataset(final_paths["ours"], *(p.with_name(f".tmp-{p.name}") for p in dedup_paths))
+    for path in dedup_paths:
+        path.with_name(f".tmp-{path.name}").replace(path)
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists(): manifest_path.unlink()
+
+    print("\n[Success] 샤드 병합 완료.")
+    print(f"   - Baseline(Fixed-size) 데이터: {base_writer.count}개 청크")
+    print(f"   - Proposed(AST-based) 데이터: {our_writer.count}개 청크 (고유 본문 {unique}개)")
+    print(f"   - 저장 경로: {output_dir}")
+    if failed_files:
+        print(f"[Warning] 처리 실패로 제외된 파일: {failed_files}개")
+
+def run_build(roots, build_dir=BUILD_DIR, output_dir=None, local_workers=2, shard_size=DEFAULT_SHARD_SIZE,
+              compression="none", baseline_config=DEFAULT_BASELINE_CONFIG, chunk_config=DEFAULT_CHUNK_CONFIG,
+              discovery_config=DEFAULT_DISCOVERY_CONFIG, lease_seconds=DEFAULT_LEASE_SECONDS,
+              max_attempts=DEFAULT_MAX_ATTEMPTS):
+    print("[Process] 샤드 빌드(Sharded Build) 시작...")
+    started = time.perf_counter()
+    prepare_build(build_dir, roots, shard_size, baseline_config, dict(DEFAULT_CHUNK_CONFIG, **chunk_config),
+                  discovery_config)
+    failed = coordinate(build_dir, local_workers, lease_seconds, max_attempts)
+    if failed:
+        print(f"[Error] 재시도를 소진한 샤드 {len(failed)}개: {failed[:5]} - 재실행 시 실패 샤드만 다시 처리합니다.")
+        return False
+    merge_shards(build_dir, output_dir or data_pipeline.BASE_DIR / "dataset", compression)
+    print(f"[Info] 전체 소요 시간: {time.perf_counter() - started:.2f}s")
+    return True
+
+def print_status(build_dir):
+    queue = ShardQueue(build_dir)
+    print(f"[Status] {build_dir}: " + ", ".join(f"{state} {len(queue.ids(state))}" for state in QUEUE_STATES))
+    for shard_id in queue.ids("failed"):
+        print(f"   - 실패: {shard_id} ({queue.read('failed', shard_id).get('error')})")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="다중 저장소 샤드 분산 빌드")
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="계획 수립 + 로컬 워커 실행 + 병합")
+    build_parser.add_argument("--root", action="append", default=None, metavar="DIR",
+                              help="색인할 저장소 루트 (반복 지정 가능, 기본값: Base-UI react 패키지)")
+    build_parser.add_argument("--roots-file", default=None, help="저장소 루트 목록 파일 (한 줄에 하나)")
+    build_parser.add_argument("--workers", type=int, default=2, help="로컬 워커 프로세스 수 (0: 원격 워커만 사용)")
+    build_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="샤드당 파일 수")
+    build_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                              help="워커 하트비트 만료 시간(초), 초과 시 샤드 재할당")
+    build_parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="샤드당 최대 시도 횟수")
+    build_parser.add_argument("--output", default=None, help="병합 데이터셋 디렉토리 (기본값: dataset/)")
+    build_parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default="none")
+    build_parser.add_argument("--engine", choices=data_pipeline.CHUNK_ENGINES, default=DEFAULT_CHUNK_CONFIG["engine"])
+    build_parser.add_argument("--build-dir", default=str(BUILD_DIR), help="공유 빌드 디렉토리 (기본값: build/)")
+    worker_parser = subparsers.add_parser("worker", help="공유 빌드 디렉토리의 샤드를 처리하는 워커")
+    worker_parser.add_argument("--build-dir", default=str(BUILD_DIR), help="공유 빌드 디렉토리 (기본값: build/)")
+    worker_parser.add_argument("--exit-when-empty", action="store_true", help="대기 샤드가 없으면 즉시 종료")
+    status_parser = subparsers.add_parser("status", help="샤드 상태 출력")
+    status_parser.add_argument("--build-dir", default=str(BUILD_DIR))
+    args = arg_parser.parse_args()
+
+    if args.command == "worker":
+        run_worker(args.build_dir, exit_when_empty=args.exit_when_empty)
+    elif args.command == "status":
+        print_status(args.build_dir)
+    else:
+        roots = list(args.root or [])
+        if args.roots_file:
+            with open(args.roots_file, "r", encoding="utf-8") as f:
+                roots += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        ok = run_build(roots or [data_pipeline.get_search_dir()], build_dir=Path(args.build_dir), output_dir=args.output,
+                       local_workers=args.workers, shard_size=args.shard_size, compression=args.compress,
+                       chunk_config=dict(DEFAULT_CHUNK_CONFIG, engine=args.engine),
+                       lease_seconds=args.lease, max_attempts=args.max_attempts)
+        sys.exit(0 if ok else 1)
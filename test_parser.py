@@ -1,6 +1,5 @@
 from pathlib import Path
-from tree_sitter import Language, Parser
-import tree_sitter_typescript as tst
+from parsing import get_parser_for_file, read_source
 
 # --- [설정] 경로 및 환경 변수 초기화 ---
 # 현재 스크립트의 위치를 기준으로 절대 경로를 설정하여 실행 환경의 일관성 보장
@@ -11,17 +10,8 @@ print(f"[System] 현재 작업 디렉토리: {BASE_DIR}")
 # --- 1. 언어 로드 (tree-sitter 0.25+ API) ---
 # - tree-sitter 0.25.x에서는 Parser.set_language / Language.build_library가 제거됨
 # - tree-sitter-typescript 패키지가 제공하는 PyCapsule을 Language로 래핑하여 사용
+# - 언어 로드 및 파서 캐시는 공용 모듈(parsing.py)에서 import 시점에 1회 수행
 print("[Process] Tree-sitter 언어 로드 중...")
-TS_LANGUAGE = Language(tst.language_typescript())
-TSX_LANGUAGE = Language(tst.language_tsx())
-
-def get_parser_for_file(filepath):
-    parser = Parser()
-    if str(filepath).endswith(".tsx"):
-        parser.language = TSX_LANGUAGE
-    else:
-        parser.language = TS_LANGUAGE
-    return parser
 
 # --- 3. 검증용 타겟 파일 탐색 ---
 # Base-UI 라이브러리 내의 임의의 .tsx 파일을 선정하여 파싱 테스트 수행
@@ -40,11 +30,8 @@ print(f"         (경로: {target_file})")
 parser = get_parser_for_file(target_file)
 
 # --- 4. 구문 분석(Parsing) 수행 ---
-with target_file.open("r", encoding="utf-8") as f:
-    code_text = f.read()
-
-# 소스 코드를 바이트로 변환하여 파싱 수행 후 AST 생성
-tree = parser.parse(bytes(code_text, "utf8"))
+# 소스 코드를 바이트로 읽어 파싱 수행 후 AST 생성
+tree = parser.parse(read_source(target_file))
 root_node = tree.root_node
 
 # --- 5. 결과 검증 ---
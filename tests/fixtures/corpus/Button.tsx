@@ -0,0 +1,25 @@
+import * as React from 'react';
+import { useButton } from './useButton';
+
+export function Button(props: ButtonProps) {
+  const { disabled, children, ...other } = props;
+  const [pressed, setPressed] = React.useState(false);
+  const { getButtonProps } = useButton({ disabled });
+
+  React.useEffect(() => {
+    if (disabled) {
+      setPressed(false);
+    }
+  }, [disabled]);
+
+  return (
+    <button {...getButtonProps(other)} data-pressed={pressed || undefined}>
+      {children}
+    </button>
+  );
+}
+
+export interface ButtonProps {
+  disabled?: boolean;
+  children?: React.ReactNode;
+}
@@ -0,0 +1,28 @@
+import * as React from 'react';
+
+export const DialogRoot = (props: DialogRootProps) => {
+  const { open, onOpenChange } = props;
+  const store = useDialogStore({ open, onOpenChange });
+  const contextValue = React.useMemo(() => ({ store }), [store]);
+
+  return <DialogContext.Provider value={contextValue}>{props.children}</DialogContext.Provider>;
+};
+
+export const DialogTitle = React.forwardRef(function DialogTitle(
+  props: DialogTitleProps,
+  forwardedRef: React.ForwardedRef<HTMLHeadingElement>,
+) {
+  const { store } = useDialogContext();
+  const id = useBaseUiId(props.id);
+  useModernLayoutEffect(() => {
+    store.setTitleId(id);
+    return () => store.setTitleId(undefined);
+  }, [store, id]);
+
+  return (
+    <h2 {...props} id={id} ref={forwardedRef} />
+  );
+});
+
+const DialogContext = React.createContext<DialogContextValue | null>(null);
+
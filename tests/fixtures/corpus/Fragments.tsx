@@ -0,0 +1,37 @@
+import * as React from 'react';
+
+export function Tabs(props: TabsProps) {
+  const { value, defaultValue } = props;
+  const [selected, setSelected] = useControlled({ controlled: value, default: defaultValue, name: 'Tabs' });
+
+  if (!props.children) {
+    return null;
+  }
+
+  if (props.orientation === 'vertical') {
+    return (
+      <>
+        <TabsList orientation="vertical" />
+        {props.children}
+      </>
+    );
+  }
+
+  return <>
+    <TabsList selected={selected} onSelect={setSelected} />
+    {props.children}
+  </>;
+}
+
+export const TabsList = function TabsList(props: TabsListProps) {
+  const items = useTabsItems();
+  const renderItem = React.useCallback((item: string) => {
+    const active = useIsActive(item);
+    return <Tab key={item} active={active} />;
+  }, []);
+  return <div role="tablist">{items.map(renderItem)}</div>;
+};
+
+const helper = (value: number) => useHelper(value);
+
+export const A = 1, B = () => useValue(), C = () => <span />;
@@ -0,0 +1,38 @@
+import * as React from 'react';
+
+export function Slider(props: SliderProps) {
+  const { min = 0, max = 100 } = props;
+  const [values, setValues] = useControlled({
+    controlled: props.value,
+    default: props.defaultValue ?? [min],
+    name: 'Slider',
+  });
+  const handleChange = useEventCallback((event: React.ChangeEvent<HTMLInputElement>) => {
+    const next = Number(event.target.value);
+    setValues([next]);
+    props.onValueChange?.(next, event);
+  });
+  const { getRootProps, getThumbProps } = useSliderRoot({
+    values,
+    min,
+    max,
+    onChange: handleChange,
+  });
+
+  const thumbs = values.map((value, index) => (
+    <span key={index} {...getThumbProps({ index })}>
+      {value}
+    </span>
+  ));
+
+  return (
+    <div {...getRootProps()}>
+      {thumbs}
+      {props.children}
+    </div>
+  );
+}
+
+function formatValue(value: number) {
+  return useless(value).toFixed(2);
+}
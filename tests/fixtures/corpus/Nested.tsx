@@ -0,0 +1,24 @@
+import * as React from 'react';
+
+export function Menu(props: MenuProps) {
+  const [open, setOpen] = React.useState(false);
+
+  function MenuItem({ label }: { label: string }) {
+    const ref = React.useRef<HTMLDivElement>(null);
+    useItemRegistration(ref);
+    return <div ref={ref} role="menuitem">{label}</div>;
+  }
+
+  const MenuSeparator = () => {
+    return <hr role="separator" />;
+  };
+
+  return (
+    <div role="menu" hidden={!open} onClick={() => setOpen(false)}>
+      {props.items.map((item) => (
+        <MenuItem key={item} label={item} />
+      ))}
+      <MenuSeparator />
+    </div>
+  );
+}
@@ -0,0 +1,9 @@
+// 초기값 없는 선언자: Hook 정의가 아님 (마지막 선언자 기준)
+let useFoo;
+let useA = () => { return useState(0); }, useB;
+let useC, useD = () => { return useState(1); };
+export function Panel() {
+  let useLater;
+  const value = useContext(PanelContext);
+  return (<div>{value}</div>);
+}
@@ -0,0 +1,28 @@
+import * as React from 'react';
+import { useStore } from './store';
+
+export function useThing(params: UseThingParameters) {
+  const store = useStore(params.store);
+  const value = React.useSyncExternalStore(store.subscribe, store.getSnapshot);
+  const setValue = useEventCallback((next: string) => store.set(next));
+
+  return ({
+    value,
+    setValue,
+    props: useMergedProps(params.props, { 'data-value': value }),
+  });
+}
+
+export const useThingState = (initial: number) => {
+  const [state, setState] = React.useState(initial);
+  return (useStableValue({ state, setState }));
+};
+
+export function Helper(props: HelperProps) {
+  const thing = useThing({ store: props.store });
+  return (
+    React.createElement('span', { className: useClassName(thing.value) }, props.children)
+  );
+}
+
+export const formatThing = (value: string) => value.trim();
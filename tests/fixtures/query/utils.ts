@@ -0,0 +1,14 @@
+export const Registry = createRegistry({ name: 'registry' });
+
+export function CompositeList(props: CompositeListProps) {
+  const { elementsRef, onMapChange } = props;
+  const map = useCompositeMap(elementsRef);
+  useModernLayoutEffect(() => {
+    onMapChange?.(map);
+  }, [map, onMapChange]);
+  return (props.children);
+}
+
+function getIndex(list: string[], value: string) {
+  return list.indexOf(value);
+}
@@ -0,0 +1,15 @@
+export function Outer() {
+  const data = useMemo(() => {
+    const base = compute(items);
+    function Inner() {
+      const r = useEffect(() => {
+        subscribe(store, handler);
+        return () => unsubscribe(store, handler);
+      }, [store]);
+      return r;
+    }
+    const d = transform(base);
+    return d;
+  }, [items]);
+  return data;
+}
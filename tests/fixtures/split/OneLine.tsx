@@ -0,0 +1,4 @@
+export function Page(props: PageProps) {
+  const { items, handleSelect } = usePageState(props, { persist: true, key: 'page', onChange: (value) => props.onChange?.(value) });
+  return <div className="page"><Header title="Welcome to the page" subtitle={props.subtitle} /><Body items={items} onSelect={handleSelect}><Item label="one" value={1} /><Item label="two" value={2} /><Item label="three" value={3} /></Body></div>;
+}
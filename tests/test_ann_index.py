@@ -0,0 +1,42 @@
+import json
+import numpy as np
+import pytest
+from ann_index import IVFIndex, benchmark, build_ivf
+from retrieval import VectorStore, build_index
+
+# --- [IVF 인덱스] 빈 벡터 인덱스 / 정확 검색과의 일치 ---
+def write_dataset(path, chunks):
+    path.write_text("".join(json.dumps(chunk) + "\n" for chunk in chunks), encoding="utf-8")
+    return path
+
+def test_empty_store(tmp_path):
+    build_index(write_dataset(tmp_path / "empty.jsonl", []), tmp_path / "index")
+    assert build_ivf(tmp_path / "index") == 1
+    store = VectorStore(tmp_path / "index")
+    ivf = IVFIndex(store)
+    assert ivf.search_rows(["useState"], k=5) == [[]]
+    assert all(row["p50_ms"] == row["p99_ms"] == 0.0 for row in benchmark(store, ivf, probes=(1,)))
+    store.close()
+
+def test_full_probe_matches_exact(tmp_path):
+    chunks = [{"id": f"c{i}", "content": f"const value{i} = useHook{i % 7}(props.item{i % 3});"} for i in range(200)]
+    build_index(write_dataset(tmp_path / "chunks.jsonl", chunks), tmp_path / "index")
+    n_lists = build_ivf(tmp_path / "index")
+    store = VectorStore(tmp_path / "index")
+    query = store.embedder.embed(["useHook3 item1"])
+    exact = store.top_k(store.score(query), 10)[0]
+    approx = IVFIndex(store).search_vectors(query, k=10, n_probe=n_lists)[0]
+    assert np.allclose(sorted(score for _, score in approx), sorted(score for _, score in exact))
+    store.close()
+
+def test_stale_ivf_rejected(tmp_path):
+    # 같은 행 수로 다시 구축된 벡터 인덱스 위의 IVF 인덱스는 사용하지 않음
+    chunks = [{"id": f"c{i}", "content": f"const value{i} = useHook{i % 7}();"} for i in range(50)]
+    build_index(write_dataset(tmp_path / "chunks.jsonl", chunks), tmp_path / "index")
+    build_ivf(tmp_path / "index")
+    build_index(write_dataset(tmp_path / "chunks.jsonl", [dict(c, content=c["content"] + " // v2") for c in chunks]),
+                tmp_path / "index")
+    store = VectorStore(tmp_path / "index")
+    with pytest.raises(RuntimeError):
+        IVFIndex(store)
+    store.close()
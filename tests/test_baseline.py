@@ -0,0 +1,35 @@
+from pathlib import Path
+import pytest
+from data_pipeline import chunk_baseline_tokens, token_offsets
+
+# --- [Baseline 줄 정렬 윈도우] 모든 줄이 어떤 청크에 포함되는지 확인 ---
+CORPUS = sorted((Path(__file__).resolve().parent / "fixtures" / "corpus").glob("*.ts*"))
+
+def make_line(index, tokens):
+    return " ".join(f"v{index}_{i}" for i in range(tokens)) + "\n"
+
+def assert_lines_covered(code, chunks):
+    covered = set()
+    for chunk in chunks:
+        covered.update(chunk["content"].splitlines())
+    missing = [line for line in code.splitlines() if line.strip() and line not in covered]
+    assert not missing
+
+def test_line_windows_cover_tail():
+    # 토큰 격자 기준 시작점을 줄 단위로 내림 정렬하면 마지막 50토큰 줄이 누락되던 경우
+    code = make_line(0, 60) + make_line(1, 90) + make_line(2, 50)
+    chunks = chunk_baseline_tokens(code, chunk_tokens=128, overlap_tokens=16, align_lines=True)
+    assert [chunk["token_count"] for chunk in chunks] == [60, 90, 50]
+    assert_lines_covered(code, chunks)
+
+@pytest.mark.parametrize("chunk_tokens, overlap_tokens", [(32, 0), (64, 16), (128, 16), (128, 64)])
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_line_windows_cover_corpus(path, chunk_tokens, overlap_tokens):
+    code = path.read_text(encoding="utf-8")
+    chunks = chunk_baseline_tokens(code, chunk_tokens, overlap_tokens, align_lines=True)
+    assert_lines_covered(code, chunks)
+    # 윈도우는 줄 경계에서 시작/끝나며, 단독 줄이 아니면 토큰 예산을 넘지 않음
+    for chunk in chunks:
+        assert chunk["content"].endswith("\n") or code.endswith(chunk["content"])
+        assert chunk["token_count"] <= chunk_tokens or "\n" not in chunk["content"].rstrip("\n")
+    assert sum(len(token_offsets(chunk["content"])) for chunk in chunks) >= len(token_offsets(code))
@@ -0,0 +1,25 @@
+import json
+from pathlib import Path
+import pytest
+from data_pipeline import chunk_ours
+from parsing import get_parser_for_file, read_source
+
+# --- [회귀 테스트] 단일 순회 chunk_ours vs 기존 재귀 순회 ---
+# golden/*.json: 단일 순회 도입 이전 chunk_ours(외부 커서 루프 + 컴포넌트별 재귀 traverse)의 출력
+# (run_pipeline과 동일하게 ID 기반 중복 제거 적용). 고정 코퍼스에는 커스텀 Hook 정의부가 없으므로 출력이 같아야 함
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+CORPUS = sorted((FIXTURE_DIR / "corpus").glob("*.ts*"))
+
+def parse_fixture(path):
+    code = read_source(path)
+    return get_parser_for_file(path).parse(code), code
+
+def normalize(chunks):
+    """SourceSpan content를 str로 변환하여 비교"""
+    return [dict(chunk, content=str(chunk["content"])) for chunk in chunks]
+
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_matches_legacy_traversal(path):
+    golden = json.loads((FIXTURE_DIR / "golden" / f"{path.name}.json").read_text(encoding="utf-8"))
+    tree, code = parse_fixture(path)
+    assert normalize(chunk_ours(tree, code)) == golden
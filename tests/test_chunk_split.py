@@ -0,0 +1,66 @@
+from pathlib import Path
+import pytest
+from data_pipeline import SPLIT_PLACEHOLDERS, TOKEN_PATTERN, chunk_ours
+from parsing import get_parser_for_file, read_source
+
+# --- [크기 제한 분할] 조각 ID 유일성 / 토큰 예산 / 골격 + 조각 = 원본 ---
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+FILES = sorted((FIXTURE_DIR / "corpus").glob("*.ts*")) + sorted((FIXTURE_DIR / "split").glob("*.ts*"))
+
+def chunk_file(path, max_tokens):
+    code = read_source(path)
+    return chunk_ours(get_parser_for_file(path).parse(code), code, max_tokens=max_tokens, min_tokens=16)
+
+def restore(chunk, by_id):
+    """골격의 생략 표시를 조각 content(조각이 다시 분할된 경우 재귀 복원)로 되돌립니다."""
+    kind = "jsx" if chunk["type"] == "View (JSX)" else "hook"
+    pieces = str(chunk["content"]).split(SPLIT_PLACEHOLDERS[kind])
+    assert len(pieces) == len(chunk["children"]) + 1
+    restored = [pieces[0]]
+    for child_id, piece in zip(chunk["children"], pieces[1:]):
+        restored += [restore(by_id[child_id], by_id) if "children" in by_id[child_id] else str(by_id[child_id]["content"]),
+                     piece]
+    return "".join(restored)
+
+def test_one_line_nested_jsx():
+    chunks = chunk_file(FIXTURE_DIR / "split" / "OneLine.tsx", 30)
+    by_id = {chunk["id"]: chunk for chunk in chunks}
+    view = by_id["Page_jsx_2"]
+    parts = [by_id[child] for child in view["children"]]
+    # 같은 줄에서 시작하는 조각 3개가 각각 유지되어야 함 (<Header>, 병합된 <Item> 2개, 마지막 <Item>)
+    assert len(parts) == 3 and len(set(view["children"])) == 3
+    assert str(parts[0]["content"]).startswith("<Header ")
+    assert all(part["token_count"] <= 30 and part["parent_chunk"] == "Page_jsx_2" for part in parts)
+
+def test_nested_split_keeps_outer_split():
+    # 분할 중인 Hook 안의 중첩 컴포넌트가 다시 예산 초과 Hook을 만들어도 바깥 분할은 끝까지 진행
+    path = FIXTURE_DIR / "split" / "NestedSplit.tsx"
+    code = read_source(path)
+    whole = {chunk["id"]: str(chunk["content"]) for chunk in chunk_file(path, None)}
+    chunks = chunk_ours(get_parser_for_file(path).parse(code), code, max_tokens=12, min_tokens=1)
+    by_id = {chunk["id"]: chunk for chunk in chunks}
+    assert len(by_id) == len(chunks)
+    outer, inner = by_id["Outer_hook_1"], by_id["Inner_hook_4"]
+    # Inner 이후의 문장(const d = ..., return d;)도 바깥 Hook의 조각
+    assert [by_id[child]["line"] for child in outer["children"]][-2:] == [11, 12]
+    assert inner["children"] and not set(inner["children"]) & set(outer["children"])
+    for chunk in chunks:
+        if "parent_chunk" in chunk:
+            assert chunk["token_count"] == len(TOKEN_PATTERN.findall(str(chunk["content"]))) <= 12
+        if "children" in chunk:
+            assert restore(chunk, by_id) == whole[chunk["id"]]
+
+@pytest.mark.parametrize("max_tokens", [8, 16, 30, 64])
+@pytest.mark.parametrize("path", FILES, ids=lambda path: path.name)
+def test_split_invariants(path, max_tokens):
+    whole = {chunk["id"]: str(chunk["content"]) for chunk in chunk_file(path, None)}
+    chunks = chunk_file(path, max_tokens)
+    by_id = {chunk["id"]: chunk for chunk in chunks}
+    assert len(by_id) == len(chunks)
+    for chunk in chunks:
+        if "parent_chunk" in chunk:
+            assert chunk["id"] in by_id[chunk["parent_chunk"]]["children"]
+            assert chunk["token_count"] == len(TOKEN_PATTERN.findall(str(chunk["content"]))) <= max_tokens
+        if "children" in chunk:
+            assert len(set(chunk["children"])) == len(chunk["children"])
+            assert restore(chunk, by_id) == whole[chunk["id"]]
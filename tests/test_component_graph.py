@@ -0,0 +1,61 @@
+from pathlib import Path
+import data_pipeline
+from chunk_index import ChunkIndex
+from component_graph import ComponentGraph, build_graph, expanded_search, save_graph
+
+# --- [그래프 확장 검색] 최고 점수 경로의 홉 수 / 노드 파일로 제한된 정의 청크 ---
+SOURCES = {
+    "a/useThing.ts": "export function useThing() {\n  return 'a';\n}\n",
+    "b/useThing.ts": "export function useThing() {\n  return 'b';\n}\n",
+    "b/Leaf.tsx": "import { useThing } from './useThing';\n\nexport function Leaf() {\n"
+                  "  const value = useThing();\n  return <span>{value}</span>;\n}\n",
+    "b/Mid.tsx": "import { Leaf } from './Leaf';\n\nexport function Mid() {\n  return <Leaf />;\n}\n",
+    "b/Top.tsx": "import { Mid } from './Mid';\n\nexport function Top() {\n  return <Mid />;\n}\n",
+    "b/Side.tsx": "import { Leaf } from './Leaf';\n\nexport function Side() {\n  return <Leaf />;\n}\n",
+    # b/Mid.tsx와 파일 이름/컴포넌트 이름이 같은 다른 디렉토리의 컴포넌트 (b/Mid 검색 결과에서 확장되면 안 됨)
+    "a/Mid.tsx": "import { Other } from './Other';\n\nexport function Mid() {\n  return <Other />;\n}\n",
+    "a/Other.tsx": "export function Other() {\n  return <div />;\n}\n",
+}
+
+class FixedStore:
+    """고정된 검색 결과(데이터셋 행 번호, 점수)를 반환하는 검색기"""
+    def __init__(self, chunk_index, hits):
+        self.chunk_index = chunk_index
+        self.hits = hits
+
+    def search_rows(self, queries, k):
+        return [self.hits[:k] for _ in queries]
+
+    def metadata(self, row):
+        return self.chunk_index.read_rows([row])[0]
+
+def signature_row(chunk_index, rel_path, name):
+    start, end = chunk_index.file_row_range(rel_path)
+    return chunk_index.component_rows(name, (start, end))[0]
+
+def test_expanded_search(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_pipeline, "BASE_DIR", tmp_path)
+    search_dir = data_pipeline.get_search_dir()
+    for rel_path, source in SOURCES.items():
+        (search_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (search_dir / rel_path).write_text(source, encoding="utf-8")
+    data_pipeline.run_pipeline(lexical=False, cache_max_bytes=None)
+    output_dir = tmp_path / "dataset"
+    *graph, stats = build_graph(search_dir, data_pipeline.collect_target_files(search_dir))
+    save_graph(output_dir, *graph, stats)
+
+    with ChunkIndex(output_dir) as chunk_index:
+        hits = [(signature_row(chunk_index, "b/Top.tsx", "Top"), 0.9), (signature_row(chunk_index, "b/Side.tsx", "Side"), 0.4)]
+        results = expanded_search(FixedStore(chunk_index, hits), ComponentGraph(output_dir), chunk_index, "q", k=2, hops=2)
+        # b/Mid 검색 결과는 b/Mid의 이웃(b/Leaf)으로만 확장 (같은 이름의 a/Mid.tsx -> a/Other 제외)
+        mid_hits = [(signature_row(chunk_index, "b/Mid.tsx", "Mid"), 0.8)]
+        mid_results = expanded_search(FixedStore(chunk_index, mid_hits), ComponentGraph(output_dir), chunk_index, "q", k=1)
+    expanded = {(chunk["parent_component"], chunk["type"]): (score, str(chunk["content"]), hop)
+                for score, chunk, hop in results[2:]}
+
+    # Leaf: Top에서 2홉(0.9 * 0.25)이 Side에서 1홉(0.4 * 0.5)보다 높으므로 홉 수도 2
+    assert expanded[("Leaf", "Component Signature")][::2] == (0.225, 2)
+    # useThing: 그래프 노드가 가리키는 b/useThing.ts의 정의만 포함 (a/useThing.ts 제외)
+    score, content, hop = expanded[("useThing", "Logic (Hook Definition)")]
+    assert "'b'" in content and hop == 2
+    assert [(chunk["parent_component"], hop) for _, chunk, hop in mid_results] == [("Mid", 0), ("Leaf", 1)]
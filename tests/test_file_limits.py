@@ -0,0 +1,36 @@
+import json
+import shutil
+from pathlib import Path
+import data_pipeline
+from data_pipeline import process_file
+
+# --- [대용량 파일 정책] 축소 처리 경로의 실패도 정상 경로처럼 실패 파일로 기록 ---
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "corpus"
+
+def unreadable(broken):
+    read_source = data_pipeline.read_source
+    def read(filepath, *args):
+        if Path(filepath).name == broken: raise PermissionError(f"denied: {filepath}")
+        return read_source(filepath, *args)
+    return read
+
+def test_limited_read_error_returns_none(monkeypatch):
+    monkeypatch.setattr(data_pipeline, "read_source", unreadable("Hooks.tsx"))
+    assert process_file(CORPUS / "Hooks.tsx", policy="baseline", max_bytes=256) is None
+    result, record = process_file(CORPUS / "Hooks.tsx", profile=True, policy="baseline", max_bytes=256)
+    assert result is None and record["error"]["type"] == "PermissionError" and record["policy"] == "baseline"
+
+def test_pipeline_continues_after_oversize_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_pipeline, "BASE_DIR", tmp_path)
+    shutil.copytree(CORPUS, data_pipeline.get_search_dir())
+    # 가장 큰 파일만 크기 제한을 넘어 baseline 정책으로 처리되다가 읽기 실패
+    largest, second = sorted(CORPUS.glob("*.tsx"), key=lambda path: path.stat().st_size, reverse=True)[:2]
+    monkeypatch.setattr(data_pipeline, "read_source", unreadable(largest.name))
+    limit_config = {"max_file_bytes": second.stat().st_size, "oversize": "baseline"}
+    profile_path = tmp_path / "profile.json"
+    data_pipeline.run_pipeline(limit_config=limit_config, profile_path=profile_path, cache_max_bytes=None, lexical=False)
+    report = json.loads(profile_path.read_text(encoding="utf-8"))
+    assert report["files_failed"] == 1 and report["error_samples"]["PermissionError"].endswith(largest.name)
+    assert report["files_limited"] == {"baseline": 1}
+    manifest = json.loads((tmp_path / "dataset" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["files"][largest.name]["baseline_count"] == 0 and manifest["files"][second.name]["chunk_ids"]
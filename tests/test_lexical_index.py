@@ -0,0 +1,58 @@
+import shutil
+from pathlib import Path
+import numpy as np
+import data_pipeline
+from lexical_index import LEXICAL_DIR_NAME, LexicalIndex, LexicalIndexWriter, benchmark, decode_varints, encode_varints
+
+# --- [BM25 역색인] varint 왕복 / 정확한 심볼 질의 / camelCase 하위 단어 질의 ---
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "corpus"
+CHUNKS = [
+    {"id": "Dialog_hook_3", "type": "Logic (Hook)", "parent_component": "Dialog", "filepath": "Dialog.tsx",
+     "content": "const [open, setOpen] = useState(false);"},
+    {"id": "Select_hook_5", "type": "Logic (Hook)", "parent_component": "Select", "filepath": "Select.tsx",
+     "content": "const [value, setValue] = useControlled({ controlled: props.value, default: props.defaultValue });"},
+    {"id": "useControlledState_hookdef_0", "type": "Logic (Hook Definition)", "parent_component": "useControlledState",
+     "filepath": "useControlledState.ts", "content": "function useControlledState(initial) { return useState(initial); }"},
+    {"id": "Toggle_jsx_9", "type": "View (JSX)", "parent_component": "Toggle", "filepath": "Toggle.tsx",
+     "content": "return (<button aria-pressed={pressed} onClick={toggle} />);"},
+]
+
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 255, 300, 16383, 16384, 2**21, 2**28 - 1, 2**32 - 1]
+    data, lengths = encode_varints(values)
+    assert lengths.tolist() == [1, 1, 1, 2, 2, 2, 2, 3, 4, 4, 5]
+    assert len(data) == lengths.sum() and data[:4].tolist() == [0, 1, 127, 0x80]
+    assert decode_varints(data).tolist() == values
+    assert decode_varints(encode_varints([])[0]).tolist() == []
+
+def test_symbol_queries(tmp_path):
+    writer = LexicalIndexWriter(tmp_path / LEXICAL_DIR_NAME)
+    writer.add_all(CHUNKS)
+    info = writer.close("dataset_ours.jsonl")
+    lexical = LexicalIndex(tmp_path)
+    assert lexical.rows == info["docs"] == len(CHUNKS)
+
+    def top_ids(query, k=10):
+        return [CHUNKS[row]["id"] for row, _ in lexical.search_rows([query], k)[0]]
+
+    # 정확한 심볼 질의: 원본 식별자 어휘가 일치하는 청크가 1위 (하위 단어만 공유하는 청크는 그 뒤)
+    assert top_ids("useControlled")[0] == "Select_hook_5"
+    assert set(top_ids("useControlled")) == {"Select_hook_5", "useControlledState_hookdef_0", "Dialog_hook_3"}
+    # camelCase 하위 단어 질의: 식별자 일부(Controlled, State)로도 일치
+    assert top_ids("controlled state")[0] == "useControlledState_hookdef_0"
+    assert set(top_ids("controlled")) == {"Select_hook_5", "useControlledState_hookdef_0"}
+    assert top_ids("pressed", k=1) == ["Toggle_jsx_9"]
+    assert top_ids("missingSymbol") == []
+    rows, tfs = lexical.postings("controlled")
+    assert rows.tolist() == [1, 2] and np.all(tfs > 0)
+    lexical.close()
+
+def test_benchmark_without_queries(tmp_path, monkeypatch):
+    # 질의가 없으면 지연 시간 백분위는 0.0 (빈 목록에 np.percentile을 호출하지 않음)
+    monkeypatch.setattr(data_pipeline, "BASE_DIR", tmp_path)
+    shutil.copytree(CORPUS, data_pipeline.get_search_dir())
+    data_pipeline.run_pipeline(cache_max_bytes=None)
+    lexical = LexicalIndex(tmp_path / "dataset")
+    report = benchmark(lexical, None, [])
+    assert all(entry["p50_ms"] == entry["p99_ms"] == 0.0 for entry in report.values())
+    lexical.close()
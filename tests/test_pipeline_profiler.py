@@ -0,0 +1,18 @@
+from pipeline_profiler import FileTimer, PipelineProfiler
+
+# --- [프로파일러] 처리 시간 상위 파일은 직렬화 시간을 포함한 총 시간 기준 ---
+def make_record(path, parse_seconds):
+    record = FileTimer(path).record
+    record["stages"]["parse"] = parse_seconds
+    return record
+
+def test_slowest_files_include_serialize():
+    profiler = PipelineProfiler(top_n=1)
+    for path, parse_seconds, serialize_seconds in [("a.tsx", 0.001, 0.010), ("b.tsx", 0.005, 0.0)]:
+        record = make_record(path, parse_seconds)
+        profiler.add(record)
+        profiler.add_serialize(record, serialize_seconds)
+    slowest = profiler.report()["slowest_files"]
+    assert [record["path"] for record in slowest] == ["a.tsx"]
+    assert abs(slowest[0]["total_seconds"] - 0.011) < 1e-9
+    assert abs(profiler.report()["stage_seconds"]["serialize"] - 0.010) < 1e-9
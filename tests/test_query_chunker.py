@@ -0,0 +1,25 @@
+from pathlib import Path
+import pytest
+from data_pipeline import chunk_ours
+from parsing import parse_file
+from query_chunker import CORE_RULES, QueryChunker
+
+# --- [Query 엔진] CORE_RULES 결과 == chunk_ours (.tsx / .ts) ---
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+FILES = sorted(path for name in ("corpus", "split", "query") for path in (FIXTURE_DIR / name).glob("*.ts*"))
+CORE = QueryChunker(CORE_RULES)
+
+def normalize(chunks):
+    return [dict(chunk, content=str(chunk["content"])) for chunk in chunks]
+
+@pytest.mark.parametrize("path", FILES, ids=lambda path: path.name)
+def test_core_rules_match_chunk_ours(path):
+    tree, source = parse_file(path)
+    assert normalize(CORE.chunk(tree, source)) == normalize(chunk_ours(tree, source))
+
+def test_typescript_fallback():
+    # TypeScript 문법에는 jsx_element가 없으므로 jsx_return 규칙은 제외되지 않고 fallback 패턴으로 컴파일
+    tree, _ = parse_file(FIXTURE_DIR / "query" / "useThing.ts")
+    assert CORE.compile(tree.language)[2] == {"jsx_return": "fallback"}
+    tree, _ = parse_file(FIXTURE_DIR / "corpus" / "Button.tsx")
+    assert CORE.compile(tree.language)[2] == {}
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import pytest
+from query_server import MAX_BODY_BYTES, BatchingSearcher, FilterColumns, handle, handle_connection
+from retrieval import VectorStore, build_index
+
+# --- [검색 서버] 잘못된 필터는 해당 요청만 실패 ---
+@pytest.fixture
+def store(tmp_path):
+    chunks = [{"id": f"c{i}", "type": "Logic (Hook)" if i % 2 else "View (JSX)", "parent_component": f"Comp{i % 5}",
+               "filepath": f"Comp{i % 5}.tsx", "content": f"const value{i} = useHook{i % 7}(props.item{i});"}
+              for i in range(50)]
+    (tmp_path / "chunks.jsonl").write_text("".join(json.dumps(c) + "\n" for c in chunks), encoding="utf-8")
+    build_index(tmp_path / "chunks.jsonl", tmp_path / "index")
+    store = VectorStore(tmp_path / "index")
+    yield store
+    store.close()
+
+def test_bad_filter_fails_only_its_request(store):
+    async def scenario():
+        searcher = BatchingSearcher(store, FilterColumns(store.index_dir, store.rows), max_wait=0.05)
+        batcher = asyncio.create_task(searcher.run())
+        bodies = [{"query": "useHook1", "k": 3},
+                  {"query": "useHook2", "k": 3, "filters": {"unknown": "x"}},
+                  {"query": "useHook3", "k": 3, "filters": {"parent_component": ["Comp1"]}},
+                  {"query": "useHook3", "k": 3, "filters": {"parent_component": "Comp3"}}]
+        outcomes = await asyncio.gather(*(handle(searcher, "POST", "/search", json.dumps(body).encode())
+                                          for body in bodies), return_exceptions=True)
+        batcher.cancel()
+        return outcomes, searcher.batches
+
+    outcomes, batches = asyncio.run(scenario())
+    assert isinstance(outcomes[1], ValueError) and isinstance(outcomes[2], ValueError)
+    assert outcomes[0][0] == 200 and len(outcomes[0][1]["results"]) == 3
+    assert outcomes[3][0] == 200 and outcomes[3][1]["results"]
+    assert all(hit["chunk"]["parent_component"] == "Comp3" for hit in outcomes[3][1]["results"])
+    assert batches == 1 # 유효한 요청 2건은 같은 배치로 처리
+
+def test_malformed_requests_get_400(store):
+    # 요청 읽기 단계의 오류(요청 줄/본문 크기/헤더 길이/요청 도중 종료)도 400 응답 후 연결 종료
+    async def send(port, raw, eof=False):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        if eof: writer.write_eof()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scenario():
+        searcher = BatchingSearcher(store, FilterColumns(store.index_dir, store.rows))
+        batcher = asyncio.create_task(searcher.run())
+        server = await asyncio.start_server(lambda r, w: handle_connection(searcher, r, w), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        body = b"[1, 2]"
+        requests = [(b"GARBAGE\r\n\r\n", False),
+                    (f"POST /search HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n".encode(), False),
+                    (b"GET /health HTTP/1.1\r\nX-Pad: " + b"a" * (1 << 17) + b"\r\n\r\n", False),
+                    (b"POST /search HTTP/1.1\r\nContent-Length: 10\r\n\r\n{}", True),
+                    (b"POST /search HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body), False)]
+        responses = [await send(port, raw, eof) for raw, eof in requests[:-1]]
+        # 유효하지만 객체가 아닌 JSON 본문은 검증 단계의 400 (연결 유지)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(requests[-1][0] + b"GET /health HTTP/1.1\r\n\r\n")
+        writer.write_eof()
+        responses.append(await reader.read())
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        batcher.cancel()
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert all(response.startswith(b"HTTP/1.1 400 ") for response in responses)
+    assert b"JSON" in responses[-1] and responses[-1].count(b"HTTP/1.1 ") == 2 and b'"ok"' in responses[-1]
@@ -0,0 +1,22 @@
+import json
+from retrieval import VectorStore, benchmark, build_index
+
+# --- [벡터 검색] 지연 시간 벤치마크 ---
+def write_dataset(path, chunks):
+    path.write_text("".join(json.dumps(chunk) + "\n" for chunk in chunks), encoding="utf-8")
+    return path
+
+def test_benchmark_empty_store(tmp_path):
+    build_index(write_dataset(tmp_path / "empty.jsonl", []), tmp_path / "index")
+    store = VectorStore(tmp_path / "index")
+    report = benchmark(store)
+    assert report["queries"] == 0 and report["p50_ms"] == report["p99_ms"] == 0.0
+    store.close()
+
+def test_benchmark(tmp_path):
+    chunks = [{"id": f"c{i}", "content": f"const value{i} = useHook{i % 7}(props.item{i});"} for i in range(20)]
+    build_index(write_dataset(tmp_path / "chunks.jsonl", chunks), tmp_path / "index")
+    store = VectorStore(tmp_path / "index")
+    report = benchmark(store, n_queries=10, k=3)
+    assert report["queries"] == 10 and report["p99_ms"] >= report["p50_ms"] > 0
+    store.close()
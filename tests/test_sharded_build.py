@@ -0,0 +1,132 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from chunk_index import ChunkIndex
+from data_pipeline import DEFAULT_BASELINE_CONFIG, DEFAULT_CHUNK_CONFIG, process_file
+from dataset_io import iter_chunks
+from file_discovery import DEFAULT_DISCOVERY_CONFIG
+from lexical_index import LexicalIndex
+from sharded_build import ShardQueue, merge_shards, prepare_build, requeue, run_worker
+
+# --- [샤드 빌드] 큐 상태 전이 / 실패 샤드만 재처리 / 완료 샤드 재사용 / 병합 행 수 ---
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "corpus"
+
+def make_roots(tmp_path):
+    roots = [tmp_path / "repos" / name for name in ("alpha", "beta")]
+    for root in roots:
+        shutil.copytree(CORPUS, root)
+    return roots
+
+def prepare(build_dir, roots, chunk_config=DEFAULT_CHUNK_CONFIG):
+    return prepare_build(build_dir, roots, 2, DEFAULT_BASELINE_CONFIG, chunk_config, DEFAULT_DISCOVERY_CONFIG)
+
+def output_stamps(queue):
+    """완료 샤드 출력의 (inode, mtime) - 재처리되면 값이 바뀜"""
+    stamps = {}
+    for shard_id in queue.ids("done"):
+        stat = (queue.shard_dir / shard_id / "files.json").stat()
+        stamps[shard_id] = (stat.st_ino, stat.st_mtime_ns)
+    return stamps
+
+def test_rerun_processes_only_failed_shard(tmp_path, capsys):
+    roots = make_roots(tmp_path)
+    build_dir = tmp_path / "build"
+    plan = prepare(build_dir, roots)
+    queue = ShardQueue(build_dir)
+    assert len(plan["shards"]) == 6 and queue.ids("pending") == sorted(plan["shards"]) # 저장소당 5개 파일 / 샤드당 2개
+    run_worker(build_dir, exit_when_empty=True)
+    assert queue.ids("done") == sorted(plan["shards"]) and not queue.ids("pending")
+    stamps = output_stamps(queue)
+
+    # 샤드 하나를 실패 상태로 만든 뒤 재실행: 해당 샤드만 다시 대기열에 올라 처리됨
+    target = plan["shards"][3]
+    assert queue.move(target, "done", "failed")
+    capsys.readouterr()
+    assert prepare(build_dir, roots)["shards"] == plan["shards"]
+    assert "완료 샤드 재사용 5개" in capsys.readouterr().out
+    assert queue.ids("pending") == [target] and queue.read("pending", target)["attempts"] == 0
+    assert not (queue.shard_dir / target).exists() # 완료되지 않은 샤드의 이전 출력은 정리
+    run_worker(build_dir, exit_when_empty=True)
+    assert "처리한 샤드: 1개" in capsys.readouterr().out
+    new_stamps = output_stamps(queue)
+    assert new_stamps.keys() == stamps.keys()
+    assert {s for s in stamps if new_stamps[s] != stamps[s]} == {target}
+
+    # 병합 결과의 행 수 == 파일별 직접 처리 결과의 청크 수 (보조 인덱스 / BM25 역색인도 같은 행 수)
+    expected = {"baseline": 0, "ours": 0}
+    for root in roots:
+        for path in sorted(root.glob("*.tsx")):
+            base_chunks, our_chunks = process_file(path)
+            expected["baseline"] += len(base_chunks)
+            expected["ours"] += len(our_chunks)
+    output_dir = tmp_path / "dataset"
+    merge_shards(build_dir, output_dir)
+    assert sum(1 for _ in iter_chunks(output_dir / "dataset_ours.jsonl")) == expected["ours"]
+    assert sum(1 for _ in iter_chunks(output_dir / "dataset_baseline.jsonl")) == expected["baseline"]
+    with ChunkIndex(output_dir) as chunk_index:
+        files = chunk_index.files()
+        assert len(files) == 10 and files[0][0] == "alpha/Button.tsx"
+        assert chunk_index.conn.execute("SELECT MAX(ours_end), MAX(baseline_end) FROM files").fetchone() == (
+            expected["ours"], expected["baseline"])
+    lexical = LexicalIndex(output_dir)
+    assert lexical.rows == expected["ours"]
+    lexical.close()
+
+def test_claim_requeue_and_max_attempts(tmp_path):
+    roots = make_roots(tmp_path)[:1]
+    build_dir = tmp_path / "build"
+    plan = prepare(build_dir, roots)
+    queue = ShardQueue(build_dir)
+    first = plan["shards"][0]
+
+    # 점유: pending -> running (워커 ID 기록), 다음 점유는 다른 샤드
+    record = queue.claim("w1")
+    assert record["id"] == first and record["worker"] == "w1" and queue.state_of(first) == "running"
+    assert queue.claim("w2")["id"] == plan["shards"][1]
+    assert queue.move(plan["shards"][1], "running", "pending")
+
+    # 하트비트가 갱신되는 동안은 재할당하지 않음, 임대 만료 시 시도 횟수를 늘려 대기열로 복귀
+    assert requeue(queue, lease_seconds=60, max_attempts=3) == 0 and queue.state_of(first) == "running"
+    stale = time.time() - 120
+    os.utime(queue.dirs["running"] / f"{first}.json", (stale, stale))
+    assert requeue(queue, lease_seconds=60, max_attempts=3) == 1
+    assert queue.state_of(first) == "pending" and queue.read("pending", first)["attempts"] == 1
+
+    # 종료가 확인된 워커의 샤드는 임대 만료를 기다리지 않고 재할당
+    assert queue.claim("w3")["id"] == first
+    assert requeue(queue, lease_seconds=60, max_attempts=3, dead_workers={"w3"}) == 1
+    assert queue.read("pending", first)["attempts"] == 2
+
+    # 시도 횟수 소진: 실패 상태로 유지
+    assert queue.claim("w4")["id"] == first
+    assert requeue(queue, lease_seconds=60, max_attempts=3, dead_workers={"w4"}) == 0
+    assert queue.state_of(first) == "failed" and "w4" in queue.read("failed", first)["error"]
+
+    # 재실행(prepare_build) 시 실패 샤드는 시도 횟수를 초기화하여 다시 등록
+    prepare(build_dir, roots)
+    assert queue.state_of(first) == "pending" and queue.read("pending", first)["attempts"] == 0
+
+def test_prepare_reuses_completed_shards(tmp_path, capsys):
+    roots = make_roots(tmp_path)
+    build_dir = tmp_path / "build"
+    plan = prepare(build_dir, roots)
+    queue = ShardQueue(build_dir)
+    run_worker(build_dir, exit_when_empty=True)
+
+    # 파일이 바뀐 샤드만 ID가 바뀌어 다시 처리 대상 (이전 출력 정리)
+    changed = roots[1] / "Hooks.tsx"
+    changed.write_text(changed.read_text(encoding="utf-8") + "\n// changed\n", encoding="utf-8")
+    capsys.readouterr()
+    new_plan = prepare(build_dir, roots)
+    assert "완료 샤드 재사용 5개" in capsys.readouterr().out
+    removed = set(plan["shards"]) - set(new_plan["shards"])
+    added = set(new_plan["shards"]) - set(plan["shards"])
+    assert len(removed) == len(added) == 1 and queue.ids("pending") == sorted(added)
+    assert not (queue.shard_dir / removed.pop()).exists()
+
+    # 청킹 설정이 바뀌면 완료 샤드를 재사용하지 않음
+    run_worker(build_dir, exit_when_empty=True)
+    prepare(build_dir, roots, dict(DEFAULT_CHUNK_CONFIG, engine="query"))
+    assert "완료 샤드 재사용 0개" in capsys.readouterr().out
+    assert queue.ids("pending") == sorted(new_plan["shards"]) and not list(queue.shard_dir.iterdir())
@@ -0,0 +1,102 @@
+import json
+import shutil
+from pathlib import Path
+import pytest
+import data_pipeline
+import watch_mode
+from data_pipeline import DEFAULT_CHUNK_CONFIG, DEFAULT_LIMIT_CONFIG, process_file
+from file_discovery import DEFAULT_DISCOVERY_CONFIG
+from watch_mode import FileState, WatchSession, manifest_build_config
+
+# --- [감시 모드] 증분 갱신 실패 복구 / 종료 시 재구축 설정 ---
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "corpus" / "Hooks.tsx"
+
+def normalize(chunks):
+    return [dict(chunk, content=str(chunk["content"])) for chunk in chunks]
+
+def test_failed_update_rebuilds_state(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "Hooks.tsx"
+    shutil.copy(FIXTURE, path)
+    session = WatchSession(tmp_path, tmp_path / "out")
+    (tmp_path / "out").mkdir()
+    session.states["Hooks.tsx"] = FileState(path)
+
+    # 증분 재청킹 도중 1회 실패 -> 편집만 반영된 Tree가 남지 않고 전체 재파싱 결과와 같아야 함
+    calls = {"failed": False}
+    chunk_ours = watch_mode.chunk_ours
+    def flaky_chunk_ours(node, source, *args, **kwargs):
+        if not calls["failed"]:
+            calls["failed"] = True
+            raise RuntimeError("boom")
+        return chunk_ours(node, source, *args, **kwargs)
+    monkeypatch.setattr(watch_mode, "chunk_ours", flaky_chunk_ours)
+
+    path.write_text(FIXTURE.read_text(encoding="utf-8").replace("const { min = 0", "const { step = 1, min = 0"),
+                    encoding="utf-8")
+    reports = session.flush({"Hooks.tsx": path})
+    assert calls["failed"] and "증분 갱신 실패" in capsys.readouterr().out
+    assert reports[0]["rechunked"] is not None
+    assert normalize(session.states["Hooks.tsx"].chunks()) == normalize(FileState(path).chunks())
+
+    # 이후 증분 갱신은 재구성된 Tree 기준으로 정상 동작
+    path.write_text(path.read_text(encoding="utf-8").replace("max = 100", "max = 10"), encoding="utf-8")
+    session.flush({"Hooks.tsx": path})
+    assert normalize(session.states["Hooks.tsx"].chunks()) == normalize(FileState(path).chunks())
+
+def test_manifest_build_config(tmp_path):
+    assert manifest_build_config(tmp_path) == {}
+    manifest = {"baseline": {"mode": "lines", "chunk_tokens": 64, "overlap_tokens": 8, "min_tokens": 8},
+                "chunking": {"max_tokens": 256, "min_tokens": 16, "engine": "traverse"},
+                "limits": {"max_file_bytes": 1024, "memory_bytes": 1 << 30, "oversize": "skip", "generated": "skip"},
+                "discovery": {"include": ["*.tsx"], "exclude": [], "exclude_dirs": [], "gitignore": False},
+                "datasets": {"baseline": "dataset_baseline.jsonl.gz", "ours": "dataset_ours.jsonl.gz"}}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    assert manifest_build_config(tmp_path) == {"baseline_config": manifest["baseline"],
+                                               "chunk_config": manifest["chunking"],
+                                               "limit_config": manifest["limits"],
+                                               "discovery_config": manifest["discovery"], "compression": "gzip"}
+
+def test_manifest_keeps_discovery_config(tmp_path, monkeypatch):
+    # 종료 시 재구축(run_pipeline(**manifest_build_config))이 같은 탐색 설정으로 실행되도록 매니페스트에 기록
+    monkeypatch.setattr(data_pipeline, "BASE_DIR", tmp_path)
+    shutil.copytree(FIXTURE.parent, data_pipeline.get_search_dir())
+    discovery_config = dict(DEFAULT_DISCOVERY_CONFIG, exclude=DEFAULT_DISCOVERY_CONFIG["exclude"] + ["Hooks.*"],
+                            gitignore=False)
+    data_pipeline.run_pipeline(discovery_config=discovery_config, cache_max_bytes=None, lexical=False)
+    build_config = manifest_build_config(tmp_path / "dataset")
+    assert build_config["discovery_config"] == discovery_config
+    data_pipeline.run_pipeline(**build_config, cache_max_bytes=None, lexical=False)
+    manifest = json.loads((tmp_path / "dataset" / "manifest.json").read_text(encoding="utf-8"))
+    assert "Hooks.tsx" not in manifest["files"] and manifest["discovery"] == discovery_config
+
+@pytest.mark.parametrize("chunk_config", [dict(DEFAULT_CHUNK_CONFIG, max_tokens=24, min_tokens=4),
+                                          dict(DEFAULT_CHUNK_CONFIG, engine="query")])
+def test_file_state_uses_build_config(tmp_path, chunk_config):
+    # 감시 중 청킹(초기 적재/증분 갱신)이 빌드 설정의 엔진/토큰 예산으로 process_file과 같은 청크를 생성
+    path = tmp_path / "Hooks.tsx"
+    shutil.copy(FIXTURE, path)
+    state = FileState(path, chunk_config)
+    assert chunk_config["engine"] == "query" or any("part" in chunk["id"] for chunk in state.chunks())
+    assert normalize(state.chunks()) == normalize(process_file(path, chunk_config=chunk_config)[1])
+
+    path.write_text(FIXTURE.read_text(encoding="utf-8").replace("max = 100", "max = 10"), encoding="utf-8")
+    assert state.update(path.read_bytes()) is not None
+    assert normalize(state.chunks()) == normalize(process_file(path, chunk_config=chunk_config)[1])
+
+def test_file_state_applies_limit_policy(tmp_path):
+    # 정책 대상(대용량) 파일은 파싱하지 않으며, 크기가 줄어 정책이 해제되면 전체 재구성
+    path = tmp_path / "Hooks.tsx"
+    shutil.copy(FIXTURE, path)
+    source = path.read_bytes()
+    limit_config = dict(DEFAULT_LIMIT_CONFIG, max_file_bytes=len(source), oversize="skip")
+    path.write_bytes(source + b"\n// padding\n")
+    state = FileState(path, limit_config=limit_config)
+    assert state.policy == "skip" and state.tree is None and state.chunks() == []
+
+    path.write_bytes(source + b"\n// padding 2\n")
+    assert state.update(path.read_bytes()) is None # 정책 대상 간 변경: 청크 변화 없음
+
+    path.write_bytes(source)
+    assert state.update(source) is not None
+    assert state.policy == "full"
+    assert normalize(state.chunks()) == normalize(FileState(path).chunks())
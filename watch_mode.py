@@ -0,0 +1,415 @@
+import argparse
+import json
+import time
+from pathlib import Path
+import numpy as np
+import data_pipeline
+from data_pipeline import (DEFAULT_CHUNK_CONFIG, DEFAULT_LIMIT_CONFIG, MANIFEST_NAME, MANIFEST_VERSION, chunk_ours,
+                           collect_target_files, plan_file)
+from dataset_io import COMPRESSION_SUFFIXES
+from file_discovery import DEFAULT_DISCOVERY_CONFIG
+from parsing import get_parser_for_file, read_source
+from query_chunker import chunk_query
+from retrieval import INDEX_DIR, VectorStore, embedding_text
+
+# --- [설정] ---
+DELTA_LOG_NAME = "watch_delta.jsonl" # 파일 단위 청크 변경분 로그 (종료 시 데이터셋 재구축 후 비움)
+
+# --- [증분 파싱] ---
+def _point(source, byte):
+    """바이트 오프셋을 tree-sitter (row, column) 좌표로 변환합니다."""
+    row = source.count(b"\n", 0, byte)
+    return (row, byte - (source.rfind(b"\n", 0, byte) + 1))
+
+def compute_edit(old, new):
+    """
+    이전/현재 소스 바이트의 공통 접두·접미사를 제외한 단일 편집 구간을 계산합니다.
+    반환값은 Tree.edit() 인자 순서 (start_byte, old_end_byte, new_end_byte, start_point, old_end_point, new_end_point)
+    변경이 없으면 None을 반환합니다.
+    """
+    if old == new: return None
+    limit = min(len(old), len(new))
+    old_arr = np.frombuffer(old, dtype=np.uint8)
+    new_arr = np.frombuffer(new, dtype=np.uint8)
+    diff = np.flatnonzero(old_arr[:limit] != new_arr[:limit])
+    start = int(diff[0]) if len(diff) else limit
+
+    # 접미사는 접두사와 겹치지 않는 범위에서 역방향 비교
+    tail = limit - start
+    diff = np.flatnonzero(old_arr[len(old) - tail :][::-1] != new_arr[len(new) - tail :][::-1])
+    suffix = int(diff[0]) if len(diff) else tail
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+    return (start, old_end, new_end, _point(old, start), _point(old, old_end), _point(new, new_end))
+
+def chunk_node(node, source, language, chunk_config=DEFAULT_CHUNK_CONFIG):
+    """빌드 설정(chunk_config)의 엔진/토큰 예산으로 부분 트리 Node를 청킹합니다. (process_file과 동일한 분기)"""
+    if chunk_config["engine"] == "query":
+        return chunk_query(node, source, language)
+    return chunk_ours(node, source, chunk_config["max_tokens"], chunk_config["min_tokens"])
+
+def chunk_statements(tree, source, name, chunk_config=DEFAULT_CHUNK_CONFIG):
+    """최상위 문장(root의 자식)별로 청킹을 실행하여 [(시작 바이트, 끝 바이트, 청크 목록)]을 반환합니다."""
+    groups = []
+    for child in tree.root_node.children:
+        chunks = chunk_node(child, source, tree.language, chunk_config)
+        groups.append((child.start_byte, child.end_byte, _with_filepath(chunks, name)))
+    return groups
+
+def _with_filepath(chunks, name):
+    for c in chunks: c["filepath"] = name
+    return chunks
+
+def _shift(chunk, row_delta):
+    """재사용 청크의 줄 번호와 ID를 편집으로 밀린 줄 수만큼 이동합니다. (content는 이전 버퍼 참조를 끊기 위해 str로 변환)"""
+    shifted = dict(chunk, content=str(chunk["content"]))
+    if row_delta:
+        prefix = chunk["id"].rsplit("_", 1)[0]
+        shifted["line"] = chunk["line"] + row_delta
+        shifted["id"] = f"{prefix}_{shifted['line'] - 1}"
+    return shifted
+
+class FileState:
+    """
+    감시 중인 파일의 마지막 소스 바이트, Tree, 최상위 문장별 청크 묶음을 보관합니다.
+    - chunk_config / limit_config: 데이터셋을 만든 빌드 설정 (청킹 엔진, 토큰 예산, 대용량/생성 파일 정책)
+    - 정책(plan_file)이 full이 아닌 파일은 run_pipeline과 같이 파싱하지 않음 (Proposed 청크 없음)
+    """
+    __slots__ = ("path", "chunk_config", "limit_config", "policy", "source", "tree", "groups")
+
+    def __init__(self, path, chunk_config=DEFAULT_CHUNK_CONFIG, limit_config=DEFAULT_LIMIT_CONFIG):
+        self.path = path
+        self.chunk_config = chunk_config
+        self.limit_config = limit_config
+        self.policy, _ = plan_file(path, path.stat().st_size, limit_config)
+        self._load(read_source(path) if self.policy == "full" else None)
+
+    def _load(self, source):
+        self.source = source
+        self.tree = get_parser_for_file(self.path).parse(source) if source is not None else None
+        self.groups = chunk_statements(self.tree, source, self.path.name, self.chunk_config) if self.tree else []
+
+    def chunks(self):
+        """chunk_ours(전체 Tree)와 동일한 순서/ID 규칙의 파일 단위 청크 목록"""
+        merged = {}
+        for _, _, chunks in self.groups:
+            for chunk in chunks:
+                merged[chunk["id"]] = chunk
+        return list(merged.values())
+
+    def update(self, new_source):
+        """
+        이전 Tree에 편집을 반영(tree.edit)한 뒤 이전 Tree를 넘겨 증분 재파싱하고,
+        구조가 바뀐 구간(changed_ranges)이나 편집 구간과 겹치는 최상위 문장만 다시 청킹합니다.
+        반환: (재청킹 문장 수, 전체 문장 수). 변경이 없으면 None
+        """
+        policy, _ = plan_file(self.path, len(new_source), self.limit_config)
+        if policy != "full" or self.policy != "full":
+            # 정책 대상이 되거나 해제된 파일은 증분 재파싱 없이 상태를 다시 구성 (정책 대상 간 변경은 청크 변화 없음)
+            if policy == self.policy: return None
+            self.policy = policy
+            self._load(new_source if policy == "full" else None)
+            return len(self.groups), len(self.groups)
+        edit = compute_edit(self.source, new_source)
+        if edit is None: return None
+        start, old_end, new_end = edit[:3]
+        byte_delta = new_end - old_end
+        row_delta = edit[5][0] - edit[4][0]
+
+        old_tree = self.tree
+        old_tree.edit(*edit)
+        tree = get_parser_for_file(self.path).parse(new_source, old_tree)
+        ranges = [(r.start_byte, r.end_byte) for r in old_tree.changed_ranges(tree)]
+        ranges.append((start, new_end))
+
+        # 편집 구간 밖의 문장은 이전 좌표(편집 뒤쪽이면 byte_delta만큼 이동)로 이전 청크를 찾아 재사용
+        previous = {(s, e): chunks for s, e, chunks in self.groups}
+        groups = []
+        rechunked = 0
+        for child in tree.root_node.children:
+            s, e = child.start_byte, child.end_byte
+            touched = any(s <= r_end and r_start <= e for r_start, r_end in ranges)
+            after = s >= new_end
+            chunks = None if touched else previous.get((s - byte_delta, e - byte_delta) if after else (s, e))
+            if chunks is None:
+                chunks = _with_filepath(chunk_node(child, new_source, tree.language, self.chunk_config), self.path.name)
+                rechunked += 1
+            else:
+                chunks = [_shift(c, row_delta if after else 0) for c in chunks]
+            groups.append((s, e, chunks))
+
+        self.source, self.tree, self.groups = new_source, tree, groups
+        return rechunked, len(groups)
+
+def diff_chunks(old_chunks, new_chunks):
+    """파일 단위 청크 변경분: (삭제된 청크 ID 목록, 추가/변경된 청크 목록)"""
+    def key(c):
+        return (c["id"], c["type"], c["parent_component"], str(c["content"]))
+    old_keys = {key(c) for c in old_chunks}
+    new_keys = {key(c) for c in new_chunks}
+    new_ids = {c["id"] for c in new_chunks}
+    removed = [c["id"] for c in old_chunks if key(c) not in new_keys and c["id"] not in new_ids]
+    upserted = [c for c in new_chunks if key(c) not in old_keys]
+    return removed, upserted
+
+# --- [검색 인덱스 반영] ---
+def manifest_row_ranges(manifest):
+    """매니페스트의 파일 순서와 청크 수로 파일별 인덱스 행 구간 [시작, 끝)을 복원합니다."""
+    ranges, row = {}, 0
+    for rel_path, entry in manifest["files"].items():
+        count = len(entry["chunk_ids"])
+        ranges[rel_path] = (row, row + count)
+        row += count
+    return ranges, row
+
+class LiveIndex:
+    """
+    읽기 전용 VectorStore 위에 파일 단위 변경분을 덮어쓰는(overlay) 검색 인덱스입니다.
+    - 변경된 파일의 기존 행은 삭제 표시(tombstone)하고, 새 청크는 메모리 상의 행렬로 임베딩
+    - 검색 시 기본 행렬과 overlay 점수를 합쳐 top-k를 선택 (기본 행렬은 다시 쓰지 않음)
+    """
+    def __init__(self, store, file_ranges):
+        self.store = store
+        self.file_ranges = file_ranges
+        self.alive = np.ones(store.rows, dtype=bool)
+        self.overlay = {} # rel_path -> (임베딩 행렬, 청크 목록)
+        self._dead = np.zeros(0, dtype=np.int64)
+        self._merged = None
+
+    def apply(self, rel_path, chunks):
+        """파일의 현재 청크 전체로 해당 파일의 검색 결과를 교체합니다. (chunks가 비어 있으면 삭제)"""
+        rows = self.file_ranges.get(rel_path)
+        if rows:
+            self.alive[rows[0] : rows[1]] = False
+            self._dead = np.flatnonzero(~self.alive)
+        if chunks:
+            vectors = self.store.embedder.embed([embedding_text(c) for c in chunks])
+            self.overlay[rel_path] = (vectors, [dict(c, content=str(c["content"])) for c in chunks])
+        else:
+            self.overlay.pop(rel_path, None)
+        self._merged = None
+
+    def _overlay_matrix(self):
+        if self._merged is None:
+            entries = list(self.overlay.values())
+            vectors = (np.concatenate([v for v, _ in entries]) if entries
+                       else np.zeros((0, self.store.dim), dtype=np.float32))
+            self._merged = (vectors, [c for _, chunks in entries for c in chunks])
+        return self._merged
+
+    def search(self, queries, k=10):
+        """질의 문자열 목록에 대한 상위 k개 (점수, 청크) 목록을 반환합니다."""
+        query_vectors = self.store.embedder.embed(queries)
+        scores = self.store.score(query_vectors)
+        if len(self._dead): scores[:, self._dead] = -np.inf
+        overlay_vectors, overlay_chunks = self._overlay_matrix()
+        results = []
+        for query, hits in zip(query_vectors, self.store.top_k(scores, k)):
+            merged = [(score, self.store.metadata(row)) for row, score in hits if score != -np.inf]
+            if len(overlay_chunks):
+                overlay_scores = overlay_vectors @ query
+                top = np.argsort(-overlay_scores)[:k]
+                merged += [(float(overlay_scores[i]), overlay_chunks[i]) for i in top]
+            merged.sort(key=lambda hit: -hit[0])
+            results.append(merged[:k])
+        return results
+
+def open_live_index(output_dir):
+    """dataset_ours로 구축된 인덱스가 현재 매니페스트와 일치하면 LiveIndex를, 아니면 None을 반환합니다."""
+    try:
+        with (Path(output_dir) / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or not (INDEX_DIR / "ours" / "index.json").exists(): return None
+    store = VectorStore(INDEX_DIR / "ours")
+    ranges, rows = manifest_row_ranges(manifest)
+    if store.info.get("source") != manifest["datasets"]["ours"] or store.rows != rows:
+        store.close()
+        return None
+    return LiveIndex(store, ranges)
+
+def manifest_build_config(output_dir):
+    """
+    현재 데이터셋을 만든 빌드 설정을 매니페스트에서 읽어 run_pipeline 인자로 반환합니다. (매니페스트가 없으면 기본 설정)
+    감시 중 청킹과 종료 시 재구축이 기존 엔진/max_tokens/파일 정책/탐색 설정을 유지하여 변경된 파일만 증분 처리하도록 함
+    """
+    try:
+        with (Path(output_dir) / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    config = {}
+    for arg, key in (("baseline_config", "baseline"), ("chunk_config", "chunking"), ("limit_config", "limits"),
+                        ("discovery_config", "discovery")):
+        if key in manifest: config[arg] = manifest[key]
+    dataset_name = manifest.get("datasets", {}).get("ours", "")
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if dataset_name.endswith(suffix): config["compression"] = compression
+    return config
+
+# --- [감시 모드] ---
+class WatchSession:
+    """
+    대상 파일의 상태(stat)를 주기적으로 확인하여 저장(save) 이벤트를 감지하고,
+    디바운스(debounce) 구간 동안 들어온 이벤트를 파일 단위로 병합한 뒤 한 번에 반영합니다.
+    - 반영: 증분 재파싱/재청킹 -> 변경분 로그 기록 -> LiveIndex 갱신
+    """
+    def __init__(self, search_dir, output_dir, discovery_config=DEFAULT_DISCOVERY_CONFIG, index=None,
+                 chunk_config=DEFAULT_CHUNK_CONFIG, limit_config=DEFAULT_LIMIT_CONFIG):
+        self.search_dir = Path(search_dir)
+        self.output_dir = Path(output_dir)
+        self.discovery_config = discovery_config
+        self.chunk_config = chunk_config
+        self.limit_config = limit_config
+        self.index = index
+        self.states = {}   # rel_path -> FileState
+        self.snapshot = {} # rel_path -> (mtime_ns, size)
+        self.delta_path = self.output_dir / DELTA_LOG_NAME
+
+    def _discover(self):
+        return {p.relative_to(self.search_dir).as_posix(): p
+                for p in collect_target_files(self.search_dir, self.discovery_config)}
+
+    def load(self):
+        """초기 전체 파싱: 파일별 Tree와 문장별 청크를 메모리에 적재합니다."""
+        start = time.perf_counter()
+        for rel_path, path in self._discover().items():
+            try:
+                self.states[rel_path] = FileState(path, self.chunk_config, self.limit_config)
+                stat = path.stat()
+                self.snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+            except Exception:
+                continue
+        return time.perf_counter() - start
+
+    def poll(self, rediscover=False):
+        """변경/추가/삭제된 파일의 {rel_path: Path} 목록을 반환합니다. rediscover=True면 디렉토리를 다시 탐색"""
+        paths = (self._discover() if rediscover
+                 else {rel_path: state.path for rel_path, state in self.states.items()})
+        changed = {}
+        for rel_path, path in paths.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                changed[rel_path] = path
+                continue
+            if self.snapshot.get(rel_path) != (stat.st_mtime_ns, stat.st_size):
+                changed[rel_path] = path
+        if rediscover:
+            for rel_path in self.states.keys() - paths.keys():
+                changed[rel_path] = self.states[rel_path].path
+        return changed
+
+    def _rebuild(self, rel_path, path):
+        """파일 상태를 처음부터 다시 구성하여 (FileState, 진행 상황)을 반환합니다. 실패 시 상태를 제거하고 (None, None)"""
+        try:
+            state = self.states[rel_path] = FileState(path, self.chunk_config, self.limit_config)
+        except Exception as e:
+            # 처리 실패한 파일은 빈 결과로 반영 (다음 저장 시 다시 시도)
+            print(f"[Warning] {rel_path}: 재파싱 실패 ({type(e).__name__}: {e}), 청크를 제외합니다.")
+            self.states.pop(rel_path, None)
+            return None, None
+        return state, (len(state.groups), len(state.groups))
+
+    def flush(self, changed):
+        """디바운스된 변경 파일 묶음을 반영하고 파일별 처리 결과를 반환합니다."""
+        reports = []
+        with self.delta_path.open("a", encoding="utf-8") as log:
+            for rel_path, path in sorted(changed.items()):
+                start = time.perf_counter()
+                state = self.states.get(rel_path)
+                old_chunks = state.chunks() if state else []
+                try:
+                    new_source = read_source(path)
+                    stat = path.stat()
+                except OSError:
+                    # 삭제된 파일
+                    self.states.pop(rel_path, None)
+                    self.snapshot.pop(rel_path, None)
+                    new_chunks, progress = [], None
+                else:
+                    self.snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+                    try:
+                        if state:
+                            progress = state.update(new_source)
+                        else:
+                            state = self.states[rel_path] = FileState(path, self.chunk_config, self.limit_config)
+                            progress = (len(state.groups), len(state.groups))
+                    except Exception as e:
+                        # 실패한 update는 편집만 반영된 Tree를 남길 수 있으므로 파일 상태를 처음부터 다시 구성
+                        print(f"[Warning] {rel_path}: 증분 갱신 실패 ({type(e).__name__}: {e}), 전체 재파싱합니다.")
+                        state, progress = self._rebuild(rel_path, path)
+                    if progress is None and state: continue # 내용 변경 없음 (touch 등)
+                    new_chunks = state.chunks() if state else []
+
+                removed, upserted = diff_chunks(old_chunks, new_chunks)
+                if removed or upserted:
+                    log.write(json.dumps({"filepath": rel_path, "removed": removed, "upserted": upserted},
+                                         ensure_ascii=False, default=str))
+                    log.write("\n")
+                    if self.index: self.index.apply(rel_path, new_chunks)
+                reports.append({"filepath": rel_path, "rechunked": progress, "removed": len(removed),
+                                "upserted": len(upserted), "ms": (time.perf_counter() - start) * 1000})
+        return reports
+
+    def run(self, poll_interval=0.1, debounce=0.2, rediscover_interval=2.0):
+        """
+        감시 루프. 마지막 이벤트 이후 debounce초 동안 추가 이벤트가 없을 때 모아 둔 변경을 반영합니다.
+        (저장 직후 포매터/다중 파일 저장 등 연속 이벤트를 한 번의 반영으로 병합)
+        """
+        pending = {}
+        last_event = last_discovery = time.monotonic()
+        while True:
+            now = time.monotonic()
+            rediscover = now - last_discovery >= rediscover_interval
+            if rediscover: last_discovery = now
+            changed = self.poll(rediscover)
+            if changed:
+                pending.update(changed)
+                last_event = now
+            if pending and now - last_event >= debounce:
+                for report in self.flush(pending):
+                    rechunked = report["rechunked"]
+                    progress = f"재청킹 문장 {rechunked[0]}/{rechunked[1]}" if rechunked else "삭제"
+                    print(f"[Watch] {report['filepath']}: {report['ms']:.1f}ms, {progress}, "
+                          f"+{report['upserted']} / -{report['removed']} 청크")
+                pending.clear()
+            time.sleep(poll_interval)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="파일 저장 시 증분 재파싱/재청킹하는 감시 모드")
+    arg_parser.add_argument("--poll", type=float, default=100, help="파일 상태 확인 주기 (ms)")
+    arg_parser.add_argument("--debounce", type=float, default=200, help="연속 이벤트 병합 대기 시간 (ms)")
+    arg_parser.add_argument("--no-index", action="store_true", help="검색 인덱스(LiveIndex) 갱신 생략")
+    arg_parser.add_argument("--no-compact", action="store_true", help="종료 시 데이터셋 재구축(변경분 반영) 생략")
+    args = arg_parser.parse_args()
+
+    search_dir = data_pipeline.get_search_dir()
+    output_dir = data_pipeline.BASE_DIR / "dataset"
+    output_dir.mkdir(exist_ok=True)
+    index = None if args.no_index else open_live_index(output_dir)
+    if not args.no_index and index is None:
+        print("[Info] 현재 데이터셋과 일치하는 'ours' 인덱스가 없어 인덱스 갱신을 생략합니다.")
+
+    # 데이터셋을 만든 빌드 설정으로 청킹 (종료 시 재구축에도 같은 설정 사용)
+    build_config = manifest_build_config(output_dir)
+    session = WatchSession(search_dir, output_dir, dict(DEFAULT_DISCOVERY_CONFIG, **build_config.get("discovery_config", {})),
+                           index, dict(DEFAULT_CHUNK_CONFIG, **build_config.get("chunk_config", {})),
+                           dict(DEFAULT_LIMIT_CONFIG, **build_config.get("limit_config", {})))
+    seconds = session.load()
+    print(f"[Watch] 초기 파싱 완료: {len(session.states)}개 파일, {seconds:.2f}s. 변경 감시 중... (Ctrl+C 종료)")
+    try:
+        session.run(poll_interval=args.poll / 1000, debounce=args.debounce / 1000)
+    except KeyboardInterrupt:
+        print("\n[Watch] 감시 종료.")
+    finally:
+        if index: index.store.close()
+
+    # 변경분을 데이터셋에 병합: 증분 빌드로 변경된 파일만 재청킹하여 데이터셋을 다시 기록
+    if not args.no_compact and session.delta_path.exists():
+        data_pipeline.run_pipeline(**build_config)
+        session.delta_path.unlink()
+        print("[Info] 검색 인덱스는 'python retrieval.py build'로 다시 구축하십시오.")
+
+if __name__ == "__main__":
+    main()